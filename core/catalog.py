@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: catalog.py
+# Purpose: Streaming, filterable reads of the files catalog
+#
+# Description:
+# Reads files joined to their classification as plain column tuples
+# (no ORM objects), one keyset page at a time: each page is a fresh
+# "WHERE files.id > last_id ORDER BY id LIMIT n" query read through a
+# server-side (unbuffered) cursor, and the connection is released before
+# the page's rows are handed out. Memory stays at one page however large
+# the catalog is, callers can write to the catalog while they iterate,
+# pages never shift under concurrent writes (no OFFSET), and an
+# interrupted scan resumes from the last id it saw. Filters cover
+# category, root folder, duplicate status and modification date, plus
+# classifier rule set and the rows a rule change affects. Used by
+# `main.py --query` and scripts/reclassify_files.py.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+#
+# Version: 0.2.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.2.1 (2026-10-19): duplicate_of column reads the original's path through its files.id — Tim Canady
+# - 0.2.0 (2026-10-19): rule_set and rule change (extensions / matched rules) filters — Tim Canady
+# - 0.1.0 (2026-10-19): Keyset-paginated catalog query API and row writers — Tim Canady
+###################################################################
+
+import csv
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import aliased
+
+# Columns of every catalog row, in order (rows also allow row.path, row.category, ...);
+# duplicate_of is the original's path, joined from files.duplicate_of (its files.id)
+CATALOG_COLUMNS = ("id", "path", "size", "mtime", "hash", "is_duplicate", "duplicate_of",
+                   "category", "owner", "year")
+
+QUERY_FORMATS = ("text", "jsonl", "csv")
+
+
+@dataclass
+class CatalogFilter:
+    """
+    Which catalog rows to read; unset fields don't filter.
+
+    Attributes:
+        categories: Classification categories to include
+        root: Only files under this folder (matched through the directories table)
+        duplicates: True for duplicates only, False for originals only
+        modified_since: Only files with mtime >= this
+        modified_before: Only files with mtime < this
+        rule_set: Only files classified with this rule set id ("" = classified
+                  before rule set ids were stored)
+        changed_extensions: With changed_rules, only files a rule change may
+                            affect: one of these extensions or matched rules
+                            (see core.classifier.diff_rules)
+        changed_rules: See changed_extensions
+    """
+    categories: Optional[Sequence[str]] = None
+    root: Optional[str] = None
+    duplicates: Optional[bool] = None
+    modified_since: Optional[datetime] = None
+    modified_before: Optional[datetime] = None
+    rule_set: Optional[str] = None
+    changed_extensions: Optional[Sequence[str]] = None
+    changed_rules: Optional[Sequence[str]] = None
+
+
+def _where(filters: Optional[CatalogFilter]) -> List:
+    from core.db import File, Classification, Directory, affected_classifications
+
+    if filters is None:
+        return []
+    conditions = []
+    if filters.categories:
+        conditions.append(Classification.category.in_(list(filters.categories)))
+    if filters.root:
+        # files.path is not indexed; the (much smaller) directories table is
+        # searched instead and files are reached through idx_files_dir
+        root = str(filters.root).rstrip("/") or "/"
+        prefix = root if root == "/" else root + "/"
+        conditions.append(File.dir_id.in_(
+            select(Directory.id).where(or_(Directory.path == root,
+                                           Directory.path.startswith(prefix, autoescape=True)))))
+    if filters.duplicates is not None:
+        conditions.append(File.is_duplicate.is_(True) if filters.duplicates
+                          else or_(File.is_duplicate.is_(False), File.is_duplicate.is_(None)))
+    if filters.modified_since is not None:
+        conditions.append(File.mtime >= filters.modified_since)
+    if filters.modified_before is not None:
+        conditions.append(File.mtime < filters.modified_before)
+    if filters.rule_set is not None:
+        conditions.append(Classification.rule_set == filters.rule_set if filters.rule_set
+                          else (Classification.id.isnot(None) & Classification.rule_set.is_(None)))
+    if filters.changed_extensions is not None or filters.changed_rules is not None:
+        conditions.append(affected_classifications(filters.changed_extensions or (), filters.changed_rules or ()))
+    return conditions
+
+
+def _catalog_select(filters: Optional[CatalogFilter]):
+    from core.db import File, Classification
+
+    original = aliased(File)
+    return (select(File.id, File.path, File.size, File.mtime, File.hash, File.is_duplicate,
+                   original.path.label("duplicate_of"),
+                   Classification.category, Classification.owner, Classification.year)
+            .outerjoin(Classification, Classification.file_id == File.id)
+            .outerjoin(original, original.id == File.duplicate_of)
+            .where(*_where(filters)))
+
+
+def iter_catalog(filters: Optional[CatalogFilter] = None, page_size: int = 1000, after_id: int = 0,
+                 limit: Optional[int] = None) -> Iterator:
+    """
+    Stream catalog rows in id order, one keyset page per query.
+
+    Args:
+        filters: Rows to include (None = the whole catalog)
+        page_size: Rows per page (and per server-side fetch)
+        after_id: Resume after this files.id (the id of the last row seen)
+        limit: Stop after this many rows
+
+    Yields:
+        Row tuples with the CATALOG_COLUMNS, also accessible by name
+    """
+    from core.db import File, Session
+
+    page_size = max(1, page_size)
+    query = _catalog_select(filters)
+    returned = 0
+
+    while limit is None or returned < limit:
+        size = page_size if limit is None else min(page_size, limit - returned)
+        page = query.where(File.id > after_id).order_by(File.id).limit(size)
+        with Session() as session:
+            rows = session.connection().execute(page, execution_options={"yield_per": size}).all()
+        for row in rows:
+            yield row
+        returned += len(rows)
+        if len(rows) < size:
+            break
+        after_id = rows[-1].id
+
+
+def count_catalog(filters: Optional[CatalogFilter] = None) -> int:
+    """Number of catalog rows matching filters."""
+    from core.db import Session
+
+    with Session() as session:
+        return session.execute(select(func.count()).select_from(_catalog_select(filters).subquery())).scalar()
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def write_catalog_rows(rows, out, fmt: str = "text") -> int:
+    """
+    Write catalog rows to an open text stream.
+
+    Args:
+        rows: Rows from iter_catalog()
+        out: Text stream (file or sys.stdout)
+        fmt: "text" (tab-separated with a header), "jsonl" or "csv"
+
+    Returns:
+        Number of rows written
+    """
+    if fmt not in QUERY_FORMATS:
+        raise ValueError(f"Unknown query format: {fmt}. Use one of: {', '.join(QUERY_FORMATS)}")
+
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(CATALOG_COLUMNS)
+    elif fmt == "text":
+        out.write("\t".join(CATALOG_COLUMNS) + "\n")
+
+    for row in rows:
+        values = [_plain(v) for v in row]
+        if fmt == "jsonl":
+            out.write(json.dumps(dict(zip(CATALOG_COLUMNS, values))) + "\n")
+        elif fmt == "csv":
+            writer.writerow(values)
+        else:
+            out.write("\t".join("" if v is None else str(v) for v in values) + "\n")
+        count += 1
+    return count
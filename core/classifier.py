@@ -7,16 +7,40 @@
 #
 # Description:
 # Classifies files into categories (image, video, audio, document, other)
-# based on MIME type detection. Supports database persistence for
-# classification results with confidence scoring.
+# based on MIME type and extension. All rules live in a rule file
+# (core/classifier_rules.json, or $CLASSIFIER_RULES); at import they are
+# compiled into one suffix -> category dict (MIME answers first, then the
+# extension lists) and one keyword matcher for all name/path markers, so
+# most files are classified with a single lookup. When the hasher sniffed
+# the content type from the file's magic bytes, it decides for files
+# whose suffix is not in the table and for files whose extension
+# contradicts the content. Name and path rules run only when neither
+# answers. Each classification records the rule set id, the rule that
+# decided it and the file's extension, so diff_rules() can tell which
+# rows a rule edit affects; reload_rules() swaps in an edited rule file.
+# A whole scan can be classified at once with classify_batch(), which
+# computes directory-level path rule matches once per directory and
+# memoizes repeated lookups; large scans are sharded by directory across
+# worker processes. Supports database persistence for classification
+# results with confidence scoring.
 #
 # Author: Tim Canady
 # Created: 2025-09-28
 #
-# Version: 1.1.0
-# Last Modified: 2025-11-14 by Tim Canady
+# Version: 1.8.2
+# Last Modified: 2026-10-19 by Tim Canady
 #
 # Revision History:
+# - 1.8.2 (2026-10-19): Keyword matcher wording; header description as prose — Tim Canady
+# - 1.8.1 (2026-10-19): Shard workers get the batch's rule data instead of a rule file path — Tim Canady
+# - 1.8.0 (2026-10-19): Classifications record the matched rule and extension; diff_rules for targeted reclassification — Tim Canady
+# - 1.7.0 (2026-10-19): Name/path rules matched by one trie-compiled regex scan of the lowercased path; find_category_marker for the organizer — Tim Canady
+# - 1.6.0 (2026-10-19): Rules loaded from a JSON/YAML rule file into a RuleSet; rule set id stored per classification; reload_rules — Tim Canady
+# - 1.5.0 (2026-10-19): Added classify_batch with per-directory rule features, memoization and process sharding — Tim Canady
+# - 1.4.0 (2026-10-19): Sniffed content type decides for unknown or contradicted extensions — Tim Canady
+# - 1.3.0 (2026-10-19): Table-driven classification compiled from declarative rules (same results) — Tim Canady
+# - 1.2.1 (2026-10-18): Writers opened through open_writer so they can run write-behind — Tim Canady
+# - 1.2.0 (2026-10-18): Added classify_files with batched, id-keyed DB writes — Tim Canady
 # - 1.1.0 (2025-11-14): Added comprehensive disk image formats and Linux installers (.flatpak, .snap, .appimage) — Tim Canady
 # - 1.0.0 (2025-11-14): Added application category for PacketTracer and .mpkg support (22 categories total) — Tim Canady
 # - 0.9.0 (2025-11-14): Added web category for preserving website directory structures — Tim Canady
@@ -30,11 +54,650 @@
 # - 0.1.0 (2025-09-28): Initial classifier implementation — Tim Canady
 ###################################################################
 
+import hashlib
+import json
 import mimetypes
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import FrozenSet, List, Optional, Sequence, Tuple
 from models.file_info import FileInfo
+from core.keyword_matcher import KeywordMatcher
+from core.sniffer import content_category, fits
+
+# --- Classification rules ---
+# The rules live in a rule file (JSON, or YAML when PyYAML is installed):
+# core/classifier_rules.json by default, or the file named by the
+# CLASSIFIER_RULES environment variable. classify_file() applies them in
+# order: MIME type, extension, then the fallback name/path rules. Earlier
+# entries win.
+
+DEFAULT_RULES_FILE = Path(__file__).with_name("classifier_rules.json")
+
+# Fallback rule kinds: extension_prefix, name (exact), name_prefix /
+# name_contains (lowercased name), path / path_lower (substring of the full
+# path), path_no_extension (path substring, only for names without a suffix)
+RULE_KINDS = ("extension_prefix", "name", "name_prefix", "name_contains", "path", "path_lower",
+              "path_no_extension")
+
+# Substring kinds are all found by one keyword matcher scan of the
+# lowercased path; path and path_no_extension then check the original case
+_SUBSTRING_KINDS = ("name_contains", "path", "path_lower", "path_no_extension")
+_PATH_RULE_KINDS = ("path", "path_lower", "path_no_extension")
+_CASE_SENSITIVE_KINDS = ("path", "path_no_extension")
+
+# Matched rule recorded with each classification: the suffix table (or the
+# extension lists), a MIME type from mimetypes.guess_type(), the sniffed
+# content, a fallback rule's id (see _fallback_rule_id()), or no rule
+MATCHED_EXTENSION = "extension"
+MATCHED_MIME = "mime"
+MATCHED_CONTENT = "content"
+MATCHED_NONE = "other"
+
+
+def _fallback_rule_id(kind, category, patterns) -> str:
+    # Stable across rule files: the same rule gets the same id wherever it sits
+    digest = hashlib.sha256(json.dumps(list(patterns)).encode()).hexdigest()
+    return f"{kind}:{category}:{digest[:8]}"
+
+
+def _compile_rule(index, kind, patterns):
+    # Each predicate takes (name, name_lower, extension, hits); hits holds the
+    # indexes of the substring rules found in the path (RuleSet.rule_hits())
+    if kind == "extension_prefix":
+        patterns = tuple(patterns)
+        return lambda name, name_lower, ext, hits: ext.startswith(patterns)
+    if kind == "name":
+        names = frozenset(patterns)
+        return lambda name, name_lower, ext, hits: name in names
+    if kind == "name_prefix":
+        patterns = tuple(patterns)
+        return lambda name, name_lower, ext, hits: name_lower.startswith(patterns)
+    if kind == "path_no_extension":
+        return lambda name, name_lower, ext, hits: not ext and index in hits
+    if kind in _SUBSTRING_KINDS:
+        return lambda name, name_lower, ext, hits: index in hits
+    raise ValueError(f"Unknown classification rule kind: {kind}")
+
+
+class RuleSet:
+    """
+    Classification rules compiled from a rule file.
+
+    Extensions and MIME answers become one suffix -> category dict. Every
+    substring pattern of the fallback rules goes into one keyword matcher
+    (core.keyword_matcher), run once per path; the rules then become one
+    cheap predicate each. rule_set_id ("<version>-<digest>")
+    changes whenever the rules do and is stored with every classification.
+
+    Attributes:
+        source: Rule file the rules came from (None for rules given as a dict)
+        version: The file's "version" label
+        rule_set_id: version plus the first 10 hex digits of the rules' SHA-256
+        data: The rule file's contents, as loaded
+        role_categories: Categories sniffed content never overrules
+        fallback_rule_ids: Id of each fallback rule, in order
+    """
+
+    def __init__(self, data: dict, source: Optional[Path] = None):
+        try:
+            self.version = str(data["version"])
+            self.mime_prefix_rules = tuple((prefix, category) for prefix, category in data["mime_prefixes"])
+            self.mime_type_rules = dict(data["mime_types"])
+            extension_rules = [(r["category"], r["extensions"]) for r in data["extensions"]]
+            fallback_rules = [(r["kind"], tuple(r["patterns"]), r["category"]) for r in data["fallback"]]
+            self.role_categories = frozenset(data.get("role_categories", ()))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid classification rules{f' in {source}' if source else ''}: {e!r}") from e
+        for kind, patterns, _ in fallback_rules:
+            if kind not in RULE_KINDS:
+                raise ValueError(f"Unknown classification rule kind: {kind}")
+            if not patterns:
+                raise ValueError(f"Classification rule {kind!r} has no patterns")
+
+        self.data = data
+        self.source = source
+        self.mtime = source.stat().st_mtime if source else None
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        self.rule_set_id = f"{self.version}-{digest[:10]}"
+
+        # An extension listed twice keeps its first category
+        self.extension_table = {}
+        for category, extensions in extension_rules:
+            for extension in extensions:
+                self.extension_table.setdefault(extension.lower(), category)
+
+        # mimetypes.guess_type() lowercases the suffix before its table lookup, so a
+        # lowercase suffix gets the same answer here as it would per file
+        mimetypes.init()
+        self.suffix_table = dict(self.extension_table)
+        for extension, mime_type in mimetypes.types_map.items():
+            category = self.mime_category(mime_type, extension)
+            if category and extension == extension.lower():
+                self.suffix_table[extension] = category
+
+        self.fallback_rule_ids = tuple(_fallback_rule_id(kind, category, patterns)
+                                       for kind, patterns, category in fallback_rules)
+        self.fallback = tuple((_compile_rule(index, kind, patterns), category, self.fallback_rule_ids[index])
+                              for index, (kind, patterns, category) in enumerate(fallback_rules))
+
+        # Lowercased keyword -> (rule index, pattern position, pattern, kind) of each rule using it
+        keywords = {}
+        for index, (kind, patterns, category) in enumerate(fallback_rules):
+            if kind in _SUBSTRING_KINDS:
+                for position, pattern in enumerate(patterns):
+                    keywords.setdefault(pattern.lower(), []).append((index, position, pattern, kind))
+        self._matcher = KeywordMatcher(keywords)
+        self._keyword_rules = tuple(tuple(uses) for uses in keywords.values())
+        self._substring_rules = tuple((index, kind, patterns) for index, (kind, patterns, _) in enumerate(fallback_rules)
+                                      if kind in _SUBSTRING_KINDS)
+        self._rule_categories = tuple(category for _, _, category in fallback_rules)
+
+        # For classify_batch(): the longest path pattern minus the one character
+        # it must share with the name
+        self.path_overlap = max((len(pattern) for kind, patterns, _ in fallback_rules
+                                 if kind in _PATH_RULE_KINDS for pattern in patterns), default=1) - 1
+
+    def mime_category(self, mime_type: Optional[str], extension: str) -> Optional[str]:
+        """Category for a MIME type, or None when the extension rules should decide."""
+        if not mime_type:
+            return None
+        for prefix, category in self.mime_prefix_rules:
+            if mime_type.startswith(prefix):
+                # text/csv and .csv files are spreadsheets, not text documents
+                if prefix == "text" and (mime_type == "text/csv" or extension == ".csv"):
+                    return "spreadsheet"
+                return category
+        return self.mime_type_rules.get(mime_type)
+
+    def rule_hits(self, path: str, path_lower: str, name_start: int) -> set:
+        """
+        Indexes of the substring rules matching a path, from one keyword matcher scan.
+
+        Args:
+            path: Path string (or the part of one being checked)
+            path_lower: path.lower(), computed once by the caller
+            name_start: Where the file name starts in path (name_contains
+                        rules only count matches from there on)
+        """
+        hits = set()
+        if len(path_lower) != len(path):
+            # Lowercasing changed the length (rare non-ASCII characters), so
+            # positions in path_lower don't line up with path
+            name_lower = path[name_start:].lower()
+            for index, kind, patterns in self._substring_rules:
+                text = name_lower if kind == "name_contains" else path_lower if kind == "path_lower" else path
+                if any(pattern in text for pattern in patterns):
+                    hits.add(index)
+            return hits
+
+        # Keywords are lowercased; each use checks its pattern as written
+        # against the text its kind matches (so "README" never matches in
+        # the lowercased name, as before)
+        keyword_rules = self._keyword_rules
+        for start, keyword_id in self._matcher.find_all(path_lower):
+            for index, _, pattern, kind in keyword_rules[keyword_id]:
+                if index in hits:
+                    continue
+                if kind in _CASE_SENSITIVE_KINDS:
+                    if path.startswith(pattern, start):
+                        hits.add(index)
+                elif path_lower.startswith(pattern, start) and (kind == "path_lower" or start >= name_start):
+                    hits.add(index)
+        return hits
+
+    def find_marker(self, path: str, category: str) -> Optional[Tuple[int, str]]:
+        """
+        Where a category's path rule matches a path, e.g. the web root of a web file.
+
+        Rules of the category are tried in order and each rule's patterns in
+        the order listed; the first pattern found wins, at its first
+        occurrence.
+
+        Returns:
+            (start index in path, the matched text as written in path), or None
+        """
+        path_lower = path.lower()
+        if len(path_lower) != len(path):
+            for index, kind, patterns in self._substring_rules:
+                if self._rule_categories[index] == category and kind in _PATH_RULE_KINDS:
+                    text = path_lower if kind == "path_lower" else path
+                    for pattern in patterns:
+                        start = text.find(pattern)
+                        if start >= 0:
+                            return start, path[start:start + len(pattern)]
+            return None
+
+        best = None
+        keyword_rules = self._keyword_rules
+        for start, keyword_id in self._matcher.find_all(path_lower):
+            for index, position, pattern, kind in keyword_rules[keyword_id]:
+                if (self._rule_categories[index] == category and kind in _PATH_RULE_KINDS
+                        and (path_lower if kind == "path_lower" else path).startswith(pattern, start)):
+                    candidate = (index, position, start, len(pattern))
+                    if best is None or candidate < best:
+                        best = candidate
+        if best is None:
+            return None
+        _, _, start, length = best
+        return start, path[start:start + length]
+
+    def fallback_match(self, name: str, name_lower: str, extension: str, hits: set) -> Tuple[str, str]:
+        """(category, rule id) from the name/path rules (first match wins), or ("other", MATCHED_NONE)."""
+        for matches, category, rule_id in self.fallback:
+            if matches(name, name_lower, extension, hits):
+                return category, rule_id
+        return "other", MATCHED_NONE
+
+
+def read_rule_file(path) -> dict:
+    """
+    Parse a rule file: JSON, or YAML for .yaml/.yml files.
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If it cannot be parsed (or PyYAML is missing for YAML)
+    """
+    path = Path(path)
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"PyYAML is required to read YAML rule files ({path})")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+def load_rules(path=None) -> RuleSet:
+    """
+    Load and compile a rule file (default: $CLASSIFIER_RULES, then DEFAULT_RULES_FILE).
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file or its rules are invalid
+    """
+    path = Path(path or os.getenv("CLASSIFIER_RULES") or DEFAULT_RULES_FILE)
+    return RuleSet(read_rule_file(path), source=path)
+
 
-def classify_file(file_info: FileInfo, use_db: bool = False) -> FileInfo:
+_RULES = load_rules()
+
+
+def current_rules() -> RuleSet:
+    """The rule set classification uses now."""
+    return _RULES
+
+
+def use_rules(rules: RuleSet) -> RuleSet:
+    """Classify with rules from now on; returns the previous rule set."""
+    global _RULES
+    previous, _RULES = _RULES, rules
+    return previous
+
+
+def reload_rules(path=None, force: bool = False) -> bool:
+    """
+    Reload the rule file if it changed, for long-running processes.
+
+    Checks the current file's mtime (one stat) unless a different path is
+    given. A file that fails to load is logged and the rules in use are kept,
+    so a bad edit never stops classification.
+
+    Args:
+        path: Rule file to switch to (default: the current rules' file)
+        force: Reload even if the file's mtime is unchanged
+
+    Returns:
+        True if new rules are now in use
+    """
+    rules = _RULES
+    path = Path(path) if path else rules.source
+    if path is None:
+        return False
+    try:
+        if not force and path == rules.source and path.stat().st_mtime == rules.mtime:
+            return False
+        new_rules = load_rules(path)
+    except (OSError, ValueError) as e:
+        logging.warning(f"⚠️ Keeping classification rules {rules.rule_set_id}: failed to load {path}: {e}")
+        return False
+    if new_rules.rule_set_id == rules.rule_set_id:
+        rules.mtime = new_rules.mtime
+        return False
+    use_rules(new_rules)
+    logging.info(f"🔄 Classification rules reloaded from {path}: {rules.rule_set_id} -> {new_rules.rule_set_id}")
+    return True
+
+
+def find_category_marker(path, category: str) -> Optional[Tuple[int, str]]:
+    """
+    Where a category's path rule matches a path (current rules), e.g. the
+    "/www/" of a web file; see RuleSet.find_marker().
+
+    Returns:
+        (start index in str(path), the matched text as written in the path), or None
+    """
+    return _RULES.find_marker(str(path), category)
+
+
+# --- Rule changes ---
+# Every classification stores its rule set id, its matched rule and the
+# file's extension. Given the old and new rules, diff_rules() lists the
+# extensions and matched rules whose answer can differ; only rows with
+# one of those need reclassifying (scripts/reclassify_files.py --changed).
+
+@dataclass(frozen=True)
+class RuleDiff:
+    """
+    Which classifications a change of rules can affect.
+
+    A row classified by the old rules can change only if its extension is in
+    extensions or its matched rule is in matched_rules; every other row gets
+    the same answer from the new rules. wholesale means the rows cannot be
+    narrowed down (the MIME tables changed) and all of them are affected.
+    """
+    extensions: FrozenSet[str] = frozenset()
+    matched_rules: FrozenSet[str] = frozenset()
+    wholesale: bool = False
+
+    @property
+    def empty(self) -> bool:
+        return not (self.wholesale or self.extensions or self.matched_rules)
+
+
+def diff_rules(old: RuleSet, new: RuleSet) -> RuleDiff:
+    """
+    Extensions and matched rules whose classifications old and new rules may disagree on.
+
+    - An extension is affected when its suffix table or extension list entry
+      changed, or its category joined or left role_categories.
+    - A fallback rule is affected when it was removed or a rule that was not
+      ahead of it before is ahead of it now (a rule added in front, or a
+      reorder); rows it matched could now match that rule first.
+    - Rows no rule matched are affected when any fallback rule was added.
+    - MIME table changes reach rows through mimetypes.guess_type() answers
+      that are not stored, so they make the change wholesale.
+    """
+    if old.rule_set_id == new.rule_set_id:
+        return RuleDiff()
+    if old.mime_prefix_rules != new.mime_prefix_rules or old.mime_type_rules != new.mime_type_rules:
+        return RuleDiff(wholesale=True)
+
+    tables = (old.suffix_table, new.suffix_table, old.extension_table, new.extension_table)
+    suffixes = set().union(*tables)
+    extensions = {extension for extension in suffixes
+                  if old.suffix_table.get(extension) != new.suffix_table.get(extension)
+                  or old.extension_table.get(extension) != new.extension_table.get(extension)}
+    matched_rules = set()
+
+    roles = old.role_categories ^ new.role_categories
+    if roles:
+        extensions.update(extension for extension in suffixes
+                          if any(table.get(extension) in roles for table in tables))
+        matched_rules.add(MATCHED_CONTENT)
+
+    old_ids, new_ids = old.fallback_rule_ids, new.fallback_rule_ids
+    for position, rule_id in enumerate(old_ids):
+        if rule_id in old_ids[:position]:
+            continue  # A repeated rule never matches first
+        if rule_id not in new_ids or not set(new_ids[:new_ids.index(rule_id)]) <= set(old_ids[:position]):
+            matched_rules.add(rule_id)
+    if set(new_ids) - set(old_ids):
+        matched_rules.add(MATCHED_NONE)
+
+    return RuleDiff(frozenset(extensions), frozenset(matched_rules))
+
+
+def recorded_rules(rule_set_id: str) -> Optional[RuleSet]:
+    """The rule set stored in the DB under rule_set_id by an earlier run, or None."""
+    from core.db import load_rule_set
+
+    data = load_rule_set(rule_set_id)
+    return RuleSet(data) if data is not None else None
+
+
+# Suffixes whose MIME type depends on more than the suffix itself (.tar.gz,
+# .svgz) or on its case; these files still ask mimetypes.guess_type()
+_GUESS_SUFFIXES = (frozenset(mimetypes.encodings_map) |
+                   frozenset(k for k in mimetypes.types_map if k != k.lower()))
+
+
+def _split_name(path_str: str):
+    """(name, suffix, lowercased suffix) of a path string; suffix follows the Path.suffix rule."""
+    name = path_str.rpartition("/")[2]
+    dot = name.rfind(".")
+    suffix = name[dot:] if 0 < dot < len(name) - 1 else ""
+    return name, suffix, suffix.lower()
+
+
+def _needs_guess(path_str: str, name: str, suffix: str, extension: str) -> bool:
+    """Whether a path's MIME type depends on more than its suffix (see categorize_path())."""
+    return (suffix in _GUESS_SUFFIXES or extension in mimetypes.suffix_map or name.startswith(".")
+            or path_str[:5].lower() == "data:")
+
+
+def _lookup_match(rules: RuleSet, category: Optional[str], matched: str,
+                  content_type: Optional[str]) -> Optional[Tuple[str, str]]:
+    """The suffix/MIME (category, rule), replaced by the sniffed one when it has none or contradicts it."""
+    sniffed = content_category(content_type)
+    if sniffed is not None and (category is None or
+                                (category not in rules.role_categories and not fits(content_type, category))):
+        return sniffed, MATCHED_CONTENT
+    return None if category is None else (category, matched)
+
+
+def _guess_match(rules: RuleSet, path_str: str, extension: str,
+                 content_type: Optional[str]) -> Optional[Tuple[str, str]]:
+    """_lookup_match() for paths whose MIME type needs mimetypes.guess_type()."""
+    mime_type, _ = mimetypes.guess_type(path_str)
+    category = rules.mime_category(mime_type, extension)
+    if category is not None:
+        return _lookup_match(rules, category, MATCHED_MIME, content_type)
+    return _lookup_match(rules, rules.extension_table.get(extension), MATCHED_EXTENSION, content_type)
+
+
+def categorize_path(path: Path, content_type: Optional[str] = None, rules: Optional[RuleSet] = None) -> str:
+    """Category of a path; see classify_file() for the list and match_path() for how."""
+    return match_path(path, content_type, rules)[0]
+
+
+def match_path(path: Path, content_type: Optional[str] = None,
+               rules: Optional[RuleSet] = None) -> Tuple[str, str]:
+    """
+    Category of a path and the rule that decided it.
+
+    One dict lookup on the lowercased suffix answers most paths. Compressed
+    suffixes (.tar.gz, .jpg.gz), names starting with a dot and data: paths
+    still ask mimetypes.guess_type(), since their type is not the suffix's.
+    Works on the path string: pathlib's name/suffix properties cost more
+    than the lookup itself.
+
+    A sniffed content_type (core.sniffer) is used when the suffix is not in
+    the table, or when the extension's category does not fit the content
+    (a .txt that is a JPEG); name and path rules come after it. Uses the
+    current rule set unless rules is given.
+
+    Returns:
+        (category, matched rule): MATCHED_EXTENSION, MATCHED_MIME,
+        MATCHED_CONTENT, a fallback rule id, or MATCHED_NONE
+    """
+    rules = rules or _RULES
+    path_str = str(path)
+    name, suffix, extension = _split_name(path_str)
+
+    if _needs_guess(path_str, name, suffix, extension):
+        match = _guess_match(rules, path_str, extension, content_type)
+    else:
+        match = _lookup_match(rules, rules.suffix_table.get(extension), MATCHED_EXTENSION, content_type)
+    if match is not None:
+        return match
+
+    # Lowercased once; the name's lowercase form is the end of the path's
+    path_lower = path_str.lower()
+    name_start = len(path_str) - len(name)
+    name_lower = path_lower[name_start:] if len(path_lower) == len(path_str) else name.lower()
+    return rules.fallback_match(name, name_lower, extension, rules.rule_hits(path_str, path_lower, name_start))
+
+
+# --- Batch classification ---
+# Files in one directory share everything a path rule can see except their
+# name. classify_batch() runs the keyword matcher over a directory once;
+# per file it then only scans the end of the path a match could still reach
+# into (the last RuleSet.path_overlap characters of the directory plus the
+# name).
+
+# Batches at least this large are split across worker processes
+CLASSIFY_PARALLEL_MIN = 200_000
+
+# Paths per worker task (whole directories are kept together)
+CLASSIFY_SHARD_SIZE = 50_000
+
+# Memo markers: key not looked up yet; path needs mimetypes.guess_type()
+_UNSEEN = object()
+_GUESS = object()
+
+
+def _directory_features(rules: RuleSet, directory: str) -> frozenset:
+    """Path rules that match a directory (with its trailing slash), and so every file in it."""
+    return frozenset(rules.rule_hits(directory, directory.lower(), len(directory)))
+
+
+def _match_paths(paths: Sequence[str], content_types: Sequence[Optional[str]],
+                 rules: RuleSet) -> List[Tuple[str, str]]:
+    """
+    match_path() for many path strings, with per-batch memoization.
+
+    Suffix/content answers are memoized by (suffix, content type), directory
+    features by directory and name/path rule answers by (path tail, directory
+    features); the result for each path is the same as match_path() would
+    give it.
+    """
+    overlap = rules.path_overlap
+    lookups = {}
+    directories = {}
+    feature_ids = {}
+    fallbacks = {}
+    matches = []
+
+    for path_str, content_type in zip(paths, content_types):
+        name = path_str.rpartition("/")[2]
+        dot = name.rfind(".")
+        suffix = name[dot:] if 0 < dot < len(name) - 1 else ""
+        key = (suffix, content_type)
+        match = lookups.get(key, _UNSEEN)
+        if match is _UNSEEN:
+            extension = suffix.lower()
+            if suffix in _GUESS_SUFFIXES or extension in mimetypes.suffix_map:
+                match = lookups[key] = _GUESS
+            else:
+                match = lookups[key] = _lookup_match(rules, rules.suffix_table.get(extension),
+                                                     MATCHED_EXTENSION, content_type)
+        if match is _GUESS or name[:1] == "." or path_str[:5].lower() == "data:":
+            match = _guess_match(rules, path_str, suffix.lower(), content_type)
+
+        if match is None:
+            split = len(path_str) - len(name)
+            directory = path_str[:split]
+            seen = directories.get(directory)
+            if seen is None:
+                features = _directory_features(rules, directory)
+                # Directories with the same features share one small id (cheap memo keys)
+                seen = directories[directory] = (feature_ids.setdefault(features, len(feature_ids)), features)
+            feature_id, features = seen
+
+            # The answer depends only on the name, the end of the directory
+            # and the directory's features (README, index.html, ... repeat)
+            tail = path_str[max(0, split - overlap):]
+            key = (tail, feature_id)
+            match = fallbacks.get(key)
+            if match is None:
+                tail_lower = tail.lower()
+                name_start = len(tail) - len(name)
+                name_lower = tail_lower[name_start:] if len(tail_lower) == len(tail) else name.lower()
+                hits = rules.rule_hits(tail, tail_lower, name_start)
+                hits.update(features)
+                match = fallbacks[key] = rules.fallback_match(name, name_lower, suffix.lower(), hits)
+
+        matches.append(match)
+    return matches
+
+
+# Rule set a shard worker classifies with, set by _init_shard_worker()
+_SHARD_RULES = None
+
+
+def _init_shard_worker(data: dict, rule_set_id: str) -> None:
+    """Worker initializer: compile the parent's rules, unless the worker already has them."""
+    global _SHARD_RULES
+    # A forked worker inherits _RULES; a spawned one, or rules given as a dict,
+    # need the parent's rule data (a rule file path may load different rules)
+    _SHARD_RULES = _RULES if _RULES.rule_set_id == rule_set_id else RuleSet(data)
+
+
+def _match_shard(shard):
+    """Worker entry point: (category, matched rule) pairs for one (paths, content types) shard."""
+    paths, content_types = shard
+    return _match_paths(paths, content_types, _SHARD_RULES)
+
+
+def classify_batch(files: List[FileInfo], workers: Optional[int] = None,
+                   rules: Optional[RuleSet] = None, with_rules: bool = False) -> List:
+    """
+    Classify many files at once; sets FileInfo.type like classify_file().
+
+    Directory-level path features and suffix lookups are computed once per
+    batch (see _match_paths()). Batches of CLASSIFY_PARALLEL_MIN files
+    or more are sorted by directory and split into shards of whole
+    directories, classified on worker processes.
+
+    Args:
+        files: FileInfo objects to classify
+        workers: Process count for large batches (default: CPU count; 1 = in process)
+        rules: Rule set to classify with (default: the current one)
+        with_rules: Return (category, matched rule) pairs (see match_path())
+
+    Returns:
+        The category of each file, in order
+    """
+    rules = rules or _RULES
+    paths = [str(f.path) for f in files]
+    content_types = [f.content_type for f in files]
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and len(files) >= CLASSIFY_PARALLEL_MIN:
+        order = sorted(range(len(paths)), key=lambda i: paths[i].rpartition("/")[0])
+        shards = []
+        start = 0
+        while start < len(order):
+            end = min(start + CLASSIFY_SHARD_SIZE, len(order))
+            # Extend the shard to the end of its last directory
+            last_dir = paths[order[end - 1]].rpartition("/")[0]
+            while end < len(order) and paths[order[end]].rpartition("/")[0] == last_dir:
+                end += 1
+            shards.append(order[start:end])
+            start = end
+
+        logging.info(f"🤖 Classifying {len(files)} file(s) in {len(shards)} shard(s) on {workers} worker(s)...")
+        matches = [None] * len(files)
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards)), initializer=_init_shard_worker,
+                                 initargs=(rules.data, rules.rule_set_id)) as pool:
+            results = pool.map(_match_shard, [([paths[i] for i in shard], [content_types[i] for i in shard])
+                                              for shard in shards])
+            for shard, shard_matches in zip(shards, results):
+                for i, match in zip(shard, shard_matches):
+                    matches[i] = match
+    else:
+        matches = _match_paths(paths, content_types, rules)
+
+    for file_info, (category, _) in zip(files, matches):
+        file_info.type = category
+    return matches if with_rules else [category for category, _ in matches]
+
+
+def classify_file(file_info: FileInfo, use_db: bool = False, db_writer=None) -> FileInfo:
     """
     Comprehensive file classification based on MIME type and file extension.
 
@@ -58,237 +721,56 @@ def classify_file(file_info: FileInfo, use_db: bool = False) -> FileInfo:
     - system: System and configuration files
     - other: Unclassified files
     """
-    mime_type, _ = mimetypes.guess_type(str(file_info.path))
-    file_extension = file_info.path.suffix.lower()
-    file_name = file_info.path.name.lower()
-    file_path_str = str(file_info.path)
-    category = "unknown"
-
-    # MIME type based classification (highest priority)
-    if mime_type:
-        if mime_type.startswith("image"):
-            category = "image"
-        elif mime_type.startswith("video"):
-            category = "video"
-        elif mime_type.startswith("audio"):
-            category = "audio"
-        elif mime_type.startswith("font"):
-            category = "font"
-        elif mime_type.startswith("text"):
-            if mime_type == "text/csv" or file_extension == ".csv":
-                category = "spreadsheet"
-            elif file_extension in [".txt", ".md", ".log", ".readme"]:
-                category = "document"
-            else:
-                category = "document"
-        elif mime_type in ["application/pdf", "application/msword",
-                          "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                          "application/rtf"]:
-            category = "document"
-        elif mime_type in ["application/vnd.ms-excel",
-                          "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                          "text/csv"]:
-            category = "spreadsheet"
-        elif mime_type in ["application/vnd.ms-powerpoint",
-                          "application/vnd.openxmlformats-officedocument.presentationml.presentation"]:
-            category = "presentation"
-        elif mime_type in ["application/zip", "application/x-tar", "application/x-gzip",
-                          "application/x-bzip2", "application/x-7z-compressed", "application/x-rar-compressed",
-                          "application/x-iso9660-image"]:
-            category = "archive"
-        elif mime_type in ["application/json", "application/xml", "text/xml"]:
-            category = "data"
-        elif mime_type in ["application/x-executable", "application/x-mach-binary",
-                          "application/x-msdownload"]:
-            category = "installer"
-        elif mime_type in ["application/x-sh", "text/x-python", "text/x-script"]:
-            category = "code"
-        else:
-            category = None  # Will fall through to extension-based
-
-    # Extension-based classification (if MIME type didn't match or wasn't found)
-    if category is None or category == "unknown":
-        # Images
-        if file_extension in [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".svg", ".webp", ".tiff", ".tif",
-                             ".ico", ".heic", ".heif", ".raw", ".cr2", ".nef", ".dng", ".psd", ".ai",
-                             ".eps", ".indd"]:
-            category = "image"
-
-        # Videos
-        elif file_extension in [".mp4", ".avi", ".mov", ".wmv", ".flv", ".mkv", ".webm", ".m4v",
-                               ".mpg", ".mpeg", ".3gp", ".ogv", ".vob", ".ts", ".mts", ".m2ts"]:
-            category = "video"
-
-        # Audio
-        elif file_extension in [".mp3", ".wav", ".flac", ".aac", ".ogg", ".m4a", ".wma", ".opus",
-                               ".ape", ".alac", ".aiff", ".mid", ".midi"]:
-            category = "audio"
-
-        # Documents
-        elif file_extension in [".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt", ".md", ".tex",
-                               ".pages", ".epub", ".mobi", ".azw", ".djvu"]:
-            category = "document"
-
-        # Spreadsheets
-        elif file_extension in [".csv", ".xlsx", ".xls", ".ods", ".numbers", ".tsv"]:
-            category = "spreadsheet"
-
-        # Presentations
-        elif file_extension in [".ppt", ".pptx", ".odp", ".key"]:
-            category = "presentation"
-
-        # Code and Scripts (including compiled code)
-        elif file_extension in [".py", ".js", ".java", ".cpp", ".c", ".h", ".hpp", ".cs", ".rb",
-                               ".go", ".rs", ".sh", ".bash", ".zsh", ".php", ".swift", ".kt", ".scala",
-                               ".r", ".m", ".vb", ".pl", ".lua", ".groovy", ".ts", ".jsx", ".tsx",
-                               ".sql", ".html", ".htm", ".css", ".scss", ".sass", ".less", ".vue",
-                               ".dart", ".f90", ".f", ".asm", ".s", ".lisp", ".cl", ".scm", ".el",
-                               ".clj", ".coffee", ".hs", ".ml", ".erl", ".ex", ".jl", ".nim",
-                               ".scpt", ".applescript", ".bat", ".cmd", ".ps1", ".psm1",
-                               ".class", ".pyc", ".pyo", ".pyd", ".o", ".obj", ".a", ".lib",
-                               ".jar", ".war", ".ear"]:
-            category = "code"
-
-        # Archives and Disk Images
-        elif file_extension in [".zip", ".tar", ".gz", ".bz2", ".7z", ".rar", ".xz", ".lz", ".lzma",
-                               ".iso", ".dmg", ".img", ".vhd", ".vmdk", ".vdi", ".ova", ".ovf", ".qcow2",
-                               ".toast", ".cdr", ".nrg", ".mds", ".mdf",
-                               ".mdzip", ".sitx", ".cab", ".ace", ".arj", ".cpio"]:
-            category = "archive"
-
-        # Data files
-        elif file_extension in [".json", ".xml", ".yaml", ".yml", ".toml", ".ini", ".conf", ".cfg",
-                               ".csv", ".tsv", ".sql", ".sqlite", ".db", ".mdb", ".accdb",
-                               ".sqlite3", ".sqlite-wal", ".sqlite-shm", ".dat", ".data",
-                               ".prefs", ".properties", ".config", ".settings"]:
-            category = "data"
-
-        # Fonts
-        elif file_extension in [".ttf", ".otf", ".woff", ".woff2", ".eot", ".fon", ".dfont"]:
-            category = "font"
-
-        # Installers and Executables
-        elif file_extension in [".exe", ".msi", ".app", ".pkg", ".mpkg", ".deb", ".rpm", ".apk", ".ipa",
-                               ".run", ".bin", ".out", ".elf", ".dll", ".so", ".dylib",
-                               ".msu", ".cab", ".appx", ".msix",
-                               ".flatpak", ".snap", ".appimage"]:  # Linux package formats
-            category = "installer"
-
-        # Certificates and Security
-        elif file_extension in [".p7b", ".p12", ".pfx", ".cer", ".crt", ".pem", ".der", ".key",
-                               ".csr", ".p7c", ".spc", ".pub", ".wzd"]:
-            category = "certificate"
-
-        # Shortcuts and Links
-        elif file_extension in [".lnk", ".url", ".webloc", ".desktop", ".rdp", ".vncloc"]:
-            category = "shortcut"
-
-        # Scientific/Engineering
-        elif file_extension in [".mat", ".fig", ".hdf5", ".h5", ".nc", ".fits", ".npy", ".npz",
-                               ".rdata", ".rds", ".sav", ".dta", ".pkl", ".pickle"]:
-            category = "scientific"
-
-        # Financial and Tax files
-        elif file_extension in [
-            # Quicken files
-            ".qdf", ".qel", ".qfx", ".qif", ".qpb", ".qsd", ".qph", ".qxf", ".qmtf", ".qnx",
-            # Tax software files
-            ".tax", ".txf",  # TurboTax
-            ".t23", ".t24", ".t25", ".t26",  # TaxAct (year-specific)
-            ".h23", ".h24", ".h25", ".h26",  # H&R Block (year-specific)
-        ]:
-            category = "financial"
-        # Check for year-specific financial files (e.g., .tax2024, .q2023)
-        elif (file_extension.startswith(".tax") or
-              file_extension.startswith(".q2") or
-              file_extension.startswith(".t2") or
-              file_extension.startswith(".h2")):
-            category = "financial"
-
-        # Backup files
-        elif file_extension in [".bak", ".backup", ".old", ".orig", ".save", ".swp", ".tmp~"]:
-            category = "backup"
-
-        # Temporary files
-        elif file_extension in [".tmp", ".temp", ".cache", ".crdownload", ".part", ".download",
-                               ".partial", ".filepart"]:
-            category = "temporary"
-
-        # macOS/iOS specific files
-        elif file_extension in [".strings", ".plist", ".nib", ".xib", ".storyboard", ".mobileprovision",
-                               ".entitlements", ".car", ".tbd", ".framework", ".bundle", ".xcuserstate",
-                               ".xcworkspacedata", ".xcscheme", ".xcbkptlist"]:
-            category = "system"
-
-        # Xcode project files
-        elif file_extension in [".xcodeproj", ".xcworkspace", ".pbxproj"]:
-            category = "code"
-
-        # System files by name (no extension)
-        elif file_info.path.name in ["CodeResources", "Info.plist", "PkgInfo", "version.plist",
-                                     "Makefile", "makefile", "Dockerfile", "Vagrantfile",
-                                     "Gemfile", "Rakefile", ".gitignore", ".dockerignore",
-                                     "bootstrap", "jquery", "LICENSE", "README", "CHANGELOG"]:
-            if file_info.path.name in ["Makefile", "makefile", "Rakefile", "Gemfile"]:
-                category = "code"
-            else:
-                category = "system"
-
-        # Files inside macOS app bundles
-        elif "/Contents/MacOS/" in file_path_str and not file_extension:
-            category = "installer"
-        elif "/Contents/PlugIns/" in file_path_str or "/Contents/Resources/" in file_path_str:
-            category = "system"
-
-        # Alias files (macOS)
-        elif "alias" in file_name or file_extension == ".alias":
-            category = "shortcut"
-
-        # Log files
-        elif ".log" in file_name or file_extension in [".log", ".log2"]:
-            category = "system"
-
-        # IDE workspace and settings directories
-        elif any(pattern in file_path_str for pattern in [
-            "/.metadata/", "/.vscode/", "/.idea/", "/.eclipse/", "/.settings/",
-            "/workspace/", "/.project", "/.classpath", "/nbproject/"
-        ]):
-            category = "data"
-
-        # Education files (course prefixes)
-        elif any(file_name.startswith(prefix.lower()) for prefix in [
-            "cs", "ceg", "stat", "mat", "econ", "phys", "chem", "bio", "eng", "math"
-        ]):
-            category = "education"
-
-        # Financial files by name/path (tax returns, financial documents, etc.)
-        elif any(keyword in file_name or keyword in file_path_str.lower() for keyword in [
-            "tax", "taxes", "1040", "w2", "w-2", "1099", "quicken", "finance", "financial",
-            "invoice", "receipt", "banking", "investment", "retirement", "401k", "ira"
-        ]):
-            category = "financial"
-
-        # Web project directories (preserve structure)
-        elif any(web_dir in file_path_str for web_dir in [
-            "/http/", "/https/", "/www/", "/website/", "/websites/", "/web/",
-            "/html/", "/public_html/", "/htdocs/", "/web-projects/", "/sites/"
-        ]):
-            category = "web"
-
-        # Application directories (preserve structure)
-        elif any(app_dir in file_path_str.lower() for app_dir in [
-            "/packettracer/", "/packet tracer/"
-        ]):
-            category = "application"
-
-        else:
-            category = "other"
+    rules = _RULES
+    category, matched_rule = match_path(file_info.path, file_info.content_type, rules)
 
     # Update the FileInfo object with classification
     file_info.type = category
 
-    # Save classification to database if enabled
     if use_db:
+        _record_rule_set(rules)
+        _save_classification(file_info, category, rules.rule_set_id, db_writer, matched_rule)
+
+    return file_info
+
+
+# Rule set ids already stored in the DB by this process
+_RECORDED_RULE_SETS = set()
+
+
+def _record_rule_set(rules: RuleSet):
+    """Store the rules under their id once, so later rule edits can be diffed against them."""
+    if rules.rule_set_id in _RECORDED_RULE_SETS:
+        return
+    try:
+        from core.db import save_rule_set, spooling
+        if spooling():
+            return
+        save_rule_set(rules.rule_set_id, rules.version, json.dumps(rules.data, sort_keys=True))
+        _RECORDED_RULE_SETS.add(rules.rule_set_id)
+    except Exception as db_err:
+        logging.warning(f"  ⚠️ Failed to record classification rules {rules.rule_set_id} in DB: {db_err}")
+
+
+def _save_classification(file_info: FileInfo, category: str, rule_set: str, db_writer=None,
+                         matched_rule: Optional[str] = None):
+    """Save a classification to the DB (batched by file id when a writer is given)."""
+    extension = _split_name(str(file_info.path))[2]
+    if db_writer is not None:
+        try:
+            db_writer.add(
+                file_info,
+                category=category,
+                owner=file_info.owner,
+                year=int(file_info.year) if file_info.year else None,
+                confidence=0.8,  # Mock confidence score
+                rule_set=rule_set,
+                matched_rule=matched_rule,
+                extension=extension
+            )
+        except Exception as db_err:
+            logging.warning(f"  ⚠️ Failed to save classification batch to DB: {db_err}")
+    else:
         try:
             from core.db import save_classification
             save_classification(
@@ -296,10 +778,47 @@ def classify_file(file_info: FileInfo, use_db: bool = False) -> FileInfo:
                 category=category,
                 owner=file_info.owner,
                 year=int(file_info.year) if file_info.year else None,
-                confidence=0.8  # Mock confidence score
+                confidence=0.8,  # Mock confidence score
+                rule_set=rule_set,
+                matched_rule=matched_rule,
+                extension=extension
             )
             logging.debug(f"  💾 Saved classification to DB: {file_info.path.name}")
         except Exception as db_err:
             logging.warning(f"  ⚠️ Failed to save classification to DB for {file_info.path}: {db_err}")
 
-    return file_info
\ No newline at end of file
+
+def classify_files(files: List[FileInfo], use_db: bool = False, workers: Optional[int] = None) -> List[FileInfo]:
+    """
+    Classify a list of files, writing classifications to the DB in batches.
+
+    Args:
+        files: FileInfo objects to classify
+        use_db: If True, save classifications (one bulk write per batch)
+        workers: Process count for large batches (see classify_batch())
+
+    Returns:
+        The classified FileInfo objects
+    """
+    # Long-running callers pick up edits to the rule file (one stat per call)
+    reload_rules()
+
+    db_writer = None
+    if use_db:
+        from core.db import ClassificationWriter, open_writer
+        db_writer = open_writer(ClassificationWriter)
+
+    rules = _RULES
+    matches = classify_batch(files, workers=workers, rules=rules, with_rules=True)
+
+    if db_writer is not None:
+        _record_rule_set(rules)
+        for file_info, (category, matched_rule) in zip(files, matches):
+            _save_classification(file_info, category, rules.rule_set_id, db_writer, matched_rule)
+        try:
+            db_writer.close()
+            logging.info(f"💾 Saved {db_writer.rows_written} classification(s) to DB in {db_writer.flushes} batch(es)")
+        except Exception as db_err:
+            logging.warning(f"⚠️ Failed to save classification batch to DB: {db_err}")
+
+    return files
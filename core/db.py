@@ -8,169 +8,1400 @@
 # Description:
 # Defines SQLAlchemy models and handles DB connections, caching,
 # and inserts/updates from scanner, hasher, and executor modules.
-# Supports MySQL with proper password encoding and session management.
+# The engine is created on first use from DATABASE_URL, or from the
+# DB_* variables (MySQL, password URL-encoded). SQLite URLs are fully
+# supported, with WAL journaling and tuned pragmas.
 #
 # Author: Tim Canady
 # Created: 2025-11-04
 #
-# Version: 0.5.0
-# Last Modified: 2025-11-12 by Tim Canady
+# Version: 0.19.0
+# Last Modified: 2026-10-19 by Tim Canady
 #
 # Revision History:
+# - 0.19.0 (2026-10-19): files.duplicate_of holds the original's files.id; operation targets stored as (dir_id, name) — Tim Canady
+# - 0.18.3 (2026-10-19): hash_jobs keyed by path_digest with a TEXT path, like files — Tim Canady
+# - 0.18.2 (2026-10-19): find_catalog_originals can exclude file ids (stale catalog originals) — Tim Canady
+# - 0.18.1 (2026-10-19): Any verification status but "verified" clears the duplicate flag — Tim Canady
+# - 0.18.0 (2026-10-19): classifications.matched_rule/extension, classifier_rule_sets table, stamp_rule_set for targeted reclassification — Tim Canady
+# - 0.17.0 (2026-10-19): classifications.rule_set records the classifier rule set of each row — Tim Canady
+# - 0.16.0 (2026-10-19): catalog_stats summary table maintained incrementally by every write path; rebuild_catalog_stats — Tim Canady
+# - 0.15.0 (2026-10-19): (size, hash) and is_duplicate indexes; streamed catalog-wide duplicate groups — Tim Canady
+# - 0.14.0 (2026-10-19): Normalized paths: directories table, files keyed by a fixed-width path digest — Tim Canady
+# - 0.13.0 (2026-10-18): Lazy engine creation, DATABASE_URL override, tuned SQLite backend — Tim Canady
+# - 0.12.0 (2026-10-18): Spool writer rows to a local file when the DB is unreachable; load_spool replay — Tim Canady
+# - 0.11.0 (2026-10-18): Write-behind support (open_writer/start_write_behind), flush latency stats, FileInfo-keyed classification/operation writers — Tim Canady
+# - 0.10.0 (2026-10-18): FileWriter resolves file ids; batched id-keyed duplicate, classification and operation writers — Tim Canady
+# - 0.9.0 (2026-10-18): Added batched multi-row upsert writer (FileWriter) — Tim Canady
+# - 0.8.0 (2026-10-18): Added hash_jobs work queue for distributed hashing; SQLite-safe BIGINT ids — Tim Canady
+# - 0.7.0 (2026-10-18): Added hash index and batched catalog original lookup — Tim Canady
+# - 0.6.0 (2026-10-18): Added byte-level verification status to files — Tim Canady
 # - 0.5.0 (2025-11-12): Fixed schema, removed FK constraints, added classification save — Tim Canady
 # - 0.2.0 (2025-11-06): Added context manager support for sessions — Tim Canady
 # - 0.1.0 (2025-11-04): Initial DB ORM and integration logic — Tim Canady
 ###################################################################
 
 import os
+import hashlib
+from collections import defaultdict
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta
+import time
+import uuid
 from urllib.parse import quote_plus
-from sqlalchemy import (create_engine, Column, Integer, BigInteger, String,
-                        Boolean, DateTime, Text, Enum, Float, ForeignKey)
+from sqlalchemy import (create_engine, event, make_url, Column, Integer, BigInteger, String, BINARY,
+                        Boolean, DateTime, Text, Enum, Float, ForeignKey, Index, func, or_, select, update)
+from sqlalchemy.exc import OperationalError, InterfaceError
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+from sqlalchemy.pool import StaticPool
 
-# Load environment variables and build connection URL
+# Load environment variables (read again when the engine is first created)
 load_dotenv()
 
-# Get database connection components
-db_host = os.getenv("DB_HOST", "localhost")
-db_port = os.getenv("DB_PORT", "3306")
-db_name = os.getenv("DB_NAME")
-db_user = os.getenv("DB_USER")
-db_password = os.getenv("DB_PASSWORD")
-
 # Debug logging
 import logging
 logger = logging.getLogger(__name__)
 
-# Validate required variables
-if not all([db_name, db_user, db_password]):
-    missing = []
-    if not db_name: missing.append("DB_NAME")
-    if not db_user: missing.append("DB_USER")
-    if not db_password: missing.append("DB_PASSWORD")
-    raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+# Errors meaning the database could not be reached (as opposed to bad SQL or data)
+CONNECTION_ERRORS = (OperationalError, InterfaceError)
+
+# Applied to every SQLite connection: WAL lets readers run alongside the single
+# writer, NORMAL sync is durable across app crashes in WAL mode, and the larger
+# page cache and memory temp store keep big batches and GROUP BYs off the disk
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -65536,       # KiB (64 MB)
+    "mmap_size": 268435456,     # 256 MB
+    "busy_timeout": 30000,      # ms to wait for another process's write lock
+}
+
+def database_url():
+    """
+    Connection URL from the environment.
+
+    DATABASE_URL wins when set; a ${DB_PASSWORD} placeholder in it is replaced
+    with the URL-encoded DB_PASSWORD. Otherwise a MySQL URL is built from
+    DB_HOST, DB_PORT, DB_NAME, DB_USER and DB_PASSWORD.
+
+    Raises:
+        ValueError: Neither DATABASE_URL nor the MySQL credentials are set
+    """
+    load_dotenv()
+    db_password = os.getenv("DB_PASSWORD")
+    url = os.getenv("DATABASE_URL")
+    if url:
+        if "${DB_PASSWORD}" in url and db_password:
+            url = url.replace("${DB_PASSWORD}", quote_plus(db_password))
+        return url
+
+    db_host = os.getenv("DB_HOST", "localhost")
+    db_port = os.getenv("DB_PORT", "3306")
+    db_name = os.getenv("DB_NAME")
+    db_user = os.getenv("DB_USER")
+
+    # Validate required variables
+    if not all([db_name, db_user, db_password]):
+        missing = []
+        if not db_name: missing.append("DB_NAME")
+        if not db_user: missing.append("DB_USER")
+        if not db_password: missing.append("DB_PASSWORD")
+        raise ValueError(f"Missing required environment variables: {', '.join(missing)} (or set DATABASE_URL)")
+
+    # URL-encode the password to handle special characters
+    return f"mysql+pymysql://{db_user}:{quote_plus(db_password)}@{db_host}:{db_port}/{db_name}"
 
-# URL-encode the password to handle special characters
-encoded_password = quote_plus(db_password)
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
 
-# Build the database URL
-DATABASE_URL = f"mysql+pymysql://{db_user}:{encoded_password}@{db_host}:{db_port}/{db_name}"
+def create_db_engine(url):
+    """
+    Engine for url; SQLite engines get SQLITE_PRAGMAS on every connection.
 
-# Log masked URL for debugging
-safe_url = DATABASE_URL.replace(encoded_password, "***MASKED***")
-logger.debug(f"Database URL: {safe_url}")
+    SQLite connections may be used from the write-behind thread, and an
+    in-memory database is shared through a single connection.
+    """
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url, echo=False, pool_pre_ping=True)
 
-# Set up engine and session
-engine = create_engine(DATABASE_URL, echo=False)
-Session = sessionmaker(bind=engine)
+    kwargs = {"connect_args": {"check_same_thread": False}}
+    if url.database in (None, "", ":memory:"):
+        kwargs["poolclass"] = StaticPool
+    engine = create_engine(url, echo=False, **kwargs)
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+class _LazySessionmaker(sessionmaker):
+    # Binds to get_engine() on the first session unless configure(bind=...) was called
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None and "bind" not in local_kw:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+Session = _LazySessionmaker()
 Base = declarative_base()
 
+def configure_database(url=None):
+    """
+    Create the engine for url (default: database_url()) and bind Session to it.
+
+    Returns:
+        The new engine
+    """
+    engine = create_db_engine(url or database_url())
+    logger.debug(f"Database URL: {engine.url.render_as_string(hide_password=True)}")
+    Session.configure(bind=engine)
+    return engine
+
+def get_engine():
+    """The engine sessions are bound to, created from the environment on first use."""
+    bind = Session.kw.get("bind")
+    return bind if bind is not None else configure_database()
+
+# BIGINT primary keys only autoincrement as INTEGER on SQLite (local stand-in databases)
+BigIntId = BigInteger().with_variant(Integer, "sqlite")
+
 # --- ORM Models ---
 
+class Directory(Base):
+    __tablename__ = 'directories'
+
+    id = Column(BigIntId, primary_key=True)
+    path = Column(Text, nullable=False)  # Stored once per directory, any length
+    path_digest = Column(BINARY(32), nullable=False, unique=True)  # SHA-256 of path (migrations/005)
+
+
 class File(Base):
     __tablename__ = 'files'
 
-    id = Column(BigInteger, primary_key=True)
-    path = Column(String(767), nullable=False, unique=True)  # 767 chars * 4 bytes = 3068 bytes (under 3072 limit)
+    # path repeats the directory prefix in every row (roughly the average path
+    # length per file, ~1 GB per 10M files at 100 bytes). It is a deliberate
+    # denormalization: reports, catalog_stats and the QUERY_GUIDE queries read
+    # it without a join. dir_id/name are the normalized form (migrations/011).
+    id = Column(BigIntId, primary_key=True)
+    path = Column(Text, nullable=False)  # Full path for reports and ad-hoc queries; look up by path_digest
+    path_digest = Column(BINARY(32), nullable=False, unique=True)  # SHA-256 of path, the lookup key
+    dir_id = Column(BigInteger)  # directories.id
+    name = Column(String(255))  # File name within the directory
     size = Column(BigInteger)
     mtime = Column(DateTime)
     hash = Column(String(128))
     metadata_only = Column(Boolean, default=False)  # True if file is too large to hash
     is_duplicate = Column(Boolean, default=False)
-    duplicate_of = Column(String(767))  # Match path length
+    duplicate_of = Column(BigInteger)  # files.id of the original (migrations/011)
+    verification = Column(String(16))  # Byte-level check: verified, mismatch, error, skipped
     scanned_at = Column(DateTime, default=datetime.utcnow)
     # Removed relationship - not needed since we query directly by file_id
 
+    __table_args__ = (
+        Index('idx_files_hash', 'hash'),  # Cross-run duplicate lookups (migrations/003)
+        Index('idx_files_dir', 'dir_id', 'name'),  # Directory listings (migrations/005)
+        Index('idx_files_size_hash', 'size', 'hash'),  # Size-first duplicate candidates (migrations/006)
+        Index('idx_files_is_duplicate', 'is_duplicate'),  # Duplicate listings and counts (migrations/006)
+    )
+
+
+# classifications.extension width; longer suffixes are cut (no rule lists one)
+EXTENSION_LENGTH = 64
+
 
 class Classification(Base):
     __tablename__ = 'classifications'
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(BigIntId, primary_key=True)
     file_id = Column(BigInteger)  # Removed ForeignKey constraint due to permission issues
     category = Column(String(255))
     owner = Column(String(255))
     year = Column(Integer)
     confidence = Column(Float)
+    rule_set = Column(String(64))  # Classifier rule set id ("<version>-<digest>", migrations/008)
+    matched_rule = Column(String(64))  # Rule that decided the category (core.classifier.match_path, migrations/009)
+    extension = Column(String(EXTENSION_LENGTH))  # Lowercased suffix, "" for none (migrations/009)
     classified_at = Column(DateTime, default=datetime.utcnow)
     # Removed relationship - not needed since we query directly by file_id
 
+    __table_args__ = (
+        Index('idx_classifications_file_id', 'file_id'),  # Per-file replace and stats joins (migrations/007)
+        # Rows a rule change affects, per rule set (migrations/009)
+        Index('idx_classifications_rule_set_extension', 'rule_set', 'extension'),
+        Index('idx_classifications_rule_set_rule', 'rule_set', 'matched_rule'),
+    )
+
+
+class ClassifierRuleSet(Base):
+    __tablename__ = 'classifier_rule_sets'
+
+    # Every rule set that classified rows, so later rules can be diffed against it (migrations/009)
+    id = Column(String(64), primary_key=True)  # classifications.rule_set
+    version = Column(String(64))
+    rules = Column(Text, nullable=False)  # The rule file's contents as JSON
+    recorded_at = Column(DateTime, default=datetime.utcnow)
+
 
 class Operation(Base):
     __tablename__ = 'operations'
 
-    id = Column(BigInteger, primary_key=True)
+    id = Column(BigIntId, primary_key=True)
     file_id = Column(BigInteger)  # Removed ForeignKey constraint due to permission issues
     action = Column(Enum('MOVE', 'DELETE', 'METADATA', name='action_enum'))
-    target_path = Column(String(767))  # Match path length
+    target_dir_id = Column(BigInteger)  # directories.id of the target (migrations/011)
+    target_name = Column(String(255))  # Target file name within that directory
     executed = Column(Boolean, default=False)
     executed_at = Column(DateTime)
 
+
+class HashJob(Base):
+    __tablename__ = 'hash_jobs'
+
+    id = Column(BigIntId, primary_key=True)
+    path = Column(Text, nullable=False)  # Any length, like files.path
+    path_digest = Column(BINARY(32), nullable=False, unique=True)  # SHA-256 of path, keyed like files (migrations/010)
+    status = Column(String(16), nullable=False, default='pending')  # pending, claimed, done, failed
+    claim_token = Column(String(36))  # Set atomically by the worker that claims the batch
+    claimed_by = Column(String(255))
+    claimed_at = Column(DateTime)
+    attempts = Column(Integer, default=0)
+    error = Column(Text)
+    enqueued_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime)
+
+    __table_args__ = (
+        Index('idx_hash_jobs_status', 'status', 'claimed_at'),  # Claim and lease-expiry scans (migrations/004)
+    )
+
+
+class CatalogStat(Base):
+    __tablename__ = 'catalog_stats'
+
+    # One row per (dimension, label), e.g. ('category', 'image') or ('year', '2019');
+    # kept current by every write path, see tracking_stats()
+    dimension = Column(String(16), primary_key=True)  # total, category, root, year
+    label = Column(String(255), primary_key=True)
+    file_count = Column(BigInteger, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    duplicate_count = Column(BigInteger, nullable=False, default=0)
+    duplicate_bytes = Column(BigInteger, nullable=False, default=0)
+
 # --- DB Logic ---
 
 def init_db():
-    Base.metadata.create_all(engine)
+    Base.metadata.create_all(get_engine())
+
+def path_digest(path):
+    """Fixed-width lookup key for a path: SHA-256 of its UTF-8 bytes (UNHEX(SHA2(path, 256)) in MySQL)."""
+    return hashlib.sha256(str(path).encode("utf-8", "surrogateescape")).digest()
+
+def split_path(path):
+    """(directory, name) of a path, split at the last '/' the same way migrations/005 does."""
+    directory, _, name = str(path).rpartition("/")
+    return directory or "/", name
+
+def file_row(row):
+    """Copy of a files row with its path_digest and name filled in from row["path"]."""
+    path = str(row["path"])
+    return dict(row, path=path, path_digest=path_digest(path), name=split_path(path)[1])
+
+def resolve_directories(session, rows, cache=None):
+    """
+    Set dir_id on file rows, inserting directories that are not stored yet.
+
+    Args:
+        session: Open session (the caller commits)
+        rows: File row dicts with a "path"
+        cache: Optional dict of directory path -> id reused across calls
+    """
+    cache = {} if cache is None else cache
+    needed = {split_path(row["path"])[0] for row in rows} - cache.keys()
+    if needed:
+        dir_rows = [{"path": directory, "path_digest": path_digest(directory)} for directory in needed]
+        upsert(session, Directory, dir_rows, ["path_digest"], ("path",))
+        by_digest = {row["path_digest"]: row["path"] for row in dir_rows}
+        ids = session.execute(select(Directory.path_digest, Directory.id)
+                              .where(Directory.path_digest.in_(list(by_digest))))
+        for digest, dir_id in ids:
+            cache[by_digest[digest]] = dir_id
+    for row in rows:
+        row["dir_id"] = cache[split_path(row["path"])[0]]
+
+def join_path(directory, name):
+    """Inverse of split_path(): the full path of name within directory."""
+    return f"/{name}" if directory == "/" else f"{directory}/{name}"
+
+def target_rows(session, rows, cache=None):
+    """
+    Copies of operations rows with target_path swapped for target_dir_id and
+    target_name, inserting target directories that are not stored yet.
+
+    Args:
+        session: Open session (the caller commits)
+        rows: Operation row dicts with a "target_path"
+        cache: Optional dict of directory path -> id reused across calls
+    """
+    targets = [{"path": str(row["target_path"])} for row in rows]
+    resolve_directories(session, targets, cache)
+    return [dict({k: v for k, v in row.items() if k != "target_path"},
+                 target_dir_id=target["dir_id"], target_name=split_path(target["path"])[1])
+            for row, target in zip(rows, targets)]
+
+def target_path(session, operation):
+    """Full target path of an Operation row (None when it has no target)."""
+    if operation.target_dir_id is None:
+        return None
+    directory = session.get(Directory, operation.target_dir_id)
+    return join_path(directory.path, operation.target_name)
+
+def file_ids(session, paths, batch_size=1000):
+    """Dictionary of path -> files.id for the given paths that are cataloged."""
+    by_digest = {path_digest(path): str(path) for path in paths}
+    digests = list(by_digest)
+    ids = {}
+    for start in range(0, len(digests), batch_size):
+        rows = session.execute(select(File.path_digest, File.id)
+                               .where(File.path_digest.in_(digests[start:start + batch_size])))
+        for digest, file_id in rows:
+            ids[by_digest[digest]] = file_id
+    return ids
+
+def _find_file(session, path):
+    return session.query(File).filter_by(path_digest=path_digest(path)).first()
+
+def _tracking_file(session, path):
+    return tracking_stats(session, File.path_digest == path_digest(path))
 
 def cache_file_entry(path, size, mtime, hash_val, metadata_only=False):
     with Session() as session:
-        file = session.query(File).filter_by(path=str(path)).first()
-        if not file:
-            file = File(path=str(path), size=size, mtime=mtime, hash=hash_val, metadata_only=metadata_only)
-        else:
-            file.hash = hash_val
-            file.size = size
-            file.mtime = mtime
-            file.metadata_only = metadata_only
-            file.scanned_at = datetime.utcnow()
-        session.add(file)
+        with _tracking_file(session, path):
+            file = _find_file(session, path)
+            if not file:
+                row = file_row({"path": path})
+                resolve_directories(session, [row])
+                file = File(**row, size=size, mtime=mtime, hash=hash_val, metadata_only=metadata_only)
+            else:
+                file.hash = hash_val
+                file.size = size
+                file.mtime = mtime
+                file.metadata_only = metadata_only
+                file.scanned_at = datetime.utcnow()
+            session.add(file)
         session.commit()
         return file
 
+class BatchWriter:
+    """
+    Buffer rows and write them to the database in multi-row statements.
+
+    A batch is flushed when it reaches batch_size rows or when a row is added
+    more than flush_interval seconds after the last flush (never, if None),
+    and always on close(). Rows are keyed so a later row for the same key is
+    merged over an earlier one in the same batch. Subclasses implement
+    _write(session, rows) and name their SPOOL_KIND. A batch that fails to
+    write is dropped and the error re-raised, unless the failure is a lost
+    connection and a spool is enabled: then the batch, and every later one,
+    is appended to the spool instead (see enable_spool()).
+
+    Use as a context manager so the last batch is flushed.
+    """
+
+    SPOOL_KIND = None
+
+    def __init__(self, batch_size=500, flush_interval=2.0):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.rows_spooled = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self._rows = {}
+        self._last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _add(self, key, row):
+        self._rows.setdefault(key, {}).update(row)
+        if len(self._rows) >= self.batch_size or (
+                self.flush_interval is not None and
+                time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write all buffered rows in one transaction; returns the row count."""
+        rows = list(self._rows.values())
+        self._rows = {}
+        self._last_flush = time.monotonic()
+        if not rows:
+            return 0
+        if spooling():
+            return self._spool_rows(rows)
+
+        start = time.monotonic()
+        try:
+            with Session() as session:
+                self._write(session, rows)
+                session.commit()
+        except CONNECTION_ERRORS as e:
+            if _spool is None:
+                raise
+            _spool.go_offline(e.orig or e)
+            return self._spool_rows(rows)
+        elapsed = time.monotonic() - start
+
+        self.rows_written += len(rows)
+        self.flushes += 1
+        self.flush_seconds += elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        logger.debug(f"Flushed {len(rows)} row(s) with {type(self).__name__}")
+        return len(rows)
+
+    @property
+    def pending(self):
+        """Rows buffered but not yet written."""
+        return len(self._rows)
+
+    def close(self):
+        self.flush()
+
+    def _spool_rows(self, rows):
+        _spool.write(self.SPOOL_KIND, rows)
+        self.rows_spooled += len(rows)
+        return len(rows)
+
+    def _write(self, session, rows):
+        raise NotImplementedError
+
+def upsert(session, model, rows, key_columns, update_columns, increment=False):
+    """
+    Multi-row INSERT that updates update_columns when key_columns already exist.
+
+    Uses INSERT ... ON DUPLICATE KEY UPDATE on MySQL and INSERT ... ON CONFLICT
+    DO UPDATE on SQLite; other dialects fall back to a per-row merge. With
+    increment=True the new values are added to the existing ones (counters).
+    """
+    dialect = session.get_bind().dialect.name
+    table = model.__table__
+
+    def updated(column, new_value):
+        return table.c[column] + new_value if increment else new_value
+
+    # Executed with the row list as parameters: the driver batches it (pymysql
+    # rewrites it to one multi-row VALUES list), which is far cheaper than
+    # compiling a statement with a VALUES clause per batch
+    if dialect == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(model)
+        stmt = stmt.on_duplicate_key_update({c: updated(c, stmt.inserted[c]) for c in update_columns})
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(model)
+        stmt = stmt.on_conflict_do_update(index_elements=key_columns,
+                                          set_={c: updated(c, stmt.excluded[c]) for c in update_columns})
+    else:
+        for row in rows:
+            existing = session.query(model).filter_by(**{k: row[k] for k in key_columns}).first()
+            if existing:
+                for column in update_columns:
+                    value = getattr(existing, column) + row[column] if increment else row[column]
+                    setattr(existing, column, value)
+            else:
+                session.add(model(**row))
+        return
+
+    session.execute(stmt, rows)
+
+class FileWriter(BatchWriter):
+    """
+    Batched replacement for cache_file_entry().
+
+    Rows are upserted on files.path_digest; an existing row gets its hash,
+    size, mtime, metadata_only and scanned_at refreshed, exactly like
+    cache_file_entry(), and keeps its duplicate and verification state.
+    New directories are inserted first and their ids cached for the
+    writer's lifetime. When a FileInfo is passed to add(), its file_id is
+    filled in after the batch is written (one SELECT of id per batch).
+    """
+
+    SPOOL_KIND = "files"
+    UPDATE_COLUMNS = ("size", "mtime", "hash", "metadata_only", "scanned_at")
+
+    def __init__(self, batch_size=500, flush_interval=2.0):
+        super().__init__(batch_size, flush_interval)
+        self._targets = {}
+        self._dir_ids = {}
+
+    def add(self, path, size, mtime, hash_val, metadata_only=False, file_info=None):
+        path = str(path)
+        self._add(path, {"path": path, "size": size, "mtime": mtime, "hash": hash_val,
+                         "metadata_only": metadata_only, "scanned_at": datetime.utcnow()})
+        if file_info is not None:
+            self._targets[path] = file_info
+
+    def _write(self, session, rows):
+        # Digests and dir ids are added to copies so a spooled batch stays plain JSON
+        rows = [file_row(row) for row in rows]
+        resolve_directories(session, rows, self._dir_ids)
+        with tracking_stats(session, File.path_digest.in_([row["path_digest"] for row in rows])):
+            upsert(session, File, rows, ["path_digest"], self.UPDATE_COLUMNS)
+
+        targets, self._targets = self._targets, {}
+        if targets:
+            for path, file_id in file_ids(session, targets, batch_size=len(targets)).items():
+                targets[path].file_id = file_id
+
+    def _spool_rows(self, rows):
+        # Spooled rows get no id; later stages spool by path instead
+        self._targets = {}
+        return super()._spool_rows(rows)
+
+class DuplicateWriter(BatchWriter):
+    """
+    Batched, id-keyed replacement for mark_duplicate(), clear_duplicate() and
+    save_verification().
+
+    Takes FileInfo objects and updates files rows by primary key in one
+    executemany per batch. A FileInfo without a file_id (its row was not
+    written this run) falls back to the path-keyed function, or is spooled
+    by path while the DB is unreachable.
+    """
+
+    SPOOL_KIND = "duplicates"
+
+    def __init__(self, batch_size=1000, flush_interval=None):
+        super().__init__(batch_size, flush_interval)
+
+    def _set(self, file_info, values, fallback):
+        if file_info.file_id is not None:
+            self._add(file_info.file_id, dict(values, id=file_info.file_id))
+        elif spooling():
+            path = str(file_info.path)
+            self._add(("path", path), dict(values, path=path))
+        else:
+            fallback()
+
+    def mark(self, file_info, duplicate_of, verification=None):
+        # Rows carry the original's path (plain JSON if spooled); _write swaps in its files.id
+        self._set(file_info, {"is_duplicate": True, "duplicate_of": str(duplicate_of), "verification": verification},
+                  lambda: mark_duplicate(str(file_info.path), str(duplicate_of), verification=verification))
+
+    def clear(self, file_info):
+        self._set(file_info, {"is_duplicate": False, "duplicate_of": None},
+                  lambda: clear_duplicate(str(file_info.path)))
+
+    def verification(self, file_info, verification):
+        values = {"verification": verification}
+        if verification != "verified":
+            values.update(is_duplicate=False, duplicate_of=None)
+        self._set(file_info, values, lambda: save_verification(str(file_info.path), verification))
+
+    def _write(self, session, rows):
+        originals = {row["duplicate_of"] for row in rows if isinstance(row.get("duplicate_of"), str)}
+        if originals:
+            ids = file_ids(session, originals, batch_size=len(originals))
+            for missing in originals - ids.keys():
+                logger.warning(f"⚠️ Original is not cataloged, duplicate_of left empty: {missing}")
+            rows = [dict(row, duplicate_of=ids.get(row["duplicate_of"]))
+                    if isinstance(row.get("duplicate_of"), str) else row for row in rows]
+
+        # Bulk UPDATE by primary key; rows with different column sets are grouped
+        with tracking_stats(session, File.id.in_([row["id"] for row in rows])):
+            session.execute(update(File), rows)
+
+class ClassificationWriter(BatchWriter):
+    """
+    Batched, id-keyed replacement for save_classification().
+
+    Each batch deletes the existing classifications of its files and inserts
+    the new rows, so every file keeps exactly one classification. A FileInfo
+    without a file_id falls back to save_classification(), or is spooled by
+    path while the DB is unreachable.
+    """
+
+    SPOOL_KIND = "classifications"
+
+    def __init__(self, batch_size=1000, flush_interval=None):
+        super().__init__(batch_size, flush_interval)
+
+    def add(self, file_info, category, owner=None, year=None, confidence=None, rule_set=None,
+            matched_rule=None, extension=None):
+        row = {"category": category, "owner": owner, "year": year, "confidence": confidence,
+               "rule_set": rule_set, "matched_rule": matched_rule,
+               "extension": None if extension is None else extension[:EXTENSION_LENGTH],
+               "classified_at": datetime.utcnow()}
+        if file_info.file_id is not None:
+            self._add(file_info.file_id, dict(row, file_id=file_info.file_id))
+        elif spooling():
+            path = str(file_info.path)
+            self._add(("path", path), dict(row, path=path))
+        else:
+            save_classification(file_info.path, category, owner=owner, year=year, confidence=confidence,
+                                rule_set=rule_set, matched_rule=matched_rule, extension=extension)
+
+    def _write(self, session, rows):
+        ids = [r["file_id"] for r in rows]
+        with tracking_stats(session, File.id.in_(ids)):
+            session.query(Classification).filter(Classification.file_id.in_(ids)).delete(synchronize_session=False)
+            session.execute(Classification.__table__.insert(), rows)
+
+class OperationWriter(BatchWriter):
+    """
+    Batched, id-keyed replacement for log_operation(); every call is a new row.
+    Target paths are stored as (target_dir_id, target_name), with new target
+    directories inserted and their ids cached for the writer's lifetime.
+
+    A FileInfo without a file_id falls back to log_operation(), or is spooled
+    by path while the DB is unreachable.
+    """
+
+    SPOOL_KIND = "operations"
+
+    def __init__(self, batch_size=1000, flush_interval=None):
+        super().__init__(batch_size, flush_interval)
+        self._sequence = 0
+        self._dir_ids = {}
+
+    def add(self, file_info, action, target_path):
+        row = {"action": action, "target_path": str(target_path)}
+        if file_info.file_id is not None:
+            row["file_id"] = file_info.file_id
+        elif spooling():
+            row["path"] = str(file_info.path)
+        else:
+            log_operation(file_info.path, action, target_path)
+            return
+        self._sequence += 1
+        self._add(self._sequence, row)
+
+    def _write(self, session, rows):
+        # Targets are kept as paths until written, so a spooled batch stays plain JSON
+        session.execute(Operation.__table__.insert(), target_rows(session, rows, self._dir_ids))
+
+# Shared background writer (None = writers flush inline on the calling thread)
+_write_behind = None
+
+def start_write_behind(max_queue=10000, idle_flush=2.0):
+    """
+    Route every writer opened with open_writer() through one background thread.
+
+    Installs SIGTERM/SIGHUP handlers and an atexit hook that flush the queue.
+
+    Args:
+        max_queue: Queued calls before callers block (backpressure)
+        idle_flush: Seconds without new calls before buffered rows are flushed
+
+    Returns:
+        The running WriteBehind
+    """
+    global _write_behind
+    from core.write_behind import WriteBehind, install_signal_handlers
+
+    if _write_behind is None:
+        _write_behind = WriteBehind(max_queue=max_queue, idle_flush=idle_flush)
+        install_signal_handlers()
+    return _write_behind
+
+def stop_write_behind():
+    """Drain and stop the background writer; returns its final metrics (or None)."""
+    global _write_behind
+    if _write_behind is None:
+        return None
+    write_behind, _write_behind = _write_behind, None
+    write_behind.close()
+    return write_behind.metrics()
+
+def open_writer(writer_cls, **kwargs):
+    """
+    Create a batch writer for one pipeline stage.
+
+    With write-behind running, calls on the returned writer are queued to the
+    background thread and close() waits only for this writer's last flush.
+    """
+    writer = writer_cls(**kwargs)
+    return _write_behind.wrap(writer) if _write_behind is not None else writer
+
+# Local spool for writer rows while the DB is unreachable (None = failed batches are dropped)
+_spool = None
+
+def enable_spool(path=None, offline_reason=None):
+    """
+    Spool batch writer rows to a local file if the database becomes unreachable.
+
+    Args:
+        path: Spool file (default: .file_dedup_spool.jsonl)
+        offline_reason: Start offline (e.g. init_db() already failed) with this reason
+
+    Returns:
+        The active Spool
+    """
+    global _spool
+    from core.spool import Spool, SPOOL_FILE
+
+    if _spool is None:
+        _spool = Spool(path or SPOOL_FILE)
+    if offline_reason is not None:
+        _spool.go_offline(offline_reason)
+    return _spool
+
+def disable_spool():
+    """Close the spool file; returns the number of rows spooled this run."""
+    global _spool
+    if _spool is None:
+        return 0
+    spool, _spool = _spool, None
+    spool.close()
+    return spool.rows
+
+def spooling():
+    """True once the DB was found unreachable and writer rows go to the spool."""
+    return _spool is not None and _spool.offline
+
+def _decode_row(model, row):
+    # The spool stores datetimes as ISO strings
+    for column in model.__table__.columns:
+        if isinstance(column.type, DateTime) and isinstance(row.get(column.name), str):
+            row[column.name] = datetime.fromisoformat(row[column.name])
+    return row
+
+def load_spool(path, batch_size=1000):
+    """
+    Replay a spool file into the database with multi-row statements.
+
+    File rows are deduplicated by path (later rows win) and upserted first,
+    so path-keyed duplicate, classification and operation rows can be
+    resolved to file ids. Duplicate marks are merged per file, the last
+    classification per file wins and operations are inserted in order.
+    Once everything is committed the file is renamed to <path>.loaded so
+    it is not replayed twice.
+
+    Args:
+        path: Spool file written by a run with enable_spool()
+        batch_size: Rows per statement
+
+    Returns:
+        Dictionary of rows loaded per kind, plus "unresolved" for rows whose
+        path is not in the files table
+    """
+    from pathlib import Path
+    from core.spool import read_spool
+
+    path = Path(path)
+    files, others = {}, []
+    for kind, row in read_spool(path):
+        if kind == FileWriter.SPOOL_KIND:
+            files.setdefault(row["path"], {}).update(_decode_row(File, row))
+        else:
+            others.append((kind, row))
+
+    counts = {"unresolved": 0}
+    with Session() as session:
+        rows = [file_row(row) for row in files.values()]
+        dir_ids = {}
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            resolve_directories(session, batch, dir_ids)
+            with tracking_stats(session, File.path_digest.in_([row["path_digest"] for row in batch])):
+                upsert(session, File, batch, ["path_digest"], FileWriter.UPDATE_COLUMNS)
+            session.commit()
+        counts[FileWriter.SPOOL_KIND] = len(rows)
+
+        ids = file_ids(session, {row["path"] for _, row in others if "path" in row}, batch_size)
+
+        duplicates, classifications, operations = {}, {}, []
+        for kind, row in others:
+            if "path" in row:
+                file_id = ids.get(row.pop("path"))
+                if file_id is None:
+                    counts["unresolved"] += 1
+                    continue
+                row["id" if kind == DuplicateWriter.SPOOL_KIND else "file_id"] = file_id
+
+            if kind == DuplicateWriter.SPOOL_KIND:
+                duplicates.setdefault(row["id"], {}).update(row)
+            elif kind == ClassificationWriter.SPOOL_KIND:
+                classifications[row["file_id"]] = _decode_row(Classification, row)
+            elif kind == OperationWriter.SPOOL_KIND:
+                operations.append(row)
+            else:
+                logger.warning(f"⚠️ Skipping spooled row of unknown kind: {kind}")
+
+        for writer_cls, rows in ((DuplicateWriter, list(duplicates.values())),
+                                 (ClassificationWriter, list(classifications.values())),
+                                 (OperationWriter, operations)):
+            writer = writer_cls()
+            for start in range(0, len(rows), batch_size):
+                writer._write(session, rows[start:start + batch_size])
+                session.commit()
+            counts[writer_cls.SPOOL_KIND] = len(rows)
+
+    path.replace(path.with_name(path.name + ".loaded"))
+    return counts
+
 def get_cached_hash(path, mtime):
     with Session() as session:
-        file = session.query(File).filter_by(path=str(path)).first()
+        file = _find_file(session, path)
         if file and file.mtime == mtime:
             return file.hash
         return None
 
-def mark_duplicate(file_path, duplicate_of):
+def mark_duplicate(file_path, duplicate_of, verification=None):
+    """Mark a file as a duplicate of the file at path duplicate_of (stored as its files.id)."""
     with Session() as session:
-        file = session.query(File).filter_by(path=str(file_path)).first()
-        if file:
-            file.is_duplicate = True
-            file.duplicate_of = duplicate_of
-            session.commit()
+        with _tracking_file(session, file_path):
+            file = _find_file(session, file_path)
+            if file:
+                original = _find_file(session, duplicate_of)
+                if original is None:
+                    logger.warning(f"⚠️ Original is not cataloged, duplicate_of left empty: {duplicate_of}")
+                file.is_duplicate = True
+                file.duplicate_of = original.id if original else None
+                file.verification = verification
+        session.commit()
+
+def clear_duplicate(file_path):
+    """Mark a file as an original again (e.g. when a different copy is chosen as duplicate)."""
+    with Session() as session:
+        with _tracking_file(session, file_path):
+            file = _find_file(session, file_path)
+            if file:
+                file.is_duplicate = False
+                file.duplicate_of = None
+        session.commit()
+
+def save_verification(file_path, verification):
+    """Record the byte-level verification result; only "verified" keeps a duplicate mark."""
+    with Session() as session:
+        with _tracking_file(session, file_path):
+            file = _find_file(session, file_path)
+            if file:
+                file.verification = verification
+                if verification != "verified":
+                    file.is_duplicate = False
+                    file.duplicate_of = None
+        session.commit()
 
 def log_operation(file_path, action, target_path):
     with Session() as session:
-        file = session.query(File).filter_by(path=str(file_path)).first()
+        file = _find_file(session, file_path)
         if file:
-            op = Operation(file_id=file.id, action=action, target_path=str(target_path))
-            session.add(op)
+            (row,) = target_rows(session, [{"file_id": file.id, "action": action, "target_path": target_path}])
+            session.add(Operation(**row))
             session.commit()
 
-def save_classification(file_path, category, owner=None, year=None, confidence=None):
-    """Save or update file classification in database."""
+def save_classification(file_path, category, owner=None, year=None, confidence=None, rule_set=None,
+                        matched_rule=None, extension=None):
+    """
+    Save or update file classification in database.
+
+    rule_set is the classifier rule set id, matched_rule the rule that decided
+    the category and extension the file's lowercased suffix.
+    """
+    if extension is not None:
+        extension = extension[:EXTENSION_LENGTH]
     with Session() as session:
-        file = session.query(File).filter_by(path=str(file_path)).first()
-        if file:
-            # Check if classification already exists
-            classification = session.query(Classification).filter_by(file_id=file.id).first()
-            if not classification:
-                classification = Classification(
-                    file_id=file.id,
-                    category=category,
-                    owner=owner,
-                    year=year,
-                    confidence=confidence
-                )
-                session.add(classification)
+        with _tracking_file(session, file_path):
+            file = _find_file(session, file_path)
+            if file:
+                # Check if classification already exists
+                classification = session.query(Classification).filter_by(file_id=file.id).first()
+                if not classification:
+                    classification = Classification(
+                        file_id=file.id,
+                        category=category,
+                        owner=owner,
+                        year=year,
+                        confidence=confidence,
+                        rule_set=rule_set,
+                        matched_rule=matched_rule,
+                        extension=extension
+                    )
+                    session.add(classification)
+                else:
+                    # Update existing classification
+                    classification.category = category
+                    classification.owner = owner
+                    classification.year = year
+                    classification.confidence = confidence
+                    classification.rule_set = rule_set
+                    classification.matched_rule = matched_rule
+                    classification.extension = extension
+                    classification.classified_at = datetime.utcnow()
+        session.commit()
+
+# --- Classifier rule sets ---
+
+def save_rule_set(rule_set_id, version, rules):
+    """Record a classifier rule set (rules: its JSON) unless it is already stored."""
+    with Session() as session:
+        if session.get(ClassifierRuleSet, rule_set_id) is None:
+            session.add(ClassifierRuleSet(id=rule_set_id, version=version, rules=rules))
+            session.commit()
+
+def load_rule_set(rule_set_id):
+    """The rule file contents recorded for rule_set_id, or None if it was never recorded."""
+    import json
+
+    with Session() as session:
+        rules = session.execute(select(ClassifierRuleSet.rules)
+                                .where(ClassifierRuleSet.id == rule_set_id)).scalar()
+    return json.loads(rules) if rules is not None else None
+
+def classification_rule_sets():
+    """
+    Classification counts per rule set id (None for rows written before rule sets were stored).
+
+    Returns:
+        Dictionary of rule set id -> number of classifications
+    """
+    with Session() as session:
+        rows = session.execute(select(Classification.rule_set, func.count())
+                               .group_by(Classification.rule_set)).all()
+    return {rule_set: count for rule_set, count in rows}
+
+def affected_classifications(extensions, matched_rules):
+    """
+    SQL condition for classifications a rule change may affect (see core.classifier.diff_rules).
+
+    Rows with one of the extensions or matched rules, plus rows written
+    before matched_rule was stored, which can't be narrowed down.
+    """
+    return or_(Classification.extension.in_(list(extensions)),
+               Classification.matched_rule.in_(list(matched_rules)),
+               Classification.matched_rule.is_(None))
+
+def stamp_rule_set(old_rule_set, new_rule_set, extensions, matched_rules):
+    """
+    Move classifications a rule change does not affect to the new rule set id.
+
+    Rows of old_rule_set whose extension is not in extensions and whose
+    matched rule is not in matched_rules would be classified the same by the
+    new rules, so only their rule_set changes (one indexed UPDATE). Affected
+    rows keep old_rule_set until they are reclassified.
+
+    Returns:
+        Number of rows updated
+    """
+    with Session() as session:
+        result = session.execute(update(Classification)
+                                 .where(Classification.rule_set == old_rule_set,
+                                        ~affected_classifications(extensions, matched_rules))
+                                 .values(rule_set=new_rule_set)
+                                 .execution_options(synchronize_session=False))
+        session.commit()
+    return result.rowcount
+
+# Rules for picking the original among catalog rows that share a hash
+ORIGINAL_RULES = ("first_seen", "oldest_mtime")
+
+def find_catalog_originals(hashes, rule="first_seen", batch_size=1000, exclude_ids=()):
+    """
+    Look up the catalog original for each hash, a batch of hashes per query.
+
+    The aggregation runs in the database against idx_files_hash, so only one
+    row per hash comes back no matter how many copies are cataloged.
+
+    Args:
+        hashes: Iterable of content hashes
+        rule: "first_seen" (lowest id) or "oldest_mtime" (earliest mtime, ties by id)
+        batch_size: Number of hashes per query
+        exclude_ids: File ids that can't be the original (e.g. no longer on disk)
+
+    Returns:
+        Dictionary mapping hash -> (file_id, path) of the original
+    """
+    if rule not in ORIGINAL_RULES:
+        raise ValueError(f"Unknown original rule: {rule}. Use one of: {', '.join(ORIGINAL_RULES)}")
+
+    hashes = list(hashes)
+    exclude_ids = list(exclude_ids)
+    originals = {}
+
+    with Session() as session:
+        for start in range(0, len(hashes), batch_size):
+            batch = hashes[start:start + batch_size]
+            candidates = File.hash.in_(batch)
+            if exclude_ids:
+                candidates = candidates & File.id.not_in(exclude_ids)
+            first_seen = (select(File.hash, func.min(File.id).label("id"))
+                          .where(candidates)
+                          .group_by(File.hash))
+
+            if rule == "oldest_mtime":
+                oldest = (select(File.hash, func.min(File.mtime).label("mtime"))
+                          .where(candidates)
+                          .group_by(File.hash)
+                          .subquery())
+                ids = dict(session.execute(
+                    select(File.hash, func.min(File.id))
+                    .join(oldest, (File.hash == oldest.c.hash) & (File.mtime == oldest.c.mtime))
+                    .where(candidates)
+                    .group_by(File.hash)).all())
+                # Rows without an mtime fall back to first seen
+                missing = [h for h in batch if h not in ids]
+                if missing:
+                    ids.update(session.execute(first_seen.where(File.hash.in_(missing))).all())
             else:
-                # Update existing classification
-                classification.category = category
-                classification.owner = owner
-                classification.year = year
-                classification.confidence = confidence
-                classification.classified_at = datetime.utcnow()
+                ids = dict(session.execute(first_seen).all())
+
+            if not ids:
+                continue
+
+            paths = dict(session.execute(select(File.id, File.path).where(File.id.in_(list(ids.values())))).all())
+            for hash_val, file_id in ids.items():
+                originals[hash_val] = (file_id, paths[file_id])
+
+    return originals
+
+def iter_catalog_duplicate_groups(batch_size=1000):
+    """
+    Stream every group of cataloged files that share a content hash.
+
+    The duplicate hashes come from a GROUP BY hash HAVING COUNT(*) > 1 that
+    MySQL answers from idx_files_hash alone, read through a streaming
+    (server-side) cursor. The members of each batch of hashes are then
+    fetched with one indexed IN query on a second connection, so only one
+    batch of groups is in memory at a time. Metadata-only rows are skipped.
+
+    Args:
+        batch_size: Duplicate hashes per member query
+
+    Yields:
+        (hash, rows) with rows as (file_id, path, size, mtime, is_duplicate) tuples in id order
+    """
+    duplicate_hashes = (select(File.hash)
+                        .where(File.hash.isnot(None), File.hash != "METADATA_ONLY")
+                        .group_by(File.hash)
+                        .having(func.count() > 1))
+
+    with Session() as group_session, Session() as member_session:
+        result = group_session.execute(duplicate_hashes, execution_options={"yield_per": batch_size})
+        for partition in result.partitions():
+            hashes = [row[0] for row in partition]
+            members = defaultdict(list)
+            rows = member_session.execute(
+                select(File.hash, File.id, File.path, File.size, File.mtime, File.is_duplicate)
+                .where(File.hash.in_(hashes))
+                .order_by(File.id))
+            for row in rows:
+                members[row[0]].append(tuple(row[1:]))
+            for hash_val in hashes:
+                yield hash_val, members[hash_val]
+
+# --- Catalog statistics ---
+
+# catalog_stats dimensions; "total" has one row, with an empty label
+STATS_DIMENSIONS = ("total", "category", "root", "year")
+STATS_COLUMNS = ("file_count", "total_bytes", "duplicate_count", "duplicate_bytes")
+
+# Files are counted under the first STATS_ROOT_DEPTH directories of their path
+# (e.g. /Volumes/Backup/Photos); run rebuild_catalog_stats() after changing it
+STATS_ROOT_DEPTH = 3
+
+def stats_root(path):
+    """Root folder a path is counted under in catalog_stats."""
+    directory = split_path(path)[0]
+    depth = STATS_ROOT_DEPTH + 1 if directory.startswith("/") else STATS_ROOT_DEPTH
+    return "/".join(directory.split("/")[:depth]) or "/"
+
+def _stats_labels(path, mtime, category, year):
+    # Unclassified files fall back to their mtime year
+    if not year and mtime is not None:
+        year = mtime.year
+    return (("total", ""),
+            ("category", (category or "Unclassified")[:255]),
+            ("root", stats_root(path)[:255]),
+            ("year", str(year) if year else "unknown"))
+
+def stats_contributions(session, condition=None, batch_size=None):
+    """
+    What the files matching condition add to catalog_stats.
+
+    Args:
+        session: Open session (sees its own uncommitted writes)
+        condition: Filter on File (None = the whole catalog)
+        batch_size: Stream the rows with this many per fetch (for full scans)
+
+    Returns:
+        Dictionary mapping (dimension, label) -> [file_count, total_bytes, duplicate_count, duplicate_bytes]
+    """
+    query = (select(File.path, File.mtime, File.size, File.is_duplicate, Classification.category, Classification.year)
+             .outerjoin(Classification, Classification.file_id == File.id))
+    if condition is not None:
+        query = query.where(condition)
+    options = {"yield_per": batch_size} if batch_size else {}
+
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    # Core rows on the session's connection: no ORM result processing per batch
+    rows = session.connection().execute(query, execution_options=options)
+    for path, mtime, size, is_duplicate, category, year in rows:
+        size = size or 0
+        for key in _stats_labels(path, mtime, category, year):
+            counts = totals[key]
+            counts[0] += 1
+            counts[1] += size
+            if is_duplicate:
+                counts[2] += 1
+                counts[3] += size
+    return totals
+
+def _stats_rows(totals):
+    # Sorted so concurrent writers lock catalog_stats rows in the same order
+    return [dict(zip(STATS_COLUMNS, totals[key]), dimension=key[0], label=key[1]) for key in sorted(totals)]
+
+def apply_stats_delta(session, before, after):
+    """Add the difference between two stats_contributions() results to catalog_stats."""
+    delta = {}
+    for key in set(before) | set(after):
+        change = [new - old for new, old in zip(after.get(key, (0, 0, 0, 0)), before.get(key, (0, 0, 0, 0)))]
+        if any(change):
+            delta[key] = change
+    if delta:
+        upsert(session, CatalogStat, _stats_rows(delta), ["dimension", "label"], STATS_COLUMNS, increment=True)
+    return len(delta)
+
+@contextmanager
+def tracking_stats(session, condition):
+    """
+    Keep catalog_stats current across a block that writes the files matching condition.
+
+    The block's files are summarized before and after it, in the same
+    transaction, and only the difference is added to catalog_stats: two
+    indexed SELECTs per batch, however large the catalog is.
+    """
+    before = stats_contributions(session, condition)
+    yield
+    session.flush()
+    apply_stats_delta(session, before, stats_contributions(session, condition))
+
+def rebuild_catalog_stats(batch_size=10000):
+    """
+    Recompute catalog_stats from the files and classifications tables.
+
+    For repair, for catalogs written before the table existed, and after
+    changing STATS_ROOT_DEPTH. Streams the catalog once; run it while no
+    pipeline is writing.
+
+    Returns:
+        Number of catalog_stats rows written
+    """
+    with Session() as session:
+        rows = _stats_rows(stats_contributions(session, batch_size=batch_size))
+        session.query(CatalogStat).delete(synchronize_session=False)
+        for start in range(0, len(rows), batch_size):
+            session.execute(CatalogStat.__table__.insert(), rows[start:start + batch_size])
+        session.commit()
+    return len(rows)
+
+def catalog_stats(dimension=None):
+    """
+    Read the summary rows, largest duplicate_bytes first within each dimension.
+
+    Args:
+        dimension: One of STATS_DIMENSIONS, or None for all of them
+
+    Returns:
+        List of dicts with dimension, label and the STATS_COLUMNS counts
+    """
+    if dimension is not None and dimension not in STATS_DIMENSIONS:
+        raise ValueError(f"Unknown stats dimension: {dimension}. Use one of: {', '.join(STATS_DIMENSIONS)}")
+
+    query = select(CatalogStat).where(CatalogStat.file_count > 0)
+    if dimension is not None:
+        query = query.where(CatalogStat.dimension == dimension)
+    with Session() as session:
+        rows = [{"dimension": stat.dimension, "label": stat.label,
+                 **{column: getattr(stat, column) for column in STATS_COLUMNS}}
+                for stat in session.execute(query).scalars()]
+    order = {name: i for i, name in enumerate(STATS_DIMENSIONS)}
+    return sorted(rows, key=lambda r: (order[r["dimension"]], -r["duplicate_bytes"], -r["total_bytes"], r["label"]))
+
+# --- Distributed hashing work queue ---
+
+# hash_jobs.status values
+JOB_PENDING = "pending"
+JOB_CLAIMED = "claimed"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+def enqueue_hash_jobs(paths, batch_size=1000):
+    """
+    Add paths to the hash_jobs queue; paths already queued are left alone.
+
+    Args:
+        paths: Iterable of paths to hash
+        batch_size: Paths checked and inserted per transaction
+
+    Returns:
+        Number of new jobs queued
+    """
+    paths = [str(p) for p in paths]
+    queued = 0
+
+    with Session() as session:
+        for start in range(0, len(paths), batch_size):
+            batch = {path_digest(p): p for p in paths[start:start + batch_size]}
+            existing = set(session.execute(
+                select(HashJob.path_digest).where(HashJob.path_digest.in_(list(batch)))).scalars())
+            new_jobs = [HashJob(path=p, path_digest=digest, status=JOB_PENDING)
+                        for digest, p in batch.items() if digest not in existing]
+            session.add_all(new_jobs)
             session.commit()
+            queued += len(new_jobs)
+
+    return queued
+
+def claim_hash_jobs(worker, batch_size=100, path_prefix=None):
+    """
+    Atomically claim a batch of pending jobs for one worker.
+
+    Candidates are selected first, then stamped with a fresh claim token by an
+    UPDATE that still requires status = pending. When two workers race for the
+    same rows only one UPDATE matches each row, so every job is claimed once;
+    the loser simply gets a smaller (possibly empty) batch.
+
+    Args:
+        worker: Worker name stored in claimed_by (e.g. host:pid)
+        batch_size: Maximum jobs to claim
+        path_prefix: Only claim paths under this prefix (the part of the tree
+                     this worker can reach quickly)
+
+    Returns:
+        (claim_token, [(job_id, path), ...])
+    """
+    token = uuid.uuid4().hex
+    now = datetime.utcnow()
+
+    with Session() as session:
+        candidates = select(HashJob.id).where(HashJob.status == JOB_PENDING)
+        if path_prefix:
+            candidates = candidates.where(HashJob.path.startswith(str(path_prefix), autoescape=True))
+        ids = list(session.execute(candidates.order_by(HashJob.id).limit(batch_size)).scalars())
+        if not ids:
+            return token, []
+
+        session.execute(
+            update(HashJob)
+            .where(HashJob.id.in_(ids), HashJob.status == JOB_PENDING)
+            .values(status=JOB_CLAIMED, claim_token=token, claimed_by=worker,
+                    claimed_at=now, attempts=HashJob.attempts + 1)
+        )
+        session.commit()
+
+        claimed = session.execute(
+            select(HashJob.id, HashJob.path).where(HashJob.claim_token == token).order_by(HashJob.id)
+        ).all()
+
+    return token, [tuple(row) for row in claimed]
+
+def complete_hash_jobs(token, results, failures=None):
+    """
+    Write a claimed batch's hashes to files and close its jobs in one transaction.
+
+    Only jobs still held by this claim token are written: if the lease expired
+    and another worker reclaimed a job, this worker's result for it is dropped.
+
+    Args:
+        token: Claim token returned by claim_hash_jobs()
+        results: Iterable of (path, size, mtime, hash, metadata_only)
+        failures: Optional dict of path -> error message for unreadable paths
+
+    Returns:
+        Number of file rows written
+    """
+    failures = failures or {}
+    now = datetime.utcnow()
+
+    with Session() as session:
+        held = set(session.execute(
+            select(HashJob.path).where(HashJob.claim_token == token, HashJob.status == JOB_CLAIMED)
+        ).scalars())
+
+        results = [r for r in results if str(r[0]) in held]
+        paths = [str(r[0]) for r in results]
+
+        if paths:
+            rows = [file_row({"path": path, "size": size, "mtime": mtime, "hash": hash_val,
+                              "metadata_only": metadata_only, "scanned_at": now})
+                    for path, size, mtime, hash_val, metadata_only in results]
+            resolve_directories(session, rows)
+            with tracking_stats(session, File.path_digest.in_([row["path_digest"] for row in rows])):
+                upsert(session, File, rows, ["path_digest"], FileWriter.UPDATE_COLUMNS)
+            session.execute(
+                update(HashJob)
+                .where(HashJob.claim_token == token, HashJob.path_digest.in_([row["path_digest"] for row in rows]))
+                .values(status=JOB_DONE, completed_at=now, error=None)
+            )
+        for path, error in failures.items():
+            session.execute(
+                update(HashJob)
+                .where(HashJob.claim_token == token, HashJob.path_digest == path_digest(path))
+                .values(status=JOB_FAILED, completed_at=now, error=str(error)[:1000])
+            )
+        session.commit()
+
+    return len(results)
+
+def reclaim_expired_hash_jobs(lease_seconds, max_attempts=3):
+    """
+    Return jobs whose claim lease ran out to the queue.
+
+    Jobs that already used max_attempts claims are marked failed instead, so a
+    path that crashes workers can't cycle forever.
+
+    Args:
+        lease_seconds: How long a claim stays valid
+        max_attempts: Claims allowed before a job is given up on
+
+    Returns:
+        (requeued, failed) job counts
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=lease_seconds)
+    expired = (HashJob.status == JOB_CLAIMED, HashJob.claimed_at < cutoff)
+
+    with Session() as session:
+        failed = session.execute(
+            update(HashJob)
+            .where(*expired, HashJob.attempts >= max_attempts)
+            .values(status=JOB_FAILED, error="claim lease expired too many times")
+        ).rowcount
+        requeued = session.execute(
+            update(HashJob)
+            .where(*expired)
+            .values(status=JOB_PENDING, claim_token=None, claimed_by=None, claimed_at=None)
+        ).rowcount
+        session.commit()
+
+    return requeued, failed
+
+def hash_job_counts():
+    """Number of hash_jobs rows per status."""
+    with Session() as session:
+        counts = dict(session.execute(select(HashJob.status, func.count()).group_by(HashJob.status)).all())
+    return {status: counts.get(status, 0) for status in (JOB_PENDING, JOB_CLAIMED, JOB_DONE, JOB_FAILED)}
+
+def load_hashed_jobs():
+    """
+    Catalog rows for every completed job, in enqueue order.
+
+    Returns:
+        List of (file_id, path, size, hash) tuples
+    """
+    with Session() as session:
+        paths = list(session.execute(
+            select(HashJob.path).where(HashJob.status == JOB_DONE).order_by(HashJob.id)
+        ).scalars())
+        # files.path is not indexed; match jobs to files through path_digest
+        files = {}
+        for start in range(0, len(paths), 1000):
+            digests = [path_digest(path) for path in paths[start:start + 1000]]
+            for row in session.execute(select(File.path_digest, File.id, File.path, File.size, File.hash)
+                                       .where(File.path_digest.in_(digests))):
+                files[row[0]] = tuple(row[1:])
+    return [files[digest] for digest in map(path_digest, paths) if digest in files]
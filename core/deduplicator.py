@@ -12,78 +12,524 @@
 # Author: Tim Canady
 # Created: 2025-11-13
 #
-# Version: 0.7.1
-# Last Modified: 2025-11-13 by Tim Canady
+# Version: 0.15.2
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.15.2 (2026-10-19): Cross-run dedup validates verify, skips catalog originals gone from disk — Tim Canady
+# - 0.15.1 (2026-10-19): With --verify bytes, only byte-confirmed members are marked — Tim Canady
+# - 0.15.0 (2026-10-19): Added iter_db_duplicates for catalog-wide, set-based detection (--db-dedup) — Tim Canady
+# - 0.14.1 (2026-10-18): Writers opened through open_writer so they can run write-behind — Tim Canady
+# - 0.14.0 (2026-10-18): DB marks go through the batched, id-keyed DuplicateWriter — Tim Canady
+# - 0.13.0 (2026-10-18): Split per-group marking into mark_duplicate_group for external-memory dedup — Tim Canady
+# - 0.12.0 (2026-10-18): Group hashes through a compact DigestIndex instead of a dict of lists — Tim Canady
+# - 0.11.0 (2026-10-18): report_duplicates streams through core.report_writer — Tim Canady
+# - 0.10.0 (2026-10-18): Report duplicate directories as single entries — Tim Canady
+# - 0.9.0 (2026-10-18): Added cross-run duplicate detection against the DB catalog — Tim Canady
+# - 0.8.0 (2026-10-18): Added byte-for-byte verification mode (--verify bytes) — Tim Canady
+# - 0.7.1 (2025-11-13): Initial duplicate detection — Tim Canady
 ###################################################################
 
 import logging
+import os
+from array import array
 from collections import defaultdict
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 from models.file_info import FileInfo
+from models.directory_group import DirectoryGroup
+from core.hasher import CHUNK_SIZE
+from core.digest_index import DigestIndex
+
+# Verification modes accepted by detect_duplicates(verify=...)
+VERIFY_MODES = ("bytes",)
+
+# Verification status values stored on FileInfo.verification and in the DB
+VERIFIED = "verified"
+MISMATCH = "mismatch"
+VERIFY_ERROR = "error"
+VERIFY_SKIPPED = "skipped"
+
+# Upper bound on files held open at once while comparing a single group
+VERIFY_MAX_OPEN_FILES = 64
 
-def detect_duplicates(files: List[FileInfo], use_db: bool = False) -> List[FileInfo]:
+# Lookups per hash while cataloged originals turn out to be gone from disk
+CATALOG_REPICK_ROUNDS = 3
+
+
+def _compare_against_reference(reference: FileInfo, members: List[FileInfo]) -> Dict[int, str]:
     """
-    Detect duplicate files based on hash comparison.
+    Stream the reference and members in lockstep, chunk by chunk.
+
+    Members drop out on their first differing chunk, and reading stops as soon
+    as no member is left to compare, so mismatches rarely read whole files.
+
+    Returns:
+        Dictionary mapping id(member) to its verification status
+    """
+    results = {}
+    handles = {}
+
+    try:
+        ref_handle = open(reference.path, "rb")
+    except OSError as e:
+        logging.warning(f"   ⚠️ Cannot open original for verification: {reference.path}: {e}")
+        return {id(m): VERIFY_ERROR for m in members}
+
+    try:
+        for member in members:
+            try:
+                handles[id(member)] = (member, open(member.path, "rb"))
+            except OSError as e:
+                logging.warning(f"   ⚠️ Cannot open duplicate for verification: {member.path}: {e}")
+                results[id(member)] = VERIFY_ERROR
+
+        while handles:
+            ref_chunk = ref_handle.read(CHUNK_SIZE)
+
+            for key, (member, handle) in list(handles.items()):
+                if handle.read(CHUNK_SIZE) != ref_chunk:
+                    results[key] = MISMATCH
+                    handle.close()
+                    del handles[key]
+
+            # Reference exhausted: every member still open matched to EOF
+            if not ref_chunk:
+                for key in handles:
+                    results[key] = VERIFIED
+                break
+    finally:
+        ref_handle.close()
+        for _, handle in handles.values():
+            handle.close()
+
+    return results
+
+
+def verify_group_bytes(file_list: List[FileInfo]) -> Dict[int, str]:
+    """
+    Byte-for-byte verification of a duplicate group against its original.
+
+    The first file in the group is the reference. Members are compared in
+    batches of VERIFY_MAX_OPEN_FILES so huge groups don't exhaust file handles.
+
+    Args:
+        file_list: Files sharing the same hash (original first)
+
+    Returns:
+        Dictionary mapping id(FileInfo) to its verification status
+    """
+    original, members = file_list[0], file_list[1:]
+    results = {}
+
+    # Atomic packages are hashed as directories and have no single byte stream
+    if original.path.is_dir():
+        for member in file_list:
+            results[id(member)] = VERIFY_SKIPPED
+        return results
+
+    for start in range(0, len(members), VERIFY_MAX_OPEN_FILES):
+        batch = members[start:start + VERIFY_MAX_OPEN_FILES]
+        results.update(_compare_against_reference(original, batch))
+
+    # The original is confirmed once any member matched it byte-for-byte
+    member_results = [results[id(m)] for m in members]
+    if VERIFIED in member_results:
+        results[id(original)] = VERIFIED
+    elif VERIFY_ERROR in member_results:
+        results[id(original)] = VERIFY_ERROR
+    return results
+
+
+def verify_duplicate_groups(groups: List[List[FileInfo]], max_workers: Optional[int] = None) -> Dict[int, str]:
+    """
+    Verify many duplicate groups in parallel (one group per worker at a time).
+
+    Args:
+        groups: Duplicate groups, each with the original first
+        max_workers: Thread count (default: min(8, CPU count))
+
+    Returns:
+        Dictionary mapping id(FileInfo) to its verification status
+    """
+    if not groups:
+        return {}
+
+    max_workers = max_workers or min(8, os.cpu_count() or 1)
+    results = {}
+
+    logging.info(f"🔬 Verifying {len(groups)} duplicate group(s) byte-for-byte ({max_workers} workers)...")
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for group_results in pool.map(verify_group_bytes, groups):
+            results.update(group_results)
+
+    return results
+
+
+def hash_groups(files: List[FileInfo]) -> List[List[int]]:
+    """
+    Positions of files sharing a content hash, grouped via a DigestIndex.
+
+    Metadata-only files are skipped. Only groups of two or more are returned,
+    in discovery order (by first member), each in list order so the first
+    position is the file seen first.
 
     Args:
         files: List of FileInfo objects with hashes
-        use_db: If True, mark duplicates in database
 
     Returns:
-        List of FileInfo objects with duplicates marked (is_duplicate=True)
+        List of position lists into files
     """
-    # Group files by hash
-    hash_groups = defaultdict(list)
+    index = DigestIndex()
+    positions = array("L")
+    for position, file_info in enumerate(files):
+        if file_info.hash and file_info.hash != "METADATA_ONLY":
+            index.add(file_info.hash)
+            positions.append(position)
 
-    for file_info in files:
-        # Skip metadata-only files (no hash)
-        if file_info.hash == "METADATA_ONLY":
-            continue
+    return [[positions[entry] for entry in group] for group in index.groups()]
 
-        hash_groups[file_info.hash].append(file_info)
 
-    # Mark duplicates
-    duplicate_count = 0
-    unique_count = 0
+def open_duplicate_writer(use_db: bool):
+    """A batched DuplicateWriter when the database is enabled, else None."""
+    if not use_db:
+        return None
+    from core.db import DuplicateWriter, open_writer
+    return open_writer(DuplicateWriter)
 
-    for hash_value, file_list in hash_groups.items():
-        if len(file_list) > 1:
-            # Multiple files with same hash = duplicates
-            # Keep first file as original, mark others as duplicates
-            original = file_list[0]
-            duplicates = file_list[1:]
 
-            unique_count += 1
-            duplicate_count += len(duplicates)
+def close_duplicate_writer(db_writer) -> None:
+    """Flush a stage's remaining duplicate marks (no-op without a writer)."""
+    if db_writer is None:
+        return
+    try:
+        db_writer.close()
+        logging.info(f"💾 Saved {db_writer.rows_written} duplicate mark(s) to DB in {db_writer.flushes} batch(es)")
+    except Exception as e:
+        logging.warning(f"   ⚠️ Failed to mark duplicates in DB: {e}")
+
 
-            logging.info(f"\n🔍 Found {len(duplicates)} duplicate(s) of: {original.path.name}")
-            logging.info(f"   Hash: {hash_value[:16]}...")
-            logging.info(f"   Original: {original.path}")
+def mark_duplicate_group(file_list: List[FileInfo], verification: Dict[int, str],
+                         db_writer=None) -> Tuple[int, int]:
+    """
+    Mark one hash group: the first file is the original, the rest duplicates.
 
-            for dup_file in duplicates:
-                dup_file.is_duplicate = True
-                dup_file.original_path = original.path
+    When the group was verified, only members with a VERIFIED status are
+    marked; the others keep their status and are left unmarked.
 
-                logging.info(f"   Duplicate: {dup_file.path}")
+    Args:
+        file_list: Files sharing the same hash (original first)
+        verification: id(FileInfo) -> verification status (empty if not verified)
+        db_writer: DuplicateWriter to queue database marks on (None = no DB)
 
-                # Mark in database if enabled
-                if use_db:
-                    try:
-                        from core.db import mark_duplicate
-                        mark_duplicate(str(dup_file.path), str(original.path))
-                    except Exception as e:
-                        logging.warning(f"   ⚠️ Failed to mark duplicate in DB: {e}")
+    Returns:
+        (duplicates marked, byte-level mismatches)
+    """
+    # Keep first file as original, mark others as duplicates
+    original = file_list[0]
+    original.verification = verification.get(id(original))
+
+    # With verification on, only byte-confirmed members are duplicates;
+    # mismatches are hash collisions and errored/skipped members stay unmarked
+    duplicates = [f for f in file_list[1:] if verification.get(id(f)) in (None, VERIFIED)]
+    mismatches = [f for f in file_list[1:] if verification.get(id(f)) == MISMATCH]
+    unverified = [f for f in file_list[1:] if verification.get(id(f)) in (VERIFY_ERROR, VERIFY_SKIPPED)]
+
+    logging.info(f"\n🔍 Found {len(duplicates)} duplicate(s) of: {original.path.name}")
+    logging.info(f"   Hash: {original.hash[:16]}...")
+    logging.info(f"   Original: {original.path}")
+
+    for dup_file in duplicates:
+        dup_file.is_duplicate = True
+        dup_file.original_path = original.path
+        dup_file.verification = verification.get(id(dup_file))
+
+        logging.info(f"   Duplicate: {dup_file.path}")
+
+        # Mark in database if enabled
+        if db_writer:
+            try:
+                db_writer.mark(dup_file, original.path, verification=dup_file.verification)
+            except Exception as e:
+                logging.warning(f"   ⚠️ Failed to mark duplicate in DB: {e}")
+
+    for unmarked_file in mismatches + unverified:
+        unmarked_file.is_duplicate = False
+        unmarked_file.original_path = None
+        unmarked_file.verification = verification[id(unmarked_file)]
+
+        if unmarked_file.verification == MISMATCH:
+            logging.warning(f"   ❗ Hash match but bytes differ: {unmarked_file.path}")
         else:
-            unique_count += 1
+            logging.warning(f"   ⚠️ Not marked, bytes could not be compared ({unmarked_file.verification}): "
+                            f"{unmarked_file.path}")
+
+        if db_writer:
+            try:
+                db_writer.verification(unmarked_file, unmarked_file.verification)
+            except Exception as e:
+                logging.warning(f"   ⚠️ Failed to save verification in DB: {e}")
+
+    return len(duplicates), len(mismatches)
+
+
+def detect_duplicates(files: List[FileInfo], use_db: bool = False, verify: Optional[str] = None) -> List[FileInfo]:
+    """
+    Detect duplicate files based on hash comparison.
+
+    Args:
+        files: List of FileInfo objects with hashes
+        use_db: If True, mark duplicates in database
+        verify: Optional verification mode. "bytes" confirms every hash match
+                with a streaming byte-for-byte compare; only confirmed copies
+                are marked, mismatches and unreadable files are not.
+
+    Returns:
+        List of FileInfo objects with duplicates marked (is_duplicate=True)
+    """
+    if verify is not None and verify not in VERIFY_MODES:
+        raise ValueError(f"Unknown verify mode: {verify}. Use one of: {', '.join(VERIFY_MODES)}")
+
+    # Group files by hash in a compact digest index; only duplicate groups are materialized
+    duplicate_groups = [[files[i] for i in group] for group in hash_groups(files)]
+    hashed_count = sum(1 for f in files if f.hash and f.hash != "METADATA_ONLY")
+
+    # Confirm hash matches at the byte level before anything is marked
+    verification = {}
+    if verify == "bytes":
+        verification = verify_duplicate_groups(duplicate_groups)
+
+    # Mark duplicates
+    duplicate_count = 0
+    mismatch_count = 0
+
+    db_writer = open_duplicate_writer(use_db)
+    for file_list in duplicate_groups:
+        duplicates, mismatches = mark_duplicate_group(file_list, verification, db_writer)
+        duplicate_count += duplicates
+        mismatch_count += mismatches
+    close_duplicate_writer(db_writer)
+
+    # Every hashed file is either unique content, a mismatch, or a marked duplicate
+    unique_count = hashed_count - duplicate_count
 
     logging.info(f"\n📊 Duplicate Detection Results:")
     logging.info(f"   Unique files: {unique_count}")
     logging.info(f"   Duplicate files: {duplicate_count}")
+    if verify:
+        logging.info(f"   Verification mismatches: {mismatch_count}")
     logging.info(f"   Total files: {len(files)}")
 
     return files
 
 
+def _repoint_to_run_original(file_list: List[FileInfo], original_path: Path, db_writer,
+                             verify: Optional[str] = None) -> None:
+    """
+    Make the cataloged original (which is part of this run) the group's original.
+
+    detect_duplicates() picks the first file it saw; the catalog rule may pick
+    another member of the same group. Byte-verified members stay verified since
+    they all matched the same reference; with verify on, no other member is marked.
+    """
+    original = next(f for f in file_list if f.path == original_path)
+    if original.verification == MISMATCH:
+        return
+
+    if original.is_duplicate:
+        original.is_duplicate = False
+        original.original_path = None
+        try:
+            db_writer.clear(original)
+        except Exception as e:
+            logging.warning(f"   ⚠️ Failed to clear duplicate flag in DB: {e}")
+
+    for member in file_list:
+        if member is original or member.verification == MISMATCH or member.original_path == original_path:
+            continue
+        if verify and member.verification != VERIFIED:
+            continue
+        member.is_duplicate = True
+        member.original_path = original_path
+        try:
+            db_writer.mark(member, original_path, verification=member.verification)
+        except Exception as e:
+            logging.warning(f"   ⚠️ Failed to mark duplicate in DB: {e}")
+
+
+def _find_existing_catalog_originals(hashes, run_paths, original_rule: str,
+                                     batch_size: int) -> Dict[str, Tuple[int, str]]:
+    """
+    Catalog originals per hash, skipping cataloged paths that are no longer on disk.
+
+    Paths scanned in this run exist; any other original is checked, and a
+    missing one is excluded before the rule picks again for that hash.
+    """
+    from core.db import find_catalog_originals
+
+    originals = find_catalog_originals(hashes, rule=original_rule, batch_size=batch_size)
+    stale_ids = []
+    for _ in range(CATALOG_REPICK_ROUNDS):
+        stale = [h for h, (file_id, path) in originals.items()
+                 if Path(path) not in run_paths and not Path(path).exists()]
+        if not stale:
+            break
+        stale_ids.extend(originals[h][0] for h in stale)
+        logging.info(f"   ⚠️ {len(stale)} catalog original(s) no longer on disk, picking again...")
+        for hash_value in stale:
+            del originals[hash_value]
+        originals.update(find_catalog_originals(stale, rule=original_rule, batch_size=batch_size,
+                                                exclude_ids=stale_ids))
+    else:
+        # Still missing after the last round: leave those hashes to this run alone
+        for hash_value in [h for h, (_, path) in originals.items()
+                           if Path(path) not in run_paths and not Path(path).exists()]:
+            del originals[hash_value]
+    return originals
+
+
+def detect_catalog_duplicates(files: List[FileInfo], original_rule: str = "first_seen",
+                              batch_size: int = 1000, verify: Optional[str] = None) -> List[FileInfo]:
+    """
+    Detect duplicates of files cataloged in earlier runs (requires the database).
+
+    Each hash in this run is looked up in the files table in batches; the
+    catalog original is chosen by original_rule. Files from this run that
+    aren't that original are marked as its duplicates, which may re-point
+    duplicates found by detect_duplicates() to an older copy elsewhere.
+    A catalog original that is no longer on disk is passed over for the
+    next one the rule picks (up to CATALOG_REPICK_ROUNDS lookups).
+
+    Args:
+        files: List of FileInfo objects with hashes (already written to the DB)
+        original_rule: "first_seen" (earliest cataloged) or "oldest_mtime"
+        batch_size: Number of hashes per lookup query
+        verify: Optional verification mode ("bytes"); only byte-confirmed
+                members are marked
+
+    Returns:
+        List of FileInfo objects with duplicates marked
+    """
+    if verify is not None and verify not in VERIFY_MODES:
+        raise ValueError(f"Unknown verify mode: {verify}. Use one of: {', '.join(VERIFY_MODES)}")
+
+    by_hash = defaultdict(list)
+    for file_info in files:
+        if file_info.hash and file_info.hash != "METADATA_ONLY":
+            by_hash[file_info.hash].append(file_info)
+
+    logging.info(f"🗄️  Looking up {len(by_hash)} hash(es) in the catalog (rule: {original_rule})...")
+    run_paths = {f.path for f in files}
+    originals = _find_existing_catalog_originals(by_hash.keys(), run_paths, original_rule, batch_size)
+
+    # Groups whose original lives outside this run
+    db_writer = open_duplicate_writer(True)
+    cross_run = {}
+    for hash_value, file_list in by_hash.items():
+        if hash_value not in originals:
+            continue
+        original_path = Path(originals[hash_value][1])
+        members = [f for f in file_list if f.path != original_path]
+        if len(members) == len(file_list):
+            cross_run[hash_value] = (original_path, members)
+        else:
+            _repoint_to_run_original(file_list, original_path, db_writer, verify)
+
+    verification = {}
+    if verify == "bytes":
+        groups = [[FileInfo(path=original_path, size=members[0].size)] + members
+                  for original_path, members in cross_run.values()]
+        verification = verify_duplicate_groups(groups)
+
+    marked_count = 0
+    for hash_value, (original_path, members) in cross_run.items():
+        for member in members:
+            status = verification.get(id(member))
+            if verify and status != VERIFIED:
+                # Duplicates found within this run keep their own verified mark
+                if not member.is_duplicate:
+                    member.verification = status
+                logging.warning(f"   ⚠️ Not marked as a copy of {original_path} ({status}): {member.path}")
+                continue
+
+            member.is_duplicate = True
+            member.original_path = original_path
+            member.verification = status
+            marked_count += 1
+            logging.info(f"   Duplicate of cataloged file: {member.path} -> {original_path}")
+
+            try:
+                db_writer.mark(member, original_path, verification=status)
+            except Exception as e:
+                logging.warning(f"   ⚠️ Failed to mark duplicate in DB: {e}")
+
+    close_duplicate_writer(db_writer)
+    logging.info(f"🗄️  Cross-run duplicates: {marked_count} file(s) match {len(cross_run)} cataloged original(s)")
+    return files
+
+
+def iter_db_duplicates(original_rule: str = "first_seen", verify: Optional[str] = None,
+                       batch_size: int = 1000) -> Iterator[List[FileInfo]]:
+    """
+    Detect duplicates across the whole catalog inside the database (requires the database).
+
+    The database finds the duplicate hashes (GROUP BY hash HAVING COUNT(*) > 1)
+    and streams their groups back a batch at a time; each group is verified
+    (if requested), marked and yielded before the next is read, so the
+    catalog is never loaded into memory. A catalog original that an earlier
+    run marked as a duplicate is cleared.
+
+    Args:
+        original_rule: "first_seen" (lowest id) or "oldest_mtime" (earliest mtime, ties by id)
+        verify: Optional verification mode ("bytes"); needs the files on disk
+        batch_size: Duplicate hashes fetched per member query
+
+    Yields:
+        Each duplicate group as FileInfo objects, original first
+    """
+    from core.db import iter_catalog_duplicate_groups, ORIGINAL_RULES
+
+    if original_rule not in ORIGINAL_RULES:
+        raise ValueError(f"Unknown original rule: {original_rule}. Use one of: {', '.join(ORIGINAL_RULES)}")
+    if verify is not None and verify not in VERIFY_MODES:
+        raise ValueError(f"Unknown verify mode: {verify}. Use one of: {', '.join(VERIFY_MODES)}")
+
+    group_count = 0
+    duplicate_count = 0
+    mismatch_count = 0
+
+    db_writer = open_duplicate_writer(True)
+    try:
+        for hash_value, rows in iter_catalog_duplicate_groups(batch_size=batch_size):
+            if original_rule == "oldest_mtime":
+                # Rows without an mtime sort last; ties keep id order
+                rows = sorted(rows, key=lambda row: (row[3] is None, row[3] or 0))
+            file_list = [FileInfo(path=Path(path), size=size or 0, hash=hash_value, file_id=file_id,
+                                  is_duplicate=bool(is_duplicate))
+                         for file_id, path, size, mtime, is_duplicate in rows]
+
+            original = file_list[0]
+            if original.is_duplicate:
+                original.is_duplicate = False
+                db_writer.clear(original)
+
+            verification = verify_group_bytes(file_list) if verify == "bytes" else {}
+            duplicates, mismatches = mark_duplicate_group(file_list, verification, db_writer)
+            group_count += 1
+            duplicate_count += duplicates
+            mismatch_count += mismatches
+            yield file_list
+    finally:
+        close_duplicate_writer(db_writer)
+
+    logging.info(f"\n📊 Catalog Duplicate Detection Results:")
+    logging.info(f"   Duplicate groups: {group_count}")
+    logging.info(f"   Duplicate files: {duplicate_count}")
+    if verify:
+        logging.info(f"   Verification mismatches: {mismatch_count}")
+
+
 def filter_duplicates(files: List[FileInfo], keep_duplicates: bool = False) -> List[FileInfo]:
     """
     Filter out duplicate files from list.
@@ -133,73 +579,27 @@ def find_duplicates_by_name(files: List[FileInfo]) -> dict:
     return duplicate_names
 
 
-def report_duplicates(files: List[FileInfo], output_file: str = None):
+def report_duplicates(files: List[FileInfo], output_file: str = None,
+                      directory_groups: Optional[List[DirectoryGroup]] = None,
+                      fmt: str = "text", top_k: int = 10, compress: bool = False) -> dict:
     """
     Generate a detailed report of duplicate files.
 
+    The report is streamed group by group (see core.report_writer); only the
+    summary and top-K groups by wasted space are printed to the console.
+
     Args:
         files: List of FileInfo objects
         output_file: Optional path to save report
-    """
-    # Group files by hash
-    hash_groups = defaultdict(list)
+        directory_groups: Duplicate directories from detect_duplicate_directories();
+                          files inside the copies are reported once per folder
+        fmt: Report format: "text", "jsonl" or "csv"
+        top_k: Number of largest groups listed in the summary
+        compress: Gzip the report file
 
-    for file_info in files:
-        if file_info.hash != "METADATA_ONLY":
-            hash_groups[file_info.hash].append(file_info)
-
-    # Find duplicate groups
-    duplicate_groups = {h: files for h, files in hash_groups.items() if len(files) > 1}
-
-    if not duplicate_groups:
-        logging.info("✅ No duplicates found!")
-        return
-
-    # Generate report
-    report_lines = []
-    report_lines.append("="*80)
-    report_lines.append("                    DUPLICATE FILES REPORT")
-    report_lines.append("="*80)
-    report_lines.append("")
-
-    total_duplicates = sum(len(files) - 1 for files in duplicate_groups.values())
-    total_wasted_space = 0
-
-    for idx, (hash_value, file_list) in enumerate(sorted(duplicate_groups.items()), 1):
-        original = file_list[0]
-        duplicates = file_list[1:]
-
-        wasted_space = original.size * len(duplicates)
-        total_wasted_space += wasted_space
-
-        report_lines.append(f"Duplicate Group #{idx}")
-        report_lines.append(f"  Hash: {hash_value}")
-        report_lines.append(f"  Size: {original.size:,} bytes ({original.size / 1_048_576:.2f} MB)")
-        report_lines.append(f"  Count: {len(file_list)} files")
-        report_lines.append(f"  Wasted: {wasted_space:,} bytes ({wasted_space / 1_048_576:.2f} MB)")
-        report_lines.append("")
-        report_lines.append(f"  Original: {original.path}")
-        for dup in duplicates:
-            report_lines.append(f"  Duplicate: {dup.path}")
-        report_lines.append("")
-        report_lines.append("-"*80)
-        report_lines.append("")
-
-    report_lines.append("="*80)
-    report_lines.append("SUMMARY")
-    report_lines.append("="*80)
-    report_lines.append(f"Total duplicate groups: {len(duplicate_groups)}")
-    report_lines.append(f"Total duplicate files: {total_duplicates}")
-    report_lines.append(f"Total wasted space: {total_wasted_space:,} bytes ({total_wasted_space / 1_073_741_824:.2f} GB)")
-    report_lines.append("="*80)
-
-    report = "\n".join(report_lines)
-
-    # Print to console
-    print("\n" + report)
-
-    # Save to file if specified
-    if output_file:
-        with open(output_file, 'w') as f:
-            f.write(report)
-        logging.info(f"\n📄 Duplicate report saved to: {output_file}")
+    Returns:
+        Summary dictionary
+    """
+    from core.report_writer import write_duplicate_report
+    return write_duplicate_report(files, output_file, fmt=fmt, directory_groups=directory_groups,
+                                  top_k=top_k, compress=compress)
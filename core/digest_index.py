@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: digest_index.py
+# Purpose: Compact in-memory grouping of files by content digest
+#
+# Description:
+# Stores SHA256 digests as raw 32-byte values in one bytearray instead of
+# 64-character hex strings keyed into a dict of lists. Grouping probes an
+# open-addressing table of entry numbers keyed by 64-bit digest prefixes
+# and confirms every prefix hit against the full digest, so prefix
+# collisions never merge different files. Used by detect_duplicates and
+# the report.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.0
+# Last Modified: 2026-10-18 by Tim Canady
+#
+# Revision History:
+# - 0.1.0 (2026-10-18): Initial compact digest index — Tim Canady
+###################################################################
+
+import hashlib
+from array import array
+from typing import Iterable, List
+
+DIGEST_SIZE = 32
+
+
+def raw_digest(hash_value: str) -> bytes:
+    """
+    Convert a hash string to a fixed-width 32-byte digest.
+
+    SHA256 hex digests are decoded directly; any other string (e.g. from an
+    older catalog) is hashed so it still gets a stable 32-byte key.
+    """
+    if len(hash_value) == DIGEST_SIZE * 2:
+        try:
+            return bytes.fromhex(hash_value)
+        except ValueError:
+            pass
+    return hashlib.sha256(hash_value.encode("utf-8")).digest()
+
+
+class DigestIndex:
+    """
+    Append-only table of 32-byte digests with hash-table grouping.
+
+    Each entry costs 32 bytes of digest plus an 8-byte prefix in typed
+    arrays; entry numbers are assigned in insertion order. Grouping adds a
+    transient table of 8 to 16 bytes per entry.
+    """
+
+    def __init__(self):
+        self._digests = bytearray()
+        self._prefixes = array("Q")
+
+    def __len__(self) -> int:
+        return len(self._prefixes)
+
+    def add(self, hash_value: str) -> int:
+        """Append a hash (hex string); returns its entry number."""
+        return self.add_raw(raw_digest(hash_value))
+
+    def add_raw(self, digest: bytes) -> int:
+        """Append a raw 32-byte digest; returns its entry number."""
+        self._digests += digest
+        self._prefixes.append(int.from_bytes(digest[:8], "big"))
+        return len(self._prefixes) - 1
+
+    def digest(self, entry: int) -> bytes:
+        """Raw digest of an entry."""
+        start = entry * DIGEST_SIZE
+        return bytes(self._digests[start:start + DIGEST_SIZE])
+
+    def groups(self) -> List[List[int]]:
+        """
+        Entry numbers that share a full digest, duplicates only.
+
+        Uses an open-addressing table of entry numbers keyed by the 64-bit
+        prefix; a prefix hit is confirmed against the full digest before two
+        entries are grouped, so prefix collisions just keep probing. Groups
+        are ordered by their first entry, and entries within a group are in
+        insertion order, so the first one is the file seen first.
+
+        Returns:
+            List of entry-number lists, each with at least two entries
+        """
+        count = len(self._prefixes)
+        capacity = 1
+        while capacity < 2 * count:
+            capacity <<= 1
+        mask = capacity - 1
+
+        table = array("q", [-1]) * capacity
+        prefixes = self._prefixes
+        digests = self._digests
+        groups = {}     # first entry -> all entries with that digest
+
+        for entry, prefix in enumerate(prefixes):
+            slot = prefix & mask
+            while True:
+                first = table[slot]
+                if first < 0:
+                    table[slot] = entry
+                    break
+                if prefixes[first] == prefix and \
+                        digests[first * DIGEST_SIZE:(first + 1) * DIGEST_SIZE] == \
+                        digests[entry * DIGEST_SIZE:(entry + 1) * DIGEST_SIZE]:
+                    groups.setdefault(first, [first]).append(entry)
+                    break
+                slot = (slot + 1) & mask
+
+        return [groups[first] for first in sorted(groups)]
+
+
+def group_by_digest(hash_values: Iterable[str]) -> List[List[int]]:
+    """
+    Group positions of an iterable of hashes by digest.
+
+    Args:
+        hash_values: Hash strings, one per position
+
+    Returns:
+        Position lists of duplicated hashes, each in ascending order
+    """
+    index = DigestIndex()
+    for hash_value in hash_values:
+        index.add(hash_value)
+    return index.groups()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: directory_dedup.py
+# Purpose: Detect whole directories that are copies of each other
+#
+# Description:
+# Builds a fingerprint for every directory bottom-up from its children's
+# names and content hashes (files) or fingerprints (subdirectories).
+# Directories with equal fingerprints hold identical trees. Nested matches
+# collapse to the highest identical ancestor, so a copied folder is
+# reported, and its files marked, as a single unit.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.2
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.2 (2026-10-19): Original folder holds the file-level originals; nested groups collapse only under paired parents — Tim Canady
+# - 0.1.1 (2026-10-18): DB marks batched through DuplicateWriter — Tim Canady
+# - 0.1.0 (2026-10-18): Initial folder fingerprinting and duplicate-directory detection — Tim Canady
+###################################################################
+
+import hashlib
+import logging
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from models.file_info import FileInfo
+from models.directory_group import DirectoryGroup
+from core.deduplicator import open_duplicate_writer, close_duplicate_writer
+
+logger = logging.getLogger(__name__)
+
+
+def compute_directory_fingerprints(
+    files: List[FileInfo],
+    root: Optional[Path] = None
+) -> Tuple[Dict[Path, Optional[str]], Dict[Path, Tuple[int, int]]]:
+    """
+    Fingerprint every directory under root from the files beneath it.
+
+    A directory's fingerprint hashes the sorted (kind, name, hash) entries of
+    its direct children. Directories containing a file without a content hash
+    (metadata-only) get None, and so do all their ancestors, since their
+    contents can't be compared.
+
+    Args:
+        files: Hashed FileInfo objects
+        root: Top directory to aggregate up to (default: common parent of all files)
+
+    Returns:
+        (fingerprints, stats) where fingerprints maps directory -> fingerprint
+        (or None) and stats maps directory -> (file_count, total_size)
+    """
+    if not files:
+        return {}, {}
+
+    if root is None:
+        root = Path(os.path.commonpath([str(f.path.parent) for f in files]))
+
+    entries = defaultdict(list)     # dir -> [(kind, name, hash)]
+    subdirs = defaultdict(set)      # dir -> child directories
+    own_stats = defaultdict(lambda: [0, 0])
+    incomplete = set()
+    known = {root}
+
+    for file_info in files:
+        parent = file_info.path.parent
+
+        if not file_info.hash or file_info.hash == "METADATA_ONLY":
+            incomplete.add(parent)
+        else:
+            entries[parent].append(("f", file_info.path.name, file_info.hash))
+        own_stats[parent][0] += 1
+        own_stats[parent][1] += file_info.size
+
+        # Register the chain of ancestors up to root (stop at the first known one)
+        directory = parent
+        while directory not in known and directory != directory.parent:
+            known.add(directory)
+            subdirs[directory.parent].add(directory)
+            directory = directory.parent
+
+    fingerprints = {}
+    stats = {}
+
+    # Deepest directories first so children are always fingerprinted before parents
+    for directory in sorted(known, key=lambda d: len(d.parts), reverse=True):
+        file_count, size = own_stats.get(directory, (0, 0))
+        children = subdirs.get(directory, ())
+        complete = directory not in incomplete
+
+        child_entries = []
+        for child in children:
+            file_count += stats[child][0]
+            size += stats[child][1]
+            if fingerprints[child] is None:
+                complete = False
+            else:
+                child_entries.append(("d", child.name, fingerprints[child]))
+
+        stats[directory] = (file_count, size)
+
+        if not complete:
+            fingerprints[directory] = None
+            continue
+
+        digest = hashlib.sha256()
+        for kind, name, value in sorted(entries.get(directory, []) + child_entries):
+            digest.update(f"{kind}\0{name}\0{value}\n".encode("utf-8", errors="surrogateescape"))
+        fingerprints[directory] = digest.hexdigest()
+
+    return fingerprints, stats
+
+
+def detect_duplicate_directories(
+    files: List[FileInfo],
+    root: Optional[Path] = None,
+    use_db: bool = False
+) -> List[DirectoryGroup]:
+    """
+    Find identical directory trees and mark their files as duplicates.
+
+    A group is dropped when its members are the same-named children of one
+    group of duplicated parents: the parent group already covers it. In each
+    remaining group the original is the directory outside other copies holding
+    the most file-level originals from detect_duplicates() (ties by path);
+    files under the other copies are marked is_duplicate with original_path
+    pointing at the matching file in the original folder and duplicate_dir
+    set to that folder.
+
+    Args:
+        files: Hashed FileInfo objects
+        root: Top directory of the scan (default: common parent of all files)
+        use_db: If True, mark duplicates in database
+
+    Returns:
+        List of DirectoryGroup objects, largest wasted space first
+    """
+    fingerprints, stats = compute_directory_fingerprints(files, root)
+
+    by_fingerprint = defaultdict(list)
+    for directory, fingerprint in fingerprints.items():
+        if fingerprint is not None and stats[directory][0] > 0:
+            by_fingerprint[fingerprint].append(directory)
+
+    duplicated = {d for dirs in by_fingerprint.values() if len(dirs) > 1 for d in dirs}
+    candidates = [dirs for dirs in by_fingerprint.values() if len(dirs) > 1]
+
+    # Files that detect_duplicates() kept as originals, counted per duplicated directory
+    originals_in = defaultdict(int)
+    for file_info in files:
+        if not file_info.is_duplicate:
+            for ancestor in file_info.path.parents:
+                if ancestor in duplicated:
+                    originals_in[ancestor] += 1
+
+    groups = []
+    copies = set()
+    # Shallowest first, so a nested group never picks an original inside a copy
+    for directories in sorted(candidates, key=lambda dirs: len(dirs[0].parts)):
+        # Collapse nested matches into the highest identical ancestor: the
+        # parents must be copies of each other, holding these under one name
+        if (len({d.name for d in directories}) == 1 and directories[0].parent in duplicated
+                and len({fingerprints.get(d.parent) for d in directories}) == 1):
+            continue
+        original = min(directories, key=lambda d: (any(a in copies for a in d.parents), -originals_in[d], d))
+        directories = [original] + sorted(d for d in directories if d != original)
+        copies.update(directories[1:])
+        fingerprint = fingerprints[directories[0]]
+        file_count, size = stats[directories[0]]
+        groups.append(DirectoryGroup(fingerprint=fingerprint, directories=directories,
+                                     file_count=file_count, size=size))
+
+    groups.sort(key=lambda g: g.wasted_space, reverse=True)
+
+    # Map every duplicate copy to its original folder
+    copy_of = {}
+    for group in groups:
+        for directory in group.duplicates:
+            copy_of[directory] = group.original
+
+    if copy_of:
+        _mark_directory_members(files, copy_of, use_db)
+
+    logger.info(f"📁 Duplicate directories: {len(groups)} group(s), "
+                f"{sum(len(g.duplicates) for g in groups)} redundant folder(s), "
+                f"{sum(g.wasted_space for g in groups) / 1_048_576:.2f} MB wasted")
+    return groups
+
+
+def _mark_directory_members(files: List[FileInfo], copy_of: Dict[Path, Path], use_db: bool) -> None:
+    """
+    Point every file inside a duplicate folder at its counterpart in the original folder.
+
+    File-level marks from detect_duplicates() that now lead to one of those
+    copies are followed to the copy's original: a file that turns out to be
+    its own original is cleared, any other is re-pointed.
+    """
+    by_path = {f.path: f for f in files}
+    db_writer = open_duplicate_writer(use_db)
+    marked = set()
+
+    for file_info in files:
+        # Highest duplicated ancestor wins so nested copies resolve to one unit
+        for ancestor in reversed(file_info.path.parents):
+            original_dir = copy_of.get(ancestor)
+            if original_dir is None:
+                continue
+
+            counterpart = original_dir / file_info.path.relative_to(ancestor)
+            original = by_path.get(counterpart)
+            if original is None or original.hash != file_info.hash:
+                break
+
+            changed = file_info.original_path != counterpart
+            file_info.is_duplicate = True
+            file_info.original_path = counterpart
+            file_info.duplicate_dir = original_dir
+            marked.add(file_info.path)
+
+            if db_writer and changed:
+                try:
+                    db_writer.mark(file_info, counterpart, verification=file_info.verification)
+                except Exception as e:
+                    logger.warning(f"   ⚠️ Failed to mark duplicate in DB: {e}")
+            break
+
+    for file_info in files:
+        if not file_info.is_duplicate or file_info.path in marked:
+            continue
+
+        # Follow the chain of originals until it reaches an unmarked file
+        target = file_info.original_path
+        seen = {file_info.path}
+        while target in by_path and by_path[target].is_duplicate and target not in seen:
+            seen.add(target)
+            target = by_path[target].original_path
+        if target == file_info.original_path:
+            continue
+
+        try:
+            if target == file_info.path:
+                file_info.is_duplicate = False
+                file_info.original_path = None
+                if db_writer:
+                    db_writer.clear(file_info)
+            else:
+                file_info.original_path = target
+                if db_writer:
+                    db_writer.mark(file_info, target, verification=file_info.verification)
+        except Exception as e:
+            logger.warning(f"   ⚠️ Failed to update duplicate in DB: {e}")
+
+    close_duplicate_writer(db_writer)
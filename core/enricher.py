@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: enricher.py
+# Purpose: Fill in FileInfo.year and FileInfo.owner for organization
+#
+# Description:
+# Gives each file the year and owner that plan_organization() groups by.
+# The year comes from embedded metadata first (EXIF capture date in JPEG
+# and TIFF/raw files, ID3 year tags in MP3s, the PDF creation date), then
+# from date-like folder names in the path, then from the file's mtime.
+# Owner comes from the path ("Documents - 2996KD" -> "2996KD"), then
+# from the file owner's account name (st_uid, looked up once per uid).
+# Only the first HEADER_BYTES of a file are read, and only for formats
+# that carry a date (chosen from the sniffed content type or the
+# extension). Header years are cached by content hash, so unchanged files
+# are never re-read on later runs.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+#
+# Version: 0.1.0
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.0 (2026-10-19): Year/owner enrichment from EXIF, ID3, PDF, path and stat — Tim Canady
+###################################################################
+
+import logging
+import re
+import struct
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from models.file_info import FileInfo
+from utils.cache import load_cache, save_cache
+from utils.path_metadata import extract_owner_from_path, is_date_like
+
+try:
+    import pwd
+except ImportError:  # Windows
+    pwd = None
+
+logger = logging.getLogger(__name__)
+
+# Header years keyed by SHA256 content hash (null = header has no date)
+YEAR_CACHE_FILE = Path(".year_cache.json")
+
+# Bytes read for embedded dates; a JPEG's EXIF segment is at most 64KB
+HEADER_BYTES = 65536
+
+# Header parser per sniffed content type, and per extension for files that
+# were not read while hashing (metadata-only files have no content type)
+_PARSER_BY_CONTENT_TYPE = {"image/jpeg": "exif", "image/tiff": "exif", "audio/mpeg": "id3",
+                           "application/pdf": "pdf"}
+_PARSER_BY_EXTENSION = {".jpg": "exif", ".jpeg": "exif", ".tif": "exif", ".tiff": "exif",
+                        ".cr2": "exif", ".nef": "exif", ".dng": "exif", ".arw": "exif",
+                        ".mp3": "id3", ".pdf": "pdf"}
+
+# EXIF tags, most specific first: DateTimeOriginal, DateTimeDigitized, DateTime
+_EXIF_DATE_TAGS = (0x9003, 0x9004, 0x0132)
+_EXIF_IFD_POINTER = 0x8769
+
+_YEAR_RE = re.compile(rb"(?<!\d)(1[89]\d\d|20\d\d)")
+_PDF_DATE_RE = re.compile(rb"/CreationDate\s*\(D:(\d{4})|<xmp:CreateDate>(\d{4})")
+_FOLDER_YEAR_RE = re.compile(r"(?<!\d)(19\d\d|20\d\d)")
+_FOLDER_SHORT_YEAR_RE = re.compile(r"^\d{1,2}[A-Za-z]{3}(\d{2})$")  # 8May16
+
+
+def _valid_year(year: int) -> Optional[str]:
+    # Cameras with an unset clock write 0000:00:00 or default to far-off years
+    return str(year) if 1900 <= year <= datetime.now().year + 1 else None
+
+
+def _tiff_year(data: bytes, base: int) -> Optional[str]:
+    """Year from the EXIF date tags of a TIFF structure starting at data[base:]."""
+    order = data[base:base + 2]
+    if order == b"II":
+        endian = "<"
+    elif order == b"MM":
+        endian = ">"
+    else:
+        return None
+
+    def read_ifd(offset):
+        entries = {}
+        start = base + offset
+        if offset <= 0 or start + 2 > len(data):
+            return entries
+        (count,) = struct.unpack_from(endian + "H", data, start)
+        for i in range(count):
+            entry = start + 2 + i * 12
+            if entry + 12 > len(data):
+                break
+            tag, kind, length, value = struct.unpack_from(endian + "HHII", data, entry)
+            if tag == _EXIF_IFD_POINTER:
+                entries[tag] = value
+            elif tag in _EXIF_DATE_TAGS and kind == 2 and length >= 4:
+                # ASCII "YYYY:MM:DD HH:MM:SS"; values over 4 bytes live at an offset
+                text_at = entry + 8 if length <= 4 else base + value
+                entries[tag] = data[text_at:text_at + 4]
+        return entries
+
+    if len(data) < base + 8:
+        return None
+    tags = read_ifd(struct.unpack_from(endian + "I", data, base + 4)[0])
+    if _EXIF_IFD_POINTER in tags:
+        tags.update(read_ifd(tags[_EXIF_IFD_POINTER]))
+    for tag in _EXIF_DATE_TAGS:
+        if tag in tags and tags[tag].isdigit():
+            year = _valid_year(int(tags[tag]))
+            if year:
+                return year
+    return None
+
+
+def _exif_year(header: bytes) -> Optional[str]:
+    """Capture year from a JPEG's APP1 EXIF segment or a TIFF/raw file."""
+    if header[:2] in (b"II", b"MM"):
+        return _tiff_year(header, 0)
+    if header[:2] != b"\xff\xd8":
+        return None
+
+    # Walk the JPEG marker segments up to the start of the image data
+    pos = 2
+    while pos + 4 <= len(header) and header[pos] == 0xFF:
+        marker = header[pos + 1]
+        (length,) = struct.unpack_from(">H", header, pos + 2)
+        if marker == 0xE1 and header[pos + 4:pos + 10] == b"Exif\x00\x00":
+            return _tiff_year(header, pos + 10)
+        if marker == 0xDA:  # Start of scan
+            break
+        pos += 2 + length
+    return None
+
+
+def _id3_year(header: bytes) -> Optional[str]:
+    """Year from an ID3v2 tag (TDRC/TDOR in v2.4, TYER in v2.3, TYE in v2.2)."""
+    if header[:3] != b"ID3" or len(header) < 10:
+        return None
+    version = header[3]
+    end = min(len(header), 10 + ((header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]))
+    id_size, head_size = (3, 6) if version == 2 else (4, 10)
+
+    pos = 10
+    while pos + head_size <= end:
+        frame = header[pos:pos + id_size]
+        if not frame.strip(b"\x00"):
+            break  # Padding
+        raw = header[pos + id_size:pos + id_size + (3 if version == 2 else 4)]
+        if version == 2:
+            size = int.from_bytes(raw, "big")
+        elif version == 4:
+            size = (raw[0] << 21) | (raw[1] << 14) | (raw[2] << 7) | raw[3]  # Syncsafe
+        else:
+            size = int.from_bytes(raw, "big")
+        if frame in (b"TDRC", b"TDOR", b"TYER", b"TYE"):
+            body = header[pos + head_size + 1:pos + head_size + size]
+            encoding = header[pos + head_size] if pos + head_size < len(header) else 0
+            if encoding in (1, 2):
+                body = body.decode("utf-16" if encoding == 1 else "utf-16-be", "ignore").encode("ascii", "ignore")
+            match = _YEAR_RE.search(body)
+            if match:
+                return _valid_year(int(match.group(1)))
+        pos += head_size + size
+    return None
+
+
+def _pdf_year(header: bytes) -> Optional[str]:
+    """Year of a PDF's /CreationDate or XMP CreateDate, when near the start of the file."""
+    if not header.startswith(b"%PDF-"):
+        return None
+    match = _PDF_DATE_RE.search(header)
+    if not match:
+        return None
+    return _valid_year(int(match.group(1) or match.group(2)))
+
+
+_PARSERS = {"exif": _exif_year, "id3": _id3_year, "pdf": _pdf_year}
+
+
+def header_year(header: bytes, parser: str) -> Optional[str]:
+    """
+    Year embedded in a file's header bytes.
+
+    Args:
+        header: The first bytes of the file (HEADER_BYTES is enough)
+        parser: "exif", "id3" or "pdf"
+
+    Returns:
+        Four-digit year string, or None if the header has no usable date
+    """
+    try:
+        return _PARSERS[parser](header)
+    except (struct.error, IndexError, ValueError):
+        return None
+
+
+def path_year(path: Path) -> Optional[str]:
+    """
+    Year from the nearest date-like folder name ("2019", "2024-01-15", "8May16").
+
+    Args:
+        path: Full path to the file
+
+    Returns:
+        Four-digit year string, or None if no folder names a date
+    """
+    for folder in reversed(path.parent.parts):
+        if not (is_date_like(folder) or _FOLDER_YEAR_RE.fullmatch(folder)):
+            continue
+        match = _FOLDER_YEAR_RE.search(folder)
+        if match:
+            year = _valid_year(int(match.group(1)))
+        else:
+            short = _FOLDER_SHORT_YEAR_RE.match(folder)
+            if not short:
+                continue
+            yy = int(short.group(1))
+            year = _valid_year(2000 + yy if 2000 + yy <= datetime.now().year else 1900 + yy)
+        if year:
+            return year
+    return None
+
+
+@lru_cache(maxsize=None)
+def _account_name(uid: int) -> Optional[str]:
+    if pwd is None:
+        return None
+    try:
+        return pwd.getpwuid(uid).pw_name
+    except KeyError:
+        return None
+
+
+def _header_parser(file_info: FileInfo) -> Optional[str]:
+    if file_info.content_type:
+        return _PARSER_BY_CONTENT_TYPE.get(file_info.content_type)
+    return _PARSER_BY_EXTENSION.get(file_info.path.suffix.lower())
+
+
+def _read_header(path: Path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read(HEADER_BYTES)
+
+
+def enrich_file(file_info: FileInfo, cache: Dict[str, Optional[str]]) -> FileInfo:
+    """
+    Set year and owner on one file; values already set are kept.
+
+    Args:
+        file_info: File to enrich
+        cache: Header years keyed by content hash (updated in place)
+
+    Returns:
+        The same FileInfo
+    """
+    if file_info.year and file_info.owner:
+        return file_info
+
+    path = file_info.path
+    stat_result = []
+
+    def stat():
+        # Only files without a header or path year, or without a path owner, are stat'ed
+        if not stat_result:
+            try:
+                stat_result.append(path.stat())
+            except OSError as e:
+                logger.debug(f"    ⚠️ Could not stat {path}: {e}")
+                stat_result.append(None)
+        return stat_result[0]
+
+    if not file_info.year:
+        year = None
+        parser = _header_parser(file_info)
+        if parser and not path.is_dir():
+            content_hash = file_info.hash if file_info.hash and file_info.hash != "METADATA_ONLY" else None
+            if content_hash in cache:
+                year = cache[content_hash]
+            else:
+                try:
+                    year = header_year(_read_header(path), parser)
+                except OSError as e:
+                    logger.debug(f"    ⚠️ Could not read {path}: {e}")
+                else:
+                    if content_hash:
+                        cache[content_hash] = year
+        year = year or path_year(path)
+        if not year and stat() is not None:
+            year = str(datetime.fromtimestamp(stat().st_mtime).year)
+        file_info.year = year
+
+    if not file_info.owner:
+        owner = extract_owner_from_path(path)
+        if not owner and stat() is not None:
+            owner = _account_name(stat().st_uid)
+        file_info.owner = owner
+
+    return file_info
+
+
+def enrich_files(files: List[FileInfo], cache_file: Path = YEAR_CACHE_FILE) -> List[FileInfo]:
+    """
+    Fill in year and owner for every file (the --enrich-metadata stage).
+
+    Args:
+        files: Hashed FileInfo objects
+        cache_file: JSON cache of header years keyed by content hash
+
+    Returns:
+        The same list, enriched in place
+    """
+    cache = load_cache(cache_file)
+    cached = len(cache)
+    for file_info in files:
+        enrich_file(file_info, cache)
+    if len(cache) != cached:
+        save_cache(cache, cache_file)
+
+    with_year = sum(1 for f in files if f.year)
+    with_owner = sum(1 for f in files if f.owner)
+    logger.info(f"🗓️ Enriched {len(files)} file(s): {with_year} with a year, {with_owner} with an owner")
+    return files
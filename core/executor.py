@@ -13,10 +13,12 @@
 # Author: Tim Canady
 # Created: 2025-09-28
 #
-# Version: 0.5.0
-# Last Modified: 2025-11-12 by Tim Canady
+# Version: 0.6.1
+# Last Modified: 2026-10-18 by Tim Canady
 #
 # Revision History:
+# - 0.6.1 (2026-10-18): Writers opened through open_writer so they can run write-behind — Tim Canady
+# - 0.6.0 (2026-10-18): Operations logged through the batched, id-keyed OperationWriter — Tim Canady
 # - 0.5.0 (2025-11-12): Added DB logging and improved error handling — Tim Canady
 # - 0.4.3 (2025-11-06): Basic file operation logger added — Tim Canady
 # - 0.1.0 (2025-09-28): Initial executor implementation — Tim Canady
@@ -42,9 +44,11 @@ def execute_plan(plan: List[Tuple[FileInfo, Path]], write_metadata: bool = False
     success_count = 0
     error_count = 0
 
-    # Import DB function if needed
+    # Import DB functions if needed; operations are inserted in batches by file id
+    db_writer = None
     if use_db:
-        from core.db import log_operation
+        from core.db import OperationWriter, open_writer
+        db_writer = open_writer(OperationWriter)
 
     for file_info, dest in plan:
         src = file_info.path
@@ -71,7 +75,7 @@ def execute_plan(plan: List[Tuple[FileInfo, Path]], write_metadata: bool = False
             # Log operation to database if enabled
             if use_db:
                 try:
-                    log_operation(src, 'MOVE', dest)
+                    db_writer.add(file_info, 'MOVE', dest)
                     logger.debug(f"  💾 Logged operation to DB")
                 except Exception as db_err:
                     logger.warning(f"  ⚠️ Failed to log operation to DB: {db_err}")
@@ -93,6 +97,12 @@ def execute_plan(plan: List[Tuple[FileInfo, Path]], write_metadata: bool = False
             logger.error(f"❌ Unexpected error moving {src} -> {dest}: {e}")
             error_count += 1
 
+    if db_writer is not None:
+        try:
+            db_writer.close()
+        except Exception as db_err:
+            logger.warning(f"  ⚠️ Failed to log operations to DB: {db_err}")
+
     # Summary
     logger.info(f"\n📊 Execution Summary:")
     logger.info(f"   ✅ Successful: {success_count}")
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: external_dedup.py
+# Purpose: Disk-spilling duplicate detection for catalogs larger than RAM
+#
+# Description:
+# Packs every hashed file into a fixed-width (size, digest, path-id)
+# record, sorts records in memory-bounded chunks into run files on disk
+# and k-way merges the runs. Equal (size, digest) records come out
+# adjacent and in path-id order, so each group's first record is the first
+# file seen, exactly like detect_duplicates. Memory use is capped by
+# --memory-limit rather than by corpus size.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.1
+# Last Modified: 2026-10-18 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-18): DB marks batched through DuplicateWriter — Tim Canady
+# - 0.1.0 (2026-10-18): Initial sorted-run external-memory dedup — Tim Canady
+###################################################################
+
+import heapq
+import logging
+import shutil
+import struct
+import sys
+import tempfile
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from models.file_info import FileInfo
+from core.digest_index import raw_digest
+from core.deduplicator import (VERIFY_MODES, mark_duplicate_group, verify_group_bytes,
+                               open_duplicate_writer, close_duplicate_writer)
+
+logger = logging.getLogger(__name__)
+
+# Big-endian so byte order of a packed record equals (size, digest, path_id) order
+RECORD = struct.Struct(">Q32sQ")
+KEY_SIZE = 8 + 32   # (size, digest) prefix that defines a group
+
+# Approximate in-memory cost of one buffered record (bytes object + list slot)
+RECORD_COST = sys.getsizeof(b"\0" * RECORD.size) + 8
+
+# Read buffer per run file while merging
+MERGE_BUFFER_SIZE = 64 * 1024
+
+# Never merge more runs than this at once (bounds open files)
+MAX_MERGE_FANIN = 64
+
+MIN_MEMORY_LIMIT = 1024 * 1024
+
+
+class ExternalGrouper:
+    """
+    Group (size, hash, path-id) records using sorted run files on disk.
+
+    Records are buffered until memory_limit is reached, then sorted and
+    written to a run file. groups() merges all runs (in several passes if
+    there are more than the fan-in allows) and yields duplicate groups.
+    Use as a context manager so run files are always removed.
+    """
+
+    def __init__(self, memory_limit: int, temp_dir: Optional[Path] = None):
+        if memory_limit < MIN_MEMORY_LIMIT:
+            raise ValueError(f"memory_limit must be at least {MIN_MEMORY_LIMIT:,} bytes")
+
+        self.buffer_records = max(1, memory_limit // RECORD_COST)
+        self.fanin = max(2, min(MAX_MERGE_FANIN, memory_limit // (2 * MERGE_BUFFER_SIZE)))
+        self.work_dir = Path(tempfile.mkdtemp(prefix="dedup-runs-", dir=temp_dir))
+        self.runs: List[Path] = []
+        self.record_count = 0
+        self._buffer: List[bytes] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, size: int, hash_value: str, path_id: int) -> None:
+        """Buffer one record, spilling a sorted run when the buffer is full."""
+        self._buffer.append(RECORD.pack(size, raw_digest(hash_value), path_id))
+        self.record_count += 1
+        if len(self._buffer) >= self.buffer_records:
+            self._spill()
+
+    def _spill(self) -> None:
+        """Sort the buffer and write it as the next run file."""
+        if not self._buffer:
+            return
+        self._buffer.sort()
+        run_path = self.work_dir / f"run-{len(self.runs):06d}.bin"
+        with open(run_path, "wb", buffering=MERGE_BUFFER_SIZE) as handle:
+            handle.writelines(self._buffer)
+        self.runs.append(run_path)
+        self._buffer = []
+
+    def _read_run(self, run_path: Path) -> Iterator[bytes]:
+        """Stream packed records from a run file."""
+        with open(run_path, "rb", buffering=MERGE_BUFFER_SIZE) as handle:
+            while True:
+                record = handle.read(RECORD.size)
+                if len(record) < RECORD.size:
+                    return
+                yield record
+
+    def _merge_runs(self, runs: List[Path]) -> Path:
+        """Merge several run files into one new run file."""
+        merged = self.work_dir / f"run-{len(self.runs):06d}.bin"
+        self.runs.append(merged)
+        with open(merged, "wb", buffering=MERGE_BUFFER_SIZE) as handle:
+            for record in heapq.merge(*(self._read_run(run) for run in runs)):
+                handle.write(record)
+        for run in runs:
+            run.unlink()
+        return merged
+
+    def groups(self) -> Iterator[Tuple[int, bytes, List[int]]]:
+        """
+        Yield (size, digest, path_ids) for every group of two or more records.
+
+        path_ids are ascending. Groups come out in (size, digest) order.
+        """
+        self._spill()
+
+        pending = list(self.runs)
+        passes = 0
+        while len(pending) > self.fanin:
+            passes += 1
+            pending = [self._merge_runs(pending[i:i + self.fanin])
+                       for i in range(0, len(pending), self.fanin)]
+        if passes:
+            logger.info(f"   🔀 {passes} intermediate merge pass(es) over {len(self.runs)} run file(s)")
+
+        current_key = None
+        path_ids: List[int] = []
+        for record in heapq.merge(*(self._read_run(run) for run in pending)):
+            key = record[:KEY_SIZE]
+            if key != current_key:
+                if len(path_ids) > 1:
+                    size, digest, _ = RECORD.unpack(current_key + bytes(8))
+                    yield size, digest, path_ids
+                current_key = key
+                path_ids = []
+            path_ids.append(RECORD.unpack(record)[2])
+
+        if len(path_ids) > 1:
+            size, digest, _ = RECORD.unpack(current_key + bytes(8))
+            yield size, digest, path_ids
+
+    def close(self) -> None:
+        """Remove all run files."""
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.runs = []
+        self._buffer = []
+
+
+def detect_duplicates_external(
+    files: List[FileInfo],
+    memory_limit: int,
+    use_db: bool = False,
+    verify: Optional[str] = None,
+    temp_dir: Optional[Path] = None
+) -> List[FileInfo]:
+    """
+    Detect duplicates like detect_duplicates(), spilling the grouping to disk.
+
+    The path-id of a record is the file's position in files, so the first
+    file seen is the original. Groups are verified (if requested) and marked
+    one at a time as they come off the merge; only the current group is held
+    in memory.
+
+    Args:
+        files: List of FileInfo objects with hashes
+        memory_limit: Approximate bytes the grouping stage may use
+        use_db: If True, mark duplicates in database
+        verify: Optional verification mode ("bytes")
+        temp_dir: Where run files go (default: system temp directory)
+
+    Returns:
+        List of FileInfo objects with duplicates marked (is_duplicate=True)
+    """
+    if verify is not None and verify not in VERIFY_MODES:
+        raise ValueError(f"Unknown verify mode: {verify}. Use one of: {', '.join(VERIFY_MODES)}")
+
+    duplicate_count = 0
+    mismatch_count = 0
+
+    db_writer = open_duplicate_writer(use_db)
+    with ExternalGrouper(memory_limit, temp_dir=temp_dir) as grouper:
+        for position, file_info in enumerate(files):
+            if file_info.hash and file_info.hash != "METADATA_ONLY":
+                grouper.add(file_info.size, file_info.hash, position)
+
+        logger.info(f"💾 External dedup: {grouper.record_count:,} record(s), "
+                    f"up to {grouper.buffer_records:,} per sorted run")
+
+        for _, _, path_ids in grouper.groups():
+            file_list = [files[i] for i in path_ids]
+            verification = verify_group_bytes(file_list) if verify == "bytes" else {}
+            duplicates, mismatches = mark_duplicate_group(file_list, verification, db_writer)
+            duplicate_count += duplicates
+            mismatch_count += mismatches
+
+        hashed_count = grouper.record_count
+    close_duplicate_writer(db_writer)
+
+    logger.info(f"\n📊 Duplicate Detection Results:")
+    logger.info(f"   Unique files: {hashed_count - duplicate_count}")
+    logger.info(f"   Duplicate files: {duplicate_count}")
+    if verify:
+        logger.info(f"   Verification mismatches: {mismatch_count}")
+    logger.info(f"   Total files: {len(files)}")
+
+    return files
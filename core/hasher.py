@@ -7,16 +7,25 @@
 #
 # Description:
 # Hashes files in chunks to avoid memory issues with large files.
-# Supports database caching for faster re-processing.
-# Provides progress logging for long-running operations.
+# Supports database caching for faster re-processing, written in
+# multi-row upsert batches.
+# The first bytes of each file's first chunk are matched against magic
+# numbers (core.sniffer) while hashing, so content sniffing costs no
+# extra reads. Provides progress logging for long-running operations.
 #
 # Author: Tim Canady
 # Created: 2025-09-28
 #
-# Version: 0.6.0
-# Last Modified: 2025-11-14 by Tim Canady
+# Version: 0.8.0
+# Last Modified: 2026-10-19 by Tim Canady
 #
 # Revision History:
+# - 0.8.0 (2026-10-19): Sniff the content type from the first chunk of the hashing read — Tim Canady
+# - 0.7.3 (2026-10-18): Report rows spooled locally while the DB was unreachable — Tim Canady
+# - 0.7.2 (2026-10-18): File rows can be written behind the hashing loop (--db-write-behind) — Tim Canady
+# - 0.7.1 (2026-10-18): FileInfo.file_id filled in from the batched writes — Tim Canady
+# - 0.7.0 (2026-10-18): DB rows written through the batched FileWriter upsert — Tim Canady
+# - 0.6.1 (2026-10-18): Split single-path hashing into hash_path for queue workers — Tim Canady
 # - 0.6.0 (2025-11-14): Added directory hashing support for atomic packages (.app, .pkg) — Tim Canady
 # - 0.5.0 (2025-11-12): Added detailed progress logging and DB integration — Tim Canady
 # - 0.4.0 (2025-11-06): Implemented chunked reading for large files — Tim Canady
@@ -29,6 +38,7 @@ import logging
 from pathlib import Path
 from datetime import datetime
 from models.file_info import FileInfo
+from core.sniffer import SNIFF_BYTES, sniff
 from utils.path_metadata import extract_path_metadata
 
 # Read files in 64KB chunks to avoid memory issues
@@ -79,72 +89,100 @@ def hash_directory(dir_path):
 
     return sha256_hash.hexdigest()
 
-def generate_hashes(file_paths, use_db=False, metadata_only_size=None):
+def hash_path(path, metadata_only_size=None, with_header=False):
+    """
+    Hash one file, or one atomic package directory as a single unit.
+
+    Args:
+        path: Path to a file or atomic package directory
+        metadata_only_size: Files larger than this (bytes) are not hashed
+        with_header: Also return the file's first SNIFF_BYTES bytes, taken
+                     from the first chunk read for the hash
+
+    Returns:
+        (size, mtime, sha256, is_metadata_only); sha256 is "METADATA_ONLY"
+        when the size threshold is exceeded. With with_header, a fifth item
+        holds the header bytes (b"" for packages and metadata-only files,
+        which are not read)
+
+    Raises:
+        OSError: If the path cannot be read
+    """
+    # Check if this is a directory (atomic package)
+    is_directory = path.is_dir()
+    header = b""
+
+    if is_directory:
+        # This is an atomic package (.app, .pkg, etc.) - hash entire directory
+        logging.info(f"    📦 Atomic package detected - hashing entire directory")
+
+        # Calculate total size of all files in directory
+        file_size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+        mtime = datetime.fromtimestamp(path.stat().st_mtime)
+
+        # Check if total size exceeds metadata-only threshold
+        is_metadata_only = metadata_only_size is not None and file_size > metadata_only_size
+
+        if is_metadata_only:
+            logging.info(f"    📏 Total package size: {file_size // 1_000_000}MB (metadata-only, skipping hash)")
+            sha256 = "METADATA_ONLY"
+        else:
+            if file_size > 10_000_000:
+                logging.info(f"    Large package detected: {file_size // 1_000_000}MB")
+
+            # Hash entire directory
+            sha256 = hash_directory(path)
+            logging.info(f"    ✅ Package hashed successfully")
+
+    else:
+        # Regular file - process normally
+        # Get file stats
+        stat_info = path.stat()
+        file_size = stat_info.st_size
+        mtime = datetime.fromtimestamp(stat_info.st_mtime)
+
+        # Check if file exceeds metadata-only threshold
+        is_metadata_only = metadata_only_size is not None and file_size > metadata_only_size
+
+        if is_metadata_only:
+            # File is too large - store metadata only, skip hashing
+            logging.info(f"    📏 File size: {file_size // 1_000_000}MB (metadata-only, skipping hash)")
+            sha256 = "METADATA_ONLY"
+        else:
+            # Log file size for large files
+            if file_size > 10_000_000:
+                logging.info(f"    Large file detected: {file_size // 1_000_000}MB")
+
+            # Hash file in chunks to avoid loading large files into memory
+            sha256_hash = hashlib.sha256()
+            with open(path, "rb") as f:
+                chunk = f.read(CHUNK_SIZE)
+                header = chunk[:SNIFF_BYTES]
+                while chunk:
+                    sha256_hash.update(chunk)
+                    chunk = f.read(CHUNK_SIZE)
+
+            sha256 = sha256_hash.hexdigest()
+
+    if with_header:
+        return file_size, mtime, sha256, is_metadata_only, header
+    return file_size, mtime, sha256, is_metadata_only
+
+def generate_hashes(file_paths, use_db=False, metadata_only_size=None, db_batch_size=500, db_flush_interval=2.0):
     hashed_files = []
 
-    # Import DB functions only if needed
+    # Import DB functions only if needed; rows are upserted in batches
+    writer = None
     if use_db:
-        from core.db import cache_file_entry
+        from core.db import FileWriter, open_writer
+        writer = open_writer(FileWriter, batch_size=db_batch_size, flush_interval=db_flush_interval)
 
     for idx, path in enumerate(file_paths, 1):
         try:
             # Log current file being processed
             logging.info(f"  [{idx}/{len(file_paths)}] Processing: {path.name}")
 
-            # Check if this is a directory (atomic package)
-            is_directory = path.is_dir()
-
-            if is_directory:
-                # This is an atomic package (.app, .pkg, etc.) - hash entire directory
-                logging.info(f"    📦 Atomic package detected - hashing entire directory")
-
-                # Calculate total size of all files in directory
-                file_size = sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
-                mtime = datetime.fromtimestamp(path.stat().st_mtime)
-
-                # Check if total size exceeds metadata-only threshold
-                is_metadata_only = metadata_only_size is not None and file_size > metadata_only_size
-
-                if is_metadata_only:
-                    logging.info(f"    📏 Total package size: {file_size // 1_000_000}MB (metadata-only, skipping hash)")
-                    sha256 = "METADATA_ONLY"
-                else:
-                    if file_size > 10_000_000:
-                        logging.info(f"    Large package detected: {file_size // 1_000_000}MB")
-
-                    # Hash entire directory
-                    sha256 = hash_directory(path)
-                    logging.info(f"    ✅ Package hashed successfully")
-
-            else:
-                # Regular file - process normally
-                # Get file stats
-                stat_info = path.stat()
-                file_size = stat_info.st_size
-                mtime = datetime.fromtimestamp(stat_info.st_mtime)
-
-                # Check if file exceeds metadata-only threshold
-                is_metadata_only = metadata_only_size is not None and file_size > metadata_only_size
-
-                if is_metadata_only:
-                    # File is too large - store metadata only, skip hashing
-                    logging.info(f"    📏 File size: {file_size // 1_000_000}MB (metadata-only, skipping hash)")
-                    sha256 = "METADATA_ONLY"
-                else:
-                    # Log file size for large files
-                    if file_size > 10_000_000:
-                        logging.info(f"    Large file detected: {file_size // 1_000_000}MB")
-
-                    # Hash file in chunks to avoid loading large files into memory
-                    sha256_hash = hashlib.sha256()
-                    with open(path, "rb") as f:
-                        while True:
-                            chunk = f.read(CHUNK_SIZE)
-                            if not chunk:
-                                break
-                            sha256_hash.update(chunk)
-
-                    sha256 = sha256_hash.hexdigest()
+            file_size, mtime, sha256, is_metadata_only, header = hash_path(path, metadata_only_size, with_header=True)
 
             # Extract metadata from path structure
             path_metadata = extract_path_metadata(path)
@@ -153,7 +191,8 @@ def generate_hashes(file_paths, use_db=False, metadata_only_size=None):
                 path=path,
                 size=file_size,
                 hash=sha256,
-                path_metadata=path_metadata
+                path_metadata=path_metadata,
+                content_type=sniff(header)
             )
             hashed_files.append(file_info)
 
@@ -161,14 +200,12 @@ def generate_hashes(file_paths, use_db=False, metadata_only_size=None):
             if path_metadata and path_metadata.get('tags'):
                 logging.debug(f"    🏷️  Path tags: {', '.join(path_metadata['tags'])}")
 
-            # Write to database if enabled
-            if use_db:
+            # Queue for the database if enabled (flushed in multi-row batches)
+            if writer:
                 try:
-                    logging.info(f"    Writing to database...")
-                    cache_file_entry(path, file_size, mtime, sha256, metadata_only=is_metadata_only)
-                    logging.info(f"    ✅ Saved to DB")
+                    writer.add(path, file_size, mtime, sha256, metadata_only=is_metadata_only, file_info=file_info)
                 except Exception as db_err:
-                    logging.warning(f"    ⚠️ Failed to write to DB: {db_err}")
+                    logging.warning(f"    ⚠️ Failed to write batch to DB: {db_err}")
 
         except PermissionError as e:
             logging.warning(f"⚠️ Permission denied: {path}")
@@ -177,5 +214,14 @@ def generate_hashes(file_paths, use_db=False, metadata_only_size=None):
         except Exception as e:
             logging.warning(f"⚠️ Skipping {path}: {e}")
 
+    if writer:
+        try:
+            writer.close()
+            logging.info(f"💾 Saved {writer.rows_written} file(s) to DB in {writer.flushes} batch(es)")
+            if writer.rows_spooled:
+                logging.warning(f"📥 Spooled {writer.rows_spooled} file(s) locally while the DB was unreachable")
+        except Exception as db_err:
+            logging.warning(f"⚠️ Failed to write batch to DB: {db_err}")
+
     logging.info(f"✅ Successfully hashed {len(hashed_files)}/{len(file_paths)} files")
     return hashed_files
\ No newline at end of file
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: keyword_matcher.py
+# Purpose: Find every occurrence of many keywords in a string with one compiled regex
+#
+# Description:
+# Compiles a list of keywords (path markers such as "/www/", "/.vscode/"
+# or "1099") into one regular expression: the keywords' trie written out
+# as nested alternations, so matching runs inside the C regex engine.
+# Where a match starts, the expression takes the longest keyword starting
+# there; every shorter keyword starting there is one of its prefixes,
+# known in advance. find_all() searches again one character after each
+# match start, so overlapping occurrences are reported too. Text after a
+# match start is re-read by the next search, which costs little for short
+# path markers. Used by the classifier's name/path rules and by the
+# organizer to locate web and application roots.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+#
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): Describe the matcher as the trie-compiled regex it is — Tim Canady
+# - 0.1.0 (2026-10-19): Trie-compiled multi-keyword matcher — Tim Canady
+###################################################################
+
+import re
+from typing import Iterable, List, Tuple
+
+
+def _trie_pattern(node: dict) -> str:
+    # node maps a character to its child; "" marks the end of a keyword
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # A keyword ends here; the longer ones are tried first (greedy)
+        return body + "?" if len(branches) > 1 else "(?:" + body + ")?"
+    return body
+
+
+class KeywordMatcher:
+    """
+    Multi-keyword matcher: one trie-compiled regex built from a fixed list of keywords.
+
+    Matching is exact (case-sensitive); callers lowercase both the keywords
+    and the text when they want case-insensitive matches.
+
+    Attributes:
+        keywords: The keywords, in the order given; ids are indexes into this
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(keywords)
+        if not all(self.keywords):
+            raise ValueError("Keywords must be non-empty strings")
+
+        trie = {}
+        for keyword in self.keywords:
+            node = trie
+            for ch in keyword:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        self._search = re.compile(_trie_pattern(trie)).search if trie else None
+
+        # Matched text -> ids of every keyword it starts with (itself included)
+        ids = {}
+        for keyword_id, keyword in enumerate(self.keywords):
+            ids.setdefault(keyword, []).append(keyword_id)
+        self._prefix_ids = {keyword: tuple(i for end in range(1, len(keyword) + 1) for i in ids.get(keyword[:end], ()))
+                            for keyword in ids}
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Every keyword occurrence in text.
+
+        Returns:
+            (start index, keyword id) pairs, ordered by start
+        """
+        found = []
+        search = self._search
+        if search is None:
+            return found
+        prefix_ids = self._prefix_ids
+        match = search(text)
+        while match is not None:
+            start = match.start()
+            found.extend((start, keyword_id) for keyword_id in prefix_ids[match.group()])
+            match = search(text, start + 1)
+        return found
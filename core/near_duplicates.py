@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: near_duplicates.py
+# Purpose: Detect near-duplicate files that exact hashing misses
+#
+# Description:
+# Finds images that are the same picture after resizing, re-encoding
+# or exporting. Each image gets a 64-bit difference hash (dHash) computed
+# from a downscaled grayscale decode; hashes are indexed in a BK-tree so
+# Hamming-radius queries avoid comparing every pair. Matches are clustered
+# and recorded on FileInfo.near_duplicate_of / FileInfo.similarity.
+# Perceptual hashes are cached by content hash so reruns skip decoding.
+#
+# Text-like files (documents, code, data) get MinHash signatures over word
+# shingles; LSH banding buckets signatures so only files sharing a band
+# are compared, keeping candidate generation roughly linear. Signatures
+# are cached as compact hex strings.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.2.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.2.1 (2026-10-19): Compare every pair within an LSH bucket; compact hex signature cache — Tim Canady
+# - 0.2.0 (2026-10-18): MinHash/LSH near-duplicate detection for documents, code and data — Tim Canady
+# - 0.1.0 (2026-10-18): Perceptual-hash image clustering with BK-tree index — Tim Canady
+###################################################################
+
+import logging
+import os
+import random
+import re
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+from models.file_info import FileInfo
+from utils.cache import load_cache, save_cache
+
+logger = logging.getLogger(__name__)
+
+# Perceptual hashes keyed by SHA256 content hash
+PERCEPTUAL_CACHE_FILE = Path(".perceptual_hash_cache.json")
+
+# dHash grid: 8x8 comparisons -> 64-bit hash
+DHASH_SIZE = 8
+
+# Default Hamming radius (out of 64 bits) for two images to count as near-duplicates
+DEFAULT_IMAGE_DISTANCE = 6
+
+# MinHash signatures keyed by SHA256 content hash
+MINHASH_CACHE_FILE = Path(".minhash_cache.json")
+
+# Categories whose text content is compared
+TEXT_CATEGORIES = ("document", "code", "data")
+
+# MinHash/LSH parameters: 16 bands x 8 rows puts the LSH threshold near 0.7
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+SHINGLE_SIZE = 5
+DEFAULT_TEXT_SIMILARITY = 0.8
+
+# Buckets up to this size compare every pair; larger ones (boilerplate shared
+# by many files) compare each member with the bucket's first member only
+LSH_MAX_BUCKET = 200
+
+# Only the first few MB of text are shingled
+MAX_TEXT_BYTES = 4 * 1024 * 1024
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(MINHASH_PERMUTATIONS)]
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two integer hashes."""
+    return bin(a ^ b).count("1")
+
+
+def dhash(path: Path, hash_size: int = DHASH_SIZE) -> Optional[int]:
+    """
+    Compute a difference hash for an image.
+
+    The image is decoded at reduced resolution where the codec supports it
+    (JPEG draft mode), converted to grayscale and shrunk to
+    (hash_size + 1) x hash_size; each bit records whether a pixel is brighter
+    than its right-hand neighbour.
+
+    Args:
+        path: Path to the image file
+        hash_size: Grid size (8 -> 64-bit hash)
+
+    Returns:
+        Hash as an integer, or None if the image can't be decoded
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(path) as img:
+            # Let JPEG decode at 1/2..1/8 scale instead of full resolution
+            img.draft("L", (hash_size * 8, hash_size * 8))
+            small = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+            pixels = list(small.getdata())
+    except Exception as e:
+        logger.debug(f"    ⚠️ Could not decode image {path}: {e}")
+        return None
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def _dhash_worker(path_str: str) -> Optional[int]:
+    """Process-pool entry point for dhash()."""
+    return dhash(Path(path_str))
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes with Hamming distance.
+
+    Each node stores a hash, the items carrying it, and children keyed by
+    their distance to the node. The triangle inequality lets a radius query
+    skip every subtree whose edge distance lies outside [d - r, d + r].
+    """
+
+    def __init__(self):
+        self._root = None
+        self.size = 0
+
+    def add(self, value: int, item) -> None:
+        """Insert an item under a hash value."""
+        self.size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> List[tuple]:
+        """
+        Find all items within a Hamming radius of a hash.
+
+        Returns:
+            List of (item, distance) tuples
+        """
+        if self._root is None:
+            return []
+
+        matches = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= radius:
+                matches.extend((item, distance) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return matches
+
+
+def _cluster(pairs: List[tuple], count: int) -> List[List[int]]:
+    """Union-find clustering of index pairs; returns clusters with 2+ members."""
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for a, b in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+
+    clusters = {}
+    for i in range(count):
+        clusters.setdefault(find(i), []).append(i)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def _compute_perceptual_hashes(files: List[FileInfo], cache: Dict[str, str],
+                               workers: Optional[int]) -> Dict[str, int]:
+    """
+    Return dHash per content hash, decoding only images not already cached.
+
+    Identical files share a content hash, so each distinct image is decoded once.
+    """
+    results = {}
+    pending = {}
+
+    for file_info in files:
+        if file_info.hash in results or file_info.hash in pending:
+            continue
+        cached = cache.get(file_info.hash)
+        if cached is not None:
+            results[file_info.hash] = int(cached, 16)
+        else:
+            pending[file_info.hash] = str(file_info.path)
+
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        logger.info(f"🖼️  Computing perceptual hashes for {len(pending)} image(s) on {workers} worker(s)...")
+        content_hashes = list(pending)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            values = pool.map(_dhash_worker, [pending[h] for h in content_hashes],
+                              chunksize=max(1, len(content_hashes) // (workers * 4)))
+            for content_hash, value in zip(content_hashes, values):
+                if value is not None:
+                    results[content_hash] = value
+                    cache[content_hash] = f"{value:016x}"
+
+    return results
+
+
+def find_near_duplicate_images(files: List[FileInfo], max_distance: int = DEFAULT_IMAGE_DISTANCE,
+                               workers: Optional[int] = None,
+                               cache_file: Path = PERCEPTUAL_CACHE_FILE) -> List[List[FileInfo]]:
+    """
+    Cluster images that look the same but are not byte-identical.
+
+    Only files classified as "image" with a content hash are considered; exact
+    duplicates are skipped since they are already handled by detect_duplicates.
+    Within each cluster the largest file (usually the highest resolution) is
+    the representative; the others get near_duplicate_of and similarity set.
+
+    Args:
+        files: Classified FileInfo objects
+        max_distance: Maximum Hamming distance (out of 64 bits) between neighbours
+        workers: Process count for decoding (default: CPU count)
+        cache_file: JSON cache of perceptual hashes keyed by content hash
+
+    Returns:
+        List of clusters, each sorted with the representative first
+    """
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        logger.warning("⚠️ Pillow is not installed - skipping near-duplicate image detection")
+        return []
+
+    images = [f for f in files
+              if f.type == "image" and f.hash and f.hash != "METADATA_ONLY"
+              and not f.is_duplicate and f.path.is_file()]
+    if len(images) < 2:
+        return []
+
+    cache = load_cache(cache_file)
+    hashes = _compute_perceptual_hashes(images, cache, workers)
+    save_cache(cache, cache_file)
+
+    # Index distinct perceptual hashes; each tree item is an index into `images`
+    indexed = [(idx, hashes[f.hash]) for idx, f in enumerate(images) if f.hash in hashes]
+    tree = BKTree()
+    pairs = []
+    for idx, value in indexed:
+        for other_idx, _ in tree.search(value, max_distance):
+            pairs.append((other_idx, idx))
+        tree.add(value, idx)
+
+    clusters = []
+    for members in _cluster(pairs, len(images)):
+        group = sorted((images[i] for i in members), key=lambda f: f.size, reverse=True)
+        representative = group[0]
+        rep_hash = hashes[representative.hash]
+        for member in group[1:]:
+            distance = hamming_distance(rep_hash, hashes[member.hash])
+            member.near_duplicate_of = representative.path
+            member.similarity = round(1 - distance / (DHASH_SIZE * DHASH_SIZE), 4)
+        clusters.append(group)
+
+    logger.info(f"🖼️  Near-duplicate images: {len(clusters)} cluster(s), "
+                f"{sum(len(c) - 1 for c in clusters)} near-duplicate file(s)")
+    return clusters
+
+
+def extract_text(path: Path) -> Optional[str]:
+    """
+    Extract text from a document, source or data file.
+
+    PDF and DOCX use PyMuPDF / python-docx (imported on demand); everything
+    else is read as plain text. Files that look binary return None.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Extracted text or None
+    """
+    ext = path.suffix.lower()
+
+    try:
+        if ext == ".pdf":
+            import fitz  # PyMuPDF
+            with fitz.open(path) as doc:
+                return "\n".join(page.get_text() for page in doc)[:MAX_TEXT_BYTES]
+
+        if ext == ".docx":
+            from docx import Document
+            return "\n".join(p.text for p in Document(path).paragraphs)[:MAX_TEXT_BYTES]
+
+        with open(path, "rb") as f:
+            data = f.read(MAX_TEXT_BYTES)
+        if b"\x00" in data[:8192]:
+            return None
+        return data.decode("utf-8", errors="ignore")
+    except ImportError as e:
+        logger.debug(f"    ⚠️ No text extractor for {path}: {e}")
+    except Exception as e:
+        logger.debug(f"    ⚠️ Could not extract text from {path}: {e}")
+    return None
+
+
+def minhash_signature(text: str) -> List[int]:
+    """
+    MinHash signature over word shingles of a text.
+
+    Args:
+        text: Document text
+
+    Returns:
+        List of MINHASH_PERMUTATIONS integers (empty if the text has no words)
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    if not tokens:
+        return []
+
+    if len(tokens) < SHINGLE_SIZE:
+        shingles = {zlib.crc32(" ".join(tokens).encode("utf-8"))}
+    else:
+        shingles = {zlib.crc32(" ".join(tokens[i:i + SHINGLE_SIZE]).encode("utf-8"))
+                    for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+    return [min((a * x + b) % _MERSENNE_PRIME for x in shingles) for a, b in _PERMUTATIONS]
+
+
+def _minhash_worker(path_str: str) -> List[int]:
+    """Process-pool entry point: extract text and sign it."""
+    text = extract_text(Path(path_str))
+    return minhash_signature(text) if text else []
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity: fraction of matching signature slots."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def _encode_signature(signature: List[int]) -> str:
+    # Every slot is below 2**61, so 16 hex digits each
+    return "".join(f"{value:016x}" for value in signature)
+
+
+def _decode_signature(cached) -> List[int]:
+    if isinstance(cached, list):  # Caches written before 0.2.1
+        return cached
+    return [int(cached[i:i + 16], 16) for i in range(0, len(cached), 16)]
+
+
+def _compute_signatures(files: List[FileInfo], cache: Dict[str, str],
+                        workers: Optional[int]) -> Dict[str, List[int]]:
+    """Return MinHash signature per content hash, signing only files not already cached."""
+    results = {}
+    pending = {}
+
+    for file_info in files:
+        if file_info.hash in results or file_info.hash in pending:
+            continue
+        cached = cache.get(file_info.hash)
+        if cached is not None:
+            results[file_info.hash] = _decode_signature(cached)
+        else:
+            pending[file_info.hash] = str(file_info.path)
+
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        logger.info(f"📄 Computing MinHash signatures for {len(pending)} file(s) on {workers} worker(s)...")
+        content_hashes = list(pending)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            signatures = pool.map(_minhash_worker, [pending[h] for h in content_hashes],
+                                  chunksize=max(1, len(content_hashes) // (workers * 4)))
+            for content_hash, signature in zip(content_hashes, signatures):
+                # Empty signatures are cached too, so files without text aren't re-read
+                results[content_hash] = signature
+                cache[content_hash] = _encode_signature(signature)
+
+    return {h: sig for h, sig in results.items() if sig}
+
+
+def find_near_duplicate_documents(files: List[FileInfo], threshold: float = DEFAULT_TEXT_SIMILARITY,
+                                  workers: Optional[int] = None,
+                                  cache_file: Path = MINHASH_CACHE_FILE) -> List[List[FileInfo]]:
+    """
+    Cluster documents, code and data files with nearly identical text.
+
+    Signatures are split into LSH_BANDS bands; files sharing any band bucket
+    become candidates, and every candidate pair in a bucket is compared once
+    (buckets over LSH_MAX_BUCKET compare against their first member only).
+    Candidates at or above the similarity threshold are clustered; the
+    largest file in each cluster is the representative.
+
+    Args:
+        files: Classified FileInfo objects
+        threshold: Minimum estimated Jaccard similarity (0.0 - 1.0)
+        workers: Process count for text extraction (default: CPU count)
+        cache_file: JSON cache of signatures keyed by content hash
+
+    Returns:
+        List of clusters, each sorted with the representative first
+    """
+    candidates = [f for f in files
+                  if f.type in TEXT_CATEGORIES and f.hash and f.hash != "METADATA_ONLY"
+                  and not f.is_duplicate and f.path.is_file()]
+    if len(candidates) < 2:
+        return []
+
+    cache = load_cache(cache_file)
+    signatures = _compute_signatures(candidates, cache, workers)
+    save_cache(cache, cache_file, indent=None)
+
+    buckets = defaultdict(list)
+    for idx, file_info in enumerate(candidates):
+        signature = signatures.get(file_info.hash)
+        if not signature:
+            continue
+        for band in range(LSH_BANDS):
+            key = (band, tuple(signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]))
+            buckets[key].append(idx)
+
+    pairs = set()
+    compared = set()
+    for members in buckets.values():
+        if len(members) > LSH_MAX_BUCKET:
+            logger.debug(f"    ⚠️ LSH bucket of {len(members)} files compared against its first member only")
+            bucket_pairs = ((members[0], other) for other in members[1:])
+        else:
+            bucket_pairs = ((a, b) for i, a in enumerate(members) for b in members[i + 1:])
+
+        # Pairs sharing several bands are compared once
+        for pair in bucket_pairs:
+            if pair in compared:
+                continue
+            compared.add(pair)
+            a, b = pair
+            if estimate_similarity(signatures[candidates[a].hash], signatures[candidates[b].hash]) >= threshold:
+                pairs.add(pair)
+
+    clusters = []
+    for members in _cluster(list(pairs), len(candidates)):
+        group = sorted((candidates[i] for i in members), key=lambda f: f.size, reverse=True)
+        representative = group[0]
+        rep_signature = signatures[representative.hash]
+        for member in group[1:]:
+            member.near_duplicate_of = representative.path
+            member.similarity = round(estimate_similarity(rep_signature, signatures[member.hash]), 4)
+        clusters.append(group)
+
+    logger.info(f"📄 Near-duplicate documents: {len(clusters)} cluster(s), "
+                f"{sum(len(c) - 1 for c in clusters)} near-duplicate file(s)")
+    return clusters
@@ -8,14 +8,18 @@
 # Description of code and how it works:
 # Generates a dictionary mapping target folder paths to lists of
 # files based on file type, owner, and year. Prepares plan for moving.
+# Web and application roots are located with the classifier's own
+# web/application path rules (one keyword-matcher scan per path).
 #
 # Author: Tim Canady
 # Created: 2025-09-28
 #
-# Version: 0.3.0
-# Last Modified: 2025-11-14 by Tim Canady
+# Version: 0.4.1
+# Last Modified: 2026-10-19 by Tim Canady
 #
 # Revision History:
+# - 0.4.1 (2026-10-19): Header wording for the keyword matcher — Tim Canady
+# - 0.4.0 (2026-10-19): Web/application roots found with the classifier's shared keyword matcher — Tim Canady
 # - 0.3.0 (2025-11-14): Added application structure preservation (PacketTracer, etc.) — Tim Canady
 # - 0.2.0 (2025-11-14): Added web project structure preservation (http, www, website directories) — Tim Canady
 # - 0.1.0 (2025-11-04): Initial organizer logic — Tim Canady
@@ -23,6 +27,7 @@
 
 from collections import defaultdict
 from models.file_info import FileInfo
+from core.classifier import find_category_marker
 from typing import List, Tuple, Dict, Optional
 from pathlib import Path
 import os
@@ -143,19 +148,16 @@ def _plan_web_project(file_info: FileInfo, base_dir: Path, preserve_root_structu
     if preserve_root_structure and file_info.path_metadata:
         root_folder = file_info.path_metadata.get('root_folder')
 
-    # Find the web root directory (http, www, website, etc.)
+    # Find the web root directory (http, www, website, etc.), using the
+    # markers of the classifier's web rule
     file_path_str = str(file_info.path)
-    web_roots = ['/http/', '/https/', '/www/', '/website/', '/websites/', '/web/',
-                 '/html/', '/public_html/', '/htdocs/', '/web-projects/', '/sites/']
-
     web_root_found = None
     web_root_idx = -1
 
-    for web_root in web_roots:
-        if web_root in file_path_str:
-            web_root_found = web_root.strip('/')
-            web_root_idx = file_path_str.find(web_root)
-            break
+    marker = find_category_marker(file_path_str, "web")
+    if marker:
+        web_root_idx, web_root = marker
+        web_root_found = web_root.strip('/')
 
     if web_root_found and web_root_idx >= 0:
         # Extract the path from web root onwards
@@ -200,21 +202,16 @@ def _plan_application_project(file_info: FileInfo, base_dir: Path, preserve_root
     if preserve_root_structure and file_info.path_metadata:
         root_folder = file_info.path_metadata.get('root_folder')
 
-    # Find the application root directory (packettracer, etc.)
-    file_path_str = str(file_info.path).lower()
-    app_roots = ['/packettracer/', '/packet tracer/']
-
+    # Find the application root directory (packettracer, etc.), using the
+    # markers of the classifier's application rule (matched case-insensitively;
+    # the marker comes back as written in the path)
     app_root_found = None
     app_root_idx = -1
 
-    for app_root in app_roots:
-        if app_root in file_path_str:
-            # Get the original case version from the actual path
-            actual_path_str = str(file_info.path)
-            app_root_idx = file_path_str.find(app_root)
-            # Extract the actual directory name from the original path
-            app_root_found = actual_path_str[app_root_idx:app_root_idx+len(app_root)].strip('/')
-            break
+    marker = find_category_marker(file_info.path, "application")
+    if marker:
+        app_root_idx, app_root = marker
+        app_root_found = app_root.strip('/')
 
     if app_root_found and app_root_idx >= 0:
         # Extract the path from app root onwards
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: report_writer.py
+# Purpose: Stream duplicate reports to text, JSONL or CSV files
+#
+# Description:
+# Writes duplicate report records one group at a time instead of building
+# the whole report in memory. Supports text, JSONL and CSV output with
+# optional gzip compression. A bounded heap keeps the top-K groups by
+# wasted bytes for the summary, and the console only gets that summary,
+# never the full listing. Hash groups follow the originals the
+# deduplicator marked (including cataloged originals from --cross-run);
+# members it left unmarked are listed apart and never count as waste.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.3.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.3.1 (2026-10-19): Groups follow marked originals; unverified members reported apart, not as waste — Tim Canady
+# - 0.3.0 (2026-10-19): write_report_records/hash_group_record for groups streamed from the DB — Tim Canady
+# - 0.2.0 (2026-10-18): Hash groups come from the compact DigestIndex — Tim Canady
+# - 0.1.0 (2026-10-18): Streaming report writer (text/jsonl/csv, gzip, top-K summary) — Tim Canady
+###################################################################
+
+import csv
+import gzip
+import heapq
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+from models.file_info import FileInfo
+from models.directory_group import DirectoryGroup
+from core.deduplicator import VERIFIED, MISMATCH, VERIFY_ERROR, VERIFY_SKIPPED, hash_groups
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = ("text", "jsonl", "csv")
+
+CSV_FIELDS = ["group_type", "group_id", "key", "role", "path", "size", "wasted", "verification", "similarity"]
+
+DEFAULT_TOP_K = 10
+
+
+def open_report(output_file: str, compress: bool = False):
+    """Open a report file for text writing, gzip-compressed if requested or named *.gz."""
+    if compress and not output_file.endswith(".gz"):
+        output_file += ".gz"
+    if output_file.endswith(".gz"):
+        return gzip.open(output_file, "wt", encoding="utf-8", newline=""), output_file
+    return open(output_file, "w", encoding="utf-8", newline=""), output_file
+
+
+def _verification_summary(members: List[FileInfo]) -> str:
+    """Summarize verification statuses of a group's members, e.g. '2/3 verified, 1 mismatch'."""
+    counts = defaultdict(int)
+    for member in members:
+        counts[member.verification or "unverified"] += 1
+
+    parts = [f"{counts.pop(VERIFIED, 0)}/{len(members)} {VERIFIED}"]
+    parts.extend(f"{count} {status}" for status, count in sorted(counts.items()))
+    return ", ".join(parts)
+
+
+def _near_duplicate_groups(files: List[FileInfo]) -> List[tuple]:
+    """
+    Collect near-duplicate clusters recorded on FileInfo.near_duplicate_of.
+
+    Returns:
+        List of (representative, members) tuples, members sorted by similarity
+    """
+    clusters = defaultdict(list)
+    for file_info in files:
+        if file_info.near_duplicate_of is not None:
+            clusters[file_info.near_duplicate_of].append(file_info)
+
+    if not clusters:
+        return []
+
+    representatives = {f.path: f for f in files if f.path in clusters}
+    groups = []
+    for rep_path, members in clusters.items():
+        representative = representatives.get(rep_path) or FileInfo(path=rep_path, size=0)
+        members.sort(key=lambda f: f.similarity or 0, reverse=True)
+        groups.append((representative, members))
+    return groups
+
+
+def iter_report_records(files: List[FileInfo],
+                        directory_groups: Optional[List[DirectoryGroup]] = None) -> Iterator[Dict]:
+    """
+    Yield one report record per duplicate directory, hash group and near-duplicate cluster.
+
+    Groups come out in discovery order; nothing is sorted. Files inside
+    duplicate folders are covered by their folder's record.
+    """
+    for idx, group in enumerate(directory_groups or [], 1):
+        yield {
+            "type": "directory",
+            "id": idx,
+            "key": group.fingerprint,
+            "file_count": group.file_count,
+            "size": group.size,
+            "wasted": group.wasted_space,
+            "original": {"path": str(group.original)},
+            "duplicates": [{"path": str(d)} for d in group.duplicates],
+        }
+
+    # Files inside duplicate folders are excluded from the digest index
+    loose_files = [f for f in files if f.duplicate_dir is None]
+    idx = 0
+    for group in hash_groups(loose_files):
+        for file_list in _marked_groups([loose_files[i] for i in group]):
+            idx += 1
+            yield hash_group_record(idx, file_list)
+
+    for idx, (representative, members) in enumerate(_near_duplicate_groups(files), 1):
+        yield {
+            "type": "near",
+            "id": idx,
+            "key": representative.type or "unknown",
+            "count": len(members) + 1,
+            "wasted": sum(f.size for f in members),
+            "original": {"path": str(representative.path)},
+            "duplicates": [{"path": str(f.path), "similarity": f.similarity} for f in members],
+        }
+
+
+def _marked_groups(file_list: List[FileInfo]) -> List[List[FileInfo]]:
+    """
+    Split one hash group by the original each member was marked against.
+
+    The marked original leads its group; a cataloged original outside this
+    run stands in as a path-only FileInfo. Unmarked members (mismatches,
+    unverified) join the first group. Without any marks, the first file
+    seen is the original.
+    """
+    by_original = {}
+    for file_info in file_list:
+        if file_info.is_duplicate and file_info.original_path is not None:
+            by_original.setdefault(file_info.original_path, []).append(file_info)
+    if not by_original:
+        return [file_list]
+
+    in_run = {f.path: f for f in file_list}
+    groups = []
+    for original_path, members in by_original.items():
+        original = in_run.get(original_path) or FileInfo(path=original_path, size=members[0].size,
+                                                         hash=members[0].hash)
+        groups.append([original] + members)
+
+    grouped = {id(f) for group in groups for f in group}
+    groups[0].extend(f for f in file_list if id(f) not in grouped)
+    return groups
+
+
+def hash_group_record(idx: int, file_list: List[FileInfo]) -> Dict:
+    """
+    Report record for one hash group (original first, as marked by the deduplicator).
+
+    Members the deduplicator left unmarked because their bytes could not be
+    compared (error, skipped) are listed as unverified; like mismatches, they
+    add nothing to wasted bytes or the duplicate count.
+    """
+    original = file_list[0]
+    duplicates = [f for f in file_list[1:] if f.is_duplicate or f.verification in (None, VERIFIED)]
+    mismatches = [f for f in file_list[1:] if f.verification == MISMATCH]
+    unverified = [f for f in file_list[1:]
+                  if not f.is_duplicate and f.verification in (VERIFY_ERROR, VERIFY_SKIPPED)]
+    return {
+        "type": "hash",
+        "id": idx,
+        "key": original.hash,
+        "size": original.size,
+        "count": len(file_list),
+        "wasted": original.size * len(duplicates),
+        "verification": _verification_summary(file_list[1:]) if any(f.verification for f in file_list) else None,
+        "original": {"path": str(original.path), "verification": original.verification},
+        "duplicates": [{"path": str(f.path), "verification": f.verification} for f in duplicates],
+        "mismatches": [{"path": str(f.path), "verification": f.verification} for f in mismatches],
+        "unverified": [{"path": str(f.path), "verification": f.verification} for f in unverified],
+    }
+
+
+def _text_lines(record: Dict) -> List[str]:
+    """Render a record as text report lines."""
+    lines = []
+    if record["type"] == "directory":
+        lines.append(f"Duplicate Directory #{record['id']}")
+        lines.append(f"  Fingerprint: {record['key']}")
+        lines.append(f"  Contents: {record['file_count']:,} files, {record['size']:,} bytes ({record['size'] / 1_048_576:.2f} MB)")
+        lines.append(f"  Copies: {len(record['duplicates']) + 1}")
+        lines.append(f"  Wasted: {record['wasted']:,} bytes ({record['wasted'] / 1_048_576:.2f} MB)")
+        lines.append("")
+        lines.append(f"  Original: {record['original']['path']}/")
+        lines.extend(f"  Duplicate: {d['path']}/" for d in record["duplicates"])
+    elif record["type"] == "hash":
+        lines.append(f"Duplicate Group #{record['id']}")
+        lines.append(f"  Hash: {record['key']}")
+        lines.append(f"  Size: {record['size']:,} bytes ({record['size'] / 1_048_576:.2f} MB)")
+        lines.append(f"  Count: {record['count']} files")
+        lines.append(f"  Wasted: {record['wasted']:,} bytes ({record['wasted'] / 1_048_576:.2f} MB)")
+        if record["verification"]:
+            lines.append(f"  Verification: {record['verification']}")
+        lines.append("")
+        lines.append(f"  Original: {record['original']['path']}")
+        for dup in record["duplicates"]:
+            status = f" [{dup['verification']}]" if dup["verification"] else ""
+            lines.append(f"  Duplicate: {dup['path']}{status}")
+        lines.extend(f"  Mismatch (same hash, different bytes): {m['path']}" for m in record["mismatches"])
+        lines.extend(f"  Unverified ({u['verification']}, not marked): {u['path']}" for u in record.get("unverified", []))
+    else:
+        lines.append(f"Near-Duplicate Cluster #{record['id']} ({record['key']})")
+        lines.append(f"  Count: {record['count']} files")
+        lines.append("")
+        lines.append(f"  Representative: {record['original']['path']}")
+        lines.extend(f"  Similar ({d['similarity']:.0%}): {d['path']}" for d in record["duplicates"])
+    lines.append("")
+    lines.append("-"*80)
+    lines.append("")
+    return lines
+
+
+def _csv_rows(record: Dict) -> Iterator[Dict]:
+    """Flatten a record into one CSV row per file or folder."""
+    base = {"group_type": record["type"], "group_id": record["id"], "key": record["key"],
+            "size": record.get("size"), "wasted": record["wasted"]}
+    original_role = "representative" if record["type"] == "near" else "original"
+    member_role = "similar" if record["type"] == "near" else "duplicate"
+
+    yield dict(base, role=original_role, path=record["original"]["path"],
+               verification=record["original"].get("verification"))
+    for dup in record["duplicates"]:
+        yield dict(base, role=member_role, path=dup["path"],
+                   verification=dup.get("verification"), similarity=dup.get("similarity"))
+    for mismatch in record.get("mismatches", []):
+        yield dict(base, role="mismatch", path=mismatch["path"], verification=mismatch["verification"])
+    for member in record.get("unverified", []):
+        yield dict(base, role="unverified", path=member["path"], verification=member["verification"])
+
+
+class _Summary:
+    """Running totals plus a bounded min-heap of the top-K groups by wasted bytes."""
+
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.heap = []
+        self.counts = defaultdict(int)
+        self.files = defaultdict(int)
+        self.wasted = 0
+        self.verification = defaultdict(int)
+
+    def add(self, record: Dict) -> None:
+        self.counts[record["type"]] += 1
+        self.files[record["type"]] += len(record["duplicates"])
+        if record["type"] != "near":
+            self.wasted += record["wasted"]
+        for member in record["duplicates"] + record.get("mismatches", []) + record.get("unverified", []):
+            if member.get("verification"):
+                self.verification[member["verification"]] += 1
+
+        if self.top_k > 0 and record["type"] != "near":
+            entry = (record["wasted"], record["type"], record["id"], record["original"]["path"], len(record["duplicates"]))
+            if len(self.heap) < self.top_k:
+                heapq.heappush(self.heap, entry)
+            elif entry > self.heap[0]:
+                heapq.heapreplace(self.heap, entry)
+
+    def top(self) -> List[tuple]:
+        return sorted(self.heap, reverse=True)
+
+    def as_dict(self) -> Dict:
+        return {
+            "type": "summary",
+            "directory_groups": self.counts["directory"],
+            "duplicate_groups": self.counts["hash"],
+            "duplicate_files": self.files["hash"],
+            "near_duplicate_clusters": self.counts["near"],
+            "near_duplicate_files": self.files["near"],
+            "wasted": self.wasted,
+            "verification": dict(self.verification),
+            "top": [{"wasted": w, "group_type": t, "group_id": i, "original": p, "copies": c}
+                    for w, t, i, p, c in self.top()],
+        }
+
+    def lines(self) -> List[str]:
+        lines = ["="*80, "SUMMARY", "="*80]
+        if self.counts["directory"]:
+            lines.append(f"Duplicate directory groups: {self.counts['directory']} "
+                         f"({self.files['directory']} redundant folders)")
+        lines.append(f"Total duplicate groups: {self.counts['hash']}")
+        lines.append(f"Total duplicate files: {self.files['hash']}")
+        lines.append(f"Total wasted space: {self.wasted:,} bytes ({self.wasted / 1_073_741_824:.2f} GB)")
+        if self.counts["near"]:
+            lines.append(f"Near-duplicate clusters: {self.counts['near']} ({self.files['near']} similar files)")
+        if self.verification:
+            lines.append("Verification: " + ", ".join(
+                f"{count} {status}" for status, count in sorted(self.verification.items())))
+        if self.heap:
+            lines.append("")
+            lines.append(f"Top {len(self.heap)} by wasted space:")
+            for wasted, group_type, group_id, path, copies in self.top():
+                label = "Directory" if group_type == "directory" else "Group"
+                lines.append(f"  {wasted / 1_048_576:>12,.2f} MB  {label} #{group_id} ({copies} duplicate(s)): {path}")
+        lines.append("="*80)
+        return lines
+
+
+def write_duplicate_report(files: List[FileInfo], output_file: Optional[str] = None, fmt: str = "text",
+                           directory_groups: Optional[List[DirectoryGroup]] = None,
+                           top_k: int = DEFAULT_TOP_K, compress: bool = False) -> Dict:
+    """
+    Stream the duplicate report to a file and print a summary to the console.
+
+    Args:
+        files: List of FileInfo objects
+        output_file: Report path (None = console summary only)
+        fmt: "text", "jsonl" or "csv"
+        directory_groups: Duplicate directories from detect_duplicate_directories()
+        top_k: Number of largest groups (by wasted bytes) listed in the summary
+        compress: Gzip the report (also implied by a .gz file name)
+
+    Returns:
+        Summary dictionary (counts, wasted bytes, top-K groups)
+    """
+    records = iter_report_records(files, directory_groups)
+    return write_report_records(records, output_file, fmt=fmt, top_k=top_k, compress=compress)
+
+
+def write_report_records(records: Iterator[Dict], output_file: Optional[str] = None, fmt: str = "text",
+                         top_k: int = DEFAULT_TOP_K, compress: bool = False) -> Dict:
+    """
+    Stream report records to a file and print a summary to the console.
+
+    Records are written as they are produced, so a generator over groups
+    coming out of the database is never held in memory.
+
+    Args:
+        records: Iterable of records (see iter_report_records(), hash_group_record())
+        output_file: Report path (None = console summary only)
+        fmt: "text", "jsonl" or "csv"
+        top_k: Number of largest groups (by wasted bytes) listed in the summary
+        compress: Gzip the report (also implied by a .gz file name)
+
+    Returns:
+        Summary dictionary (counts, wasted bytes, top-K groups)
+    """
+    if fmt not in REPORT_FORMATS:
+        raise ValueError(f"Unknown report format: {fmt}. Use one of: {', '.join(REPORT_FORMATS)}")
+
+    summary = _Summary(top_k)
+
+    if output_file:
+        handle, output_file = open_report(output_file, compress)
+        with handle:
+            csv_writer = None
+            if fmt == "text":
+                handle.write("\n".join(["="*80, "                    DUPLICATE FILES REPORT", "="*80, "", ""]))
+            elif fmt == "csv":
+                csv_writer = csv.DictWriter(handle, fieldnames=CSV_FIELDS)
+                csv_writer.writeheader()
+
+            for record in records:
+                summary.add(record)
+                if fmt == "text":
+                    handle.write("\n".join(_text_lines(record)) + "\n")
+                elif fmt == "jsonl":
+                    handle.write(json.dumps(record) + "\n")
+                else:
+                    csv_writer.writerows(_csv_rows(record))
+
+            if fmt == "text":
+                handle.write("\n".join(summary.lines()) + "\n")
+            elif fmt == "jsonl":
+                handle.write(json.dumps(summary.as_dict()) + "\n")
+    else:
+        for record in records:
+            summary.add(record)
+
+    if not any(summary.counts.values()):
+        logger.info("✅ No duplicates found!")
+    else:
+        print("\n" + "\n".join(summary.lines()))
+
+    if output_file:
+        logger.info(f"\n📄 Duplicate report saved to: {output_file}")
+
+    return summary.as_dict()
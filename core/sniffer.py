@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: sniffer.py
+# Purpose: Recognize file formats from their first bytes (magic numbers)
+#
+# Description:
+# Matches the first SNIFF_BYTES of a file against a table of magic
+# numbers (JPEG, PNG, PDF, ZIP, ELF, Mach-O, SQLite, ...) and returns a
+# MIME content type. The hasher passes in the start of the first chunk it
+# already read, so sniffing costs no extra I/O; the classifier uses the
+# content type for files without a known extension and for files whose
+# extension contradicts their content. sniff_file() reads the header
+# itself, for callers that classify files without hashing them.
+# Signatures short enough to start ordinary text (MZ, ID3, TIFF byte
+# orders) are checked against the rest of their header, and never
+# overrule a text, document, data or code extension.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+#
+# Version: 0.2.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.2.1 (2026-10-19): Header checks for MZ, ID3 and TIFF; weak signatures never overrule text extensions — Tim Canady
+# - 0.2.0 (2026-10-19): sniff_file() for callers that did not hash the file — Tim Canady
+# - 0.1.0 (2026-10-19): Magic-number table and sniff() — Tim Canady
+###################################################################
+
+import struct
+from pathlib import Path
+from typing import Optional
+
+# Header bytes kept from the hashing read (tar's "ustar" sits at offset 257)
+SNIFF_BYTES = 512
+
+# Container formats hold anything (.docx, .jar and .apk are ZIPs), so they
+# never overrule an extension; they only classify files that have none
+ANY = None
+
+# (signature, content type, category, other extension categories that fit).
+# A signature is ((offset, bytes), ...), all of which must match; the first
+# matching rule wins, so specific signatures come before generic ones.
+MAGIC_RULES = (
+    # Images
+    (((0, b"\xff\xd8\xff"),), "image/jpeg", "image", ()),
+    (((0, b"\x89PNG\r\n\x1a\n"),), "image/png", "image", ()),
+    (((0, b"GIF87a"),), "image/gif", "image", ()),
+    (((0, b"GIF89a"),), "image/gif", "image", ()),
+    (((0, b"II*\x00"),), "image/tiff", "image", ()),  # Also CR2, NEF, DNG raw files
+    (((0, b"MM\x00*"),), "image/tiff", "image", ()),
+    (((0, b"RIFF"), (8, b"WEBP")), "image/webp", "image", ()),
+    (((0, b"8BPS"),), "image/vnd.adobe.photoshop", "image", ()),
+    (((4, b"ftypheic"),), "image/heic", "image", ()),
+    (((4, b"ftypheix"),), "image/heic", "image", ()),
+    (((4, b"ftypmif1"),), "image/heic", "image", ()),
+    (((4, b"ftypavif"),), "image/avif", "image", ()),
+    # Audio and video
+    (((4, b"ftypM4A "),), "audio/mp4", "audio", ("video",)),
+    (((4, b"ftypqt  "),), "video/quicktime", "video", ()),
+    (((4, b"ftyp"),), "video/mp4", "video", ("audio", "image")),  # Other ISO media brands
+    (((0, b"\x1aE\xdf\xa3"),), "video/x-matroska", "video", ("audio",)),  # MKV, WebM
+    (((0, b"RIFF"), (8, b"AVI ")), "video/x-msvideo", "video", ()),
+    (((0, b"\x00\x00\x01\xba"),), "video/mpeg", "video", ()),
+    (((0, b"\x00\x00\x01\xb3"),), "video/mpeg", "video", ()),
+    (((0, b"ID3"),), "audio/mpeg", "audio", ()),
+    (((0, b"fLaC"),), "audio/flac", "audio", ()),
+    (((0, b"OggS"),), "audio/ogg", "audio", ("video",)),
+    (((0, b"RIFF"), (8, b"WAVE")), "audio/wav", "audio", ()),
+    (((0, b"FORM"), (8, b"AIFF")), "audio/aiff", "audio", ()),
+    (((0, b"MThd"),), "audio/midi", "audio", ()),
+    # Documents
+    (((0, b"%PDF-"),), "application/pdf", "document", ("image",)),  # Illustrator .ai files are PDFs
+    (((0, b"{\\rtf"),), "application/rtf", "document", ()),
+    # Archives and compressed data
+    (((0, b"PK\x03\x04"),), "application/zip", "archive", ANY),
+    (((0, b"PK\x05\x06"),), "application/zip", "archive", ANY),  # Empty archive
+    (((0, b"\x1f\x8b"),), "application/gzip", "archive", ANY),
+    (((0, b"BZh"),), "application/x-bzip2", "archive", ANY),
+    (((0, b"\xfd7zXZ\x00"),), "application/x-xz", "archive", ANY),
+    (((0, b"7z\xbc\xaf\x27\x1c"),), "application/x-7z-compressed", "archive", ANY),
+    (((0, b"Rar!\x1a\x07"),), "application/vnd.rar", "archive", ANY),
+    (((257, b"ustar"),), "application/x-tar", "archive", ANY),
+    # Executables and libraries
+    (((0, b"\x7fELF"),), "application/x-executable", "installer", ("code",)),  # Also .so and .o
+    (((0, b"\xfe\xed\xfa\xce"),), "application/x-mach-binary", "installer", ("code",)),
+    (((0, b"\xfe\xed\xfa\xcf"),), "application/x-mach-binary", "installer", ("code",)),
+    (((0, b"\xce\xfa\xed\xfe"),), "application/x-mach-binary", "installer", ("code",)),
+    (((0, b"\xcf\xfa\xed\xfe"),), "application/x-mach-binary", "installer", ("code",)),
+    (((0, b"\xca\xfe\xba\xbe"),), "application/x-mach-binary", "installer", ("code",)),  # Universal binary or Java .class
+    (((0, b"MZ"),), "application/x-msdownload", "installer", ("code", "font", "system")),  # EXE, DLL, .fon
+    # Data
+    (((0, b"SQLite format 3\x00"),), "application/vnd.sqlite3", "data", ()),
+)
+
+_CATEGORIES = {content_type: (category, fits if fits is ANY else frozenset((category,) + fits))
+               for _, content_type, category, fits in MAGIC_RULES}
+
+
+def _pe_header(header: bytes) -> bool:
+    # e_lfanew at 0x3C points at the "PE\0\0" (or 16-bit "NE", e.g. .fon) header
+    if len(header) < 0x40:
+        return False
+    (offset,) = struct.unpack_from("<I", header, 0x3C)
+    return 0x40 <= offset and (header.startswith(b"PE\x00\x00", offset) or header.startswith(b"NE", offset))
+
+
+def _id3_header(header: bytes) -> bool:
+    # ID3v2.2-2.4, no undefined flag bits, syncsafe size (high bit of each byte clear)
+    return (len(header) >= 10 and header[3] in (2, 3, 4) and header[4] != 0xFF
+            and not header[5] & 0x0F and all(b < 0x80 for b in header[6:10]))
+
+
+def _tiff_header(header: bytes) -> bool:
+    # The first IFD follows the 8-byte header, on a word boundary
+    if len(header) < 8:
+        return False
+    (offset,) = struct.unpack_from("<I" if header[:2] == b"II" else ">I", header, 4)
+    return offset >= 8 and offset % 2 == 0
+
+
+# Extra header checks for signatures that ordinary text can start with
+_VALIDATORS = {
+    "application/x-msdownload": _pe_header,
+    "audio/mpeg": _id3_header,
+    "image/tiff": _tiff_header,
+}
+
+# Even when their header checks out, these never overrule a text-like extension
+WEAK_CONTENT_TYPES = frozenset(_VALIDATORS)
+TEXT_CATEGORIES = frozenset(("document", "spreadsheet", "presentation", "data", "code", "system"))
+
+
+def sniff(header: bytes) -> Optional[str]:
+    """
+    Content type of a file from its first bytes.
+
+    Args:
+        header: The first SNIFF_BYTES (or fewer, for short files) of the file
+
+    Returns:
+        MIME content type (e.g. "image/jpeg"), or None if no signature matches
+    """
+    if not header:
+        return None
+    for signature, content_type, _, _ in MAGIC_RULES:
+        if all(header.startswith(magic, offset) for offset, magic in signature):
+            validator = _VALIDATORS.get(content_type)
+            if validator is None or validator(header):
+                return content_type
+    return None
+
+
+def sniff_file(path: Path) -> Optional[str]:
+    """Content type of a file on disk (reads SNIFF_BYTES); None if unrecognized or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            return sniff(f.read(SNIFF_BYTES))
+    except OSError:
+        return None
+
+
+def content_category(content_type: Optional[str]) -> Optional[str]:
+    """Classifier category for a sniffed content type."""
+    return _CATEGORIES[content_type][0] if content_type in _CATEGORIES else None
+
+
+def fits(content_type: str, category: str) -> bool:
+    """
+    Whether an extension's category is consistent with the sniffed content.
+
+    Container formats fit every category; other formats fit their own
+    category plus the few that legitimately share the format. Weak
+    signatures also fit every text-like category.
+    """
+    if content_type not in _CATEGORIES:
+        return True
+    if content_type in WEAK_CONTENT_TYPES and category in TEXT_CATEGORIES:
+        return True
+    allowed = _CATEGORIES[content_type][1]
+    return allowed is ANY or category in allowed
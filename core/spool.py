@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: spool.py
+# Purpose: Append-only local spool for DB rows written while the DB is down
+#
+# Description:
+# When the database is unreachable, batch writers append their rows to a
+# JSON Lines spool file instead of dropping them; db.load_spool() later
+# replays it with multi-row upserts. Each line is one row:
+#   {"kind": "files", "row": {...}}
+# Rows are path-keyed when the file id is unknown, so the spool can be
+# replayed into the catalog without the run that wrote it. A torn last
+# line (crash mid-write) is skipped on read.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.0
+# Last Modified: 2026-10-18 by Tim Canady
+#
+# Revision History:
+# - 0.1.0 (2026-10-18): Initial JSONL spool writer and reader — Tim Canady
+###################################################################
+
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SPOOL_FILE = Path(".file_dedup_spool.jsonl")
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot spool {type(value).__name__} value")
+
+
+class Spool:
+    """
+    Append-only spool file shared by every batch writer of a run.
+
+    The spool starts online; go_offline() is called on the first connection
+    failure and from then on writers append here without trying the DB again,
+    so a dead server costs one connect timeout per run, not one per batch.
+
+    Args:
+        path: Spool file (appended to, created on first write)
+    """
+
+    def __init__(self, path: Path = SPOOL_FILE):
+        self.path = Path(path)
+        self.offline = False
+        self.rows = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def go_offline(self, error=None) -> None:
+        if not self.offline:
+            self.offline = True
+            logger.warning(f"⚠️ Database unreachable ({error}); spooling DB rows to {self.path}")
+
+    def write(self, kind: str, rows: List[Dict]) -> None:
+        """Append rows of one kind (files, duplicates, classifications, operations)."""
+        lines = [json.dumps({"kind": kind, "row": row}, default=_encode) + "\n" for row in rows]
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.writelines(lines)
+            self._file.flush()
+            self.rows += len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if self.rows:
+            logger.info(f"📥 Spooled {self.rows} DB row(s) to {self.path}; replay with --load-spool")
+
+
+def read_spool(path: Path) -> Iterator[Tuple[str, Dict]]:
+    """Yield (kind, row) for every complete line of a spool file, in write order."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            try:
+                record = json.loads(line)
+                yield record["kind"], record["row"]
+            except (ValueError, KeyError) as e:
+                logger.warning(f"⚠️ Skipping unreadable spool line {line_number} in {path}: {e}")
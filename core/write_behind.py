@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File_Deduplification
+# File: write_behind.py
+# Purpose: Background thread that performs batched DB writes off the hot path
+#
+# Description:
+# Pipeline stages call their batch writers through lightweight proxies that
+# only put the call on a bounded queue; one background thread applies the
+# calls in order and flushes batches. A full queue blocks the producer
+# (backpressure) instead of growing without limit. Switching to another
+# writer first flushes the others, so rows a later stage depends on (e.g.
+# file ids) are always written first. The queue is drained on close and
+# at exit; SIGTERM/SIGHUP exit through that same path. Closed writers are
+# dropped, their counts kept. Queue depth, backpressure and flush latency
+# are kept as metrics.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): Signals exit instead of draining in the handler; closed writers are dropped — Tim Canady
+# - 0.1.0 (2026-10-18): Initial write-behind DB writer thread — Tim Canady
+###################################################################
+
+import atexit
+import logging
+import queue
+import signal
+import sys
+import threading
+import time
+import weakref
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+_FLUSH = object()
+_RETIRE = object()
+
+# Writer counters summed into metrics()
+_COUNTERS = ("rows_written", "flushes", "flush_seconds")
+
+# Every WriteBehind still running, drained by the atexit hook and signal handlers
+_running = weakref.WeakSet()
+
+
+class WriteBehind:
+    """
+    One background thread applying queued writer calls in FIFO order.
+
+    Args:
+        max_queue: Queued calls before submit() blocks
+        idle_flush: Seconds without new calls before buffered rows are flushed
+    """
+
+    def __init__(self, max_queue: int = 10000, idle_flush: float = 2.0):
+        self.idle_flush = idle_flush
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+        self._writers = []
+        self._retired = dict.fromkeys(_COUNTERS, 0)
+        self._retired["max_flush_seconds"] = 0.0
+        self._retired_writers = weakref.WeakSet()
+        self._current = None
+        self._closed = False
+        self._stop_queued = False
+        self._stopped = threading.Event()
+
+        self.enqueued = 0
+        self.max_queue_depth = 0
+        self.backpressure_waits = 0
+        self.backpressure_seconds = 0.0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._thread.start()
+        _running.add(self)
+
+    def wrap(self, writer) -> "WriterProxy":
+        """Proxy whose method calls are queued to this thread."""
+        return WriterProxy(self, writer)
+
+    def submit(self, writer, method: str, args=(), kwargs=None) -> None:
+        """Queue writer.method(*args, **kwargs), blocking while the queue is full."""
+        if self._closed:
+            raise RuntimeError("write-behind writer is closed")
+        self._put((writer, method, args, kwargs or {}))
+        self.enqueued += 1
+
+    def barrier(self, writer=None) -> None:
+        """Block until everything queued so far is applied and writer (or every writer) is flushed."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._put((_FLUSH, writer, done, None))
+        done.wait()
+
+    def retire(self, writer) -> None:
+        """Block until writer's queued calls are applied and flushed, then stop tracking it."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._put((_RETIRE, writer, done, None))
+        done.wait()
+
+    def _put(self, item) -> None:
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            start = time.monotonic()
+            self._queue.put(item)
+            self.backpressure_waits += 1
+            self.backpressure_seconds += time.monotonic() - start
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.idle_flush)
+            except queue.Empty:
+                self._flush_all()
+                continue
+
+            target, method, args, kwargs = item
+            if target is _STOP:
+                self._flush_all()
+                args.set()
+                return
+            if target is _FLUSH:
+                if method is None:
+                    self._flush_all()
+                else:
+                    self._flush(method)
+                args.set()
+                continue
+            if target is _RETIRE:
+                self._retire(method)
+                args.set()
+                continue
+
+            # Stage barrier: rows of the previous writer go out before the next writer's
+            if target is not self._current:
+                self._flush_all(except_writer=target)
+                self._current = target
+                if target not in self._writers:
+                    self._track(target)
+
+            try:
+                getattr(target, method)(*args, **kwargs)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"⚠️ Background DB write failed ({type(target).__name__}.{method}): {e}")
+
+    def _track(self, writer) -> None:
+        # A writer reused after retire() is counted live again
+        if writer in self._retired_writers:
+            for counter in _COUNTERS:
+                self._retired[counter] -= getattr(writer, counter)
+            self._retired_writers.discard(writer)
+        self._writers.append(writer)
+
+    def _retire(self, writer) -> None:
+        if writer not in self._writers:
+            return
+        self._flush(writer)
+        self._writers.remove(writer)
+        for counter in _COUNTERS:
+            self._retired[counter] += getattr(writer, counter)
+        self._retired["max_flush_seconds"] = max(self._retired["max_flush_seconds"], writer.max_flush_seconds)
+        self._retired_writers.add(writer)
+        if self._current is writer:
+            self._current = None
+
+    def _flush(self, writer) -> None:
+        try:
+            writer.flush()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"⚠️ Background DB flush failed ({type(writer).__name__}): {e}")
+
+    def _flush_all(self, except_writer=None) -> None:
+        for writer in self._writers:
+            if writer is not except_writer and writer.pending:
+                self._flush(writer)
+
+    def close(self) -> None:
+        """Apply everything queued, flush every writer and stop the thread."""
+        if self not in _running:
+            return
+        # A close() interrupted by a signal is finished by the atexit hook
+        if not self._stop_queued and self._thread.is_alive():
+            self._put((_STOP, None, self._stopped, None))
+            self._stop_queued = True
+        self._closed = True
+        self._stopped.wait()
+        self._thread.join()
+        _running.discard(self)
+
+        metrics = self.metrics()
+        logger.info(f"💾 Write-behind: {metrics['rows_written']} row(s) in {metrics['flushes']} flush(es), "
+                    f"max queue depth {metrics['max_queue_depth']}, "
+                    f"flush latency avg {metrics['avg_flush_ms']:.1f} ms / max {metrics['max_flush_ms']:.1f} ms, "
+                    f"backpressure {metrics['backpressure_waits']} wait(s) ({metrics['backpressure_seconds']:.2f}s)")
+
+    def metrics(self) -> Dict:
+        """Queue depth, backpressure and flush latency so far."""
+        writers = list(self._writers)
+        flushes = self._retired["flushes"] + sum(w.flushes for w in writers)
+        flush_seconds = self._retired["flush_seconds"] + sum(w.flush_seconds for w in writers)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "enqueued": self.enqueued,
+            "backpressure_waits": self.backpressure_waits,
+            "backpressure_seconds": self.backpressure_seconds,
+            "rows_written": self._retired["rows_written"] + sum(w.rows_written for w in writers),
+            "flushes": flushes,
+            "avg_flush_ms": 1000 * flush_seconds / flushes if flushes else 0.0,
+            "max_flush_ms": 1000 * max([self._retired["max_flush_seconds"]] + [w.max_flush_seconds for w in writers]),
+            "errors": self.errors,
+        }
+
+
+class WriterProxy:
+    """
+    Stand-in for a batch writer that queues its calls on a WriteBehind.
+
+    flush() and close() wait until this writer's queued calls are applied and
+    flushed, so a stage that closes its writer sees final counts; close() also
+    drops the writer from the thread's list.
+    """
+
+    def __init__(self, write_behind: WriteBehind, writer):
+        self._write_behind = write_behind
+        self._writer = writer
+
+    def __getattr__(self, name):
+        value = getattr(self._writer, name)
+        if not callable(value):
+            return value
+
+        def queued(*args, **kwargs):
+            self._write_behind.submit(self._writer, name, args, kwargs)
+        return queued
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def flush(self):
+        self._write_behind.barrier(self._writer)
+
+    def close(self):
+        self._write_behind.retire(self._writer)
+
+
+def _drain_all() -> None:
+    for write_behind in list(_running):
+        write_behind.close()
+
+
+_previous_handlers = {}
+
+
+def _handle_signal(signum, frame) -> None:
+    # The main thread may be inside Queue.put() holding its lock, so nothing
+    # is queued here: raising unwinds it, and the atexit hook drains
+    logger.warning(f"⚠️ Signal {signum} received, exiting; queued DB writes are flushed at exit")
+    previous = _previous_handlers.get(signum)
+    if callable(previous):
+        previous(signum, frame)
+    else:
+        sys.exit(128 + signum)
+
+
+def install_signal_handlers() -> None:
+    """Exit cleanly on SIGTERM/SIGHUP so atexit flushes queued writes (as SIGINT does)."""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name in ("SIGTERM", "SIGHUP"):
+        signum = getattr(signal, name, None)
+        if signum is None or signum in _previous_handlers:
+            continue
+        _previous_handlers[signum] = signal.signal(signum, _handle_signal)
+
+
+atexit.register(_drain_all)
@@ -14,10 +14,28 @@
 # Author: Tim Canady
 # Created: 2025-09-28
 #
-# Version: 0.5.0
-# Last Modified: 2025-11-12 by Tim Canady
+# Version: 0.7.7
+# Last Modified: 2026-10-19 by Tim Canady
 #
 # Revision History:
+# - 0.7.7 (2026-10-19): Added --enrich-metadata year/owner stage before classification — Tim Canady
+# - 0.7.6 (2026-10-19): Added --classifier-rules to load classification rules from a file — Tim Canady
+# - 0.7.5 (2026-10-19): Classification stage uses classify_batch; added --classify-workers — Tim Canady
+# - 0.7.4 (2026-10-19): Added --query streaming catalog export with category/root/duplicate/date filters — Tim Canady
+# - 0.7.3 (2026-10-19): Added --stats/--rebuild-stats catalog summary — Tim Canady
+# - 0.7.2 (2026-10-19): Added --db-dedup catalog-wide duplicate detection in the database — Tim Canady
+# - 0.7.1 (2026-10-18): Spool only on connection errors, not configuration errors — Tim Canady
+# - 0.7.0 (2026-10-18): Spool DB rows locally when the DB is unreachable; --load-spool replay — Tim Canady
+# - 0.6.9 (2026-10-18): Added --db-write-behind/--db-queue-size background DB writer — Tim Canady
+# - 0.6.8 (2026-10-18): Classification stage uses batched classify_files — Tim Canady
+# - 0.6.7 (2026-10-18): Added --db-batch-size/--db-flush-interval for batched DB writes — Tim Canady
+# - 0.6.6 (2026-10-18): Added --memory-limit external-memory dedup mode — Tim Canady
+# - 0.6.5 (2026-10-18): Added --report-format/--report-gzip/--report-top for streaming reports — Tim Canady
+# - 0.6.4 (2026-10-18): Added --duplicate-dirs folder fingerprinting — Tim Canady
+# - 0.6.3 (2026-10-18): Added --cross-run catalog duplicate lookup and --original-rule — Tim Canady
+# - 0.6.2 (2026-10-18): Added --near-duplicates documents stage (MinHash/LSH) — Tim Canady
+# - 0.6.1 (2026-10-18): Added --near-duplicates images stage (perceptual hashing) — Tim Canady
+# - 0.6.0 (2026-10-18): Added --verify bytes for byte-level duplicate confirmation — Tim Canady
 # - 0.5.0 (2025-11-12): Added DB support, input validation, max-files param — Tim Canady
 # - 0.4.5 (2025-11-06): Implemented Slack notifications — Tim Canady
 # - 0.4.4 (2025-11-06): Restore full CLI and fix scan_directory param — Tim Canady
@@ -30,8 +48,13 @@ import logging
 import sys
 from core.scanner import scan_directory
 from core.hasher import generate_hashes
-from core.deduplicator import detect_duplicates, filter_duplicates, report_duplicates
-from core.classifier import classify_file
+from core.deduplicator import detect_duplicates, detect_catalog_duplicates, filter_duplicates, report_duplicates
+from core.external_dedup import detect_duplicates_external, MIN_MEMORY_LIMIT
+from core.directory_dedup import detect_duplicate_directories
+from core.spool import SPOOL_FILE
+from core.near_duplicates import find_near_duplicate_images, find_near_duplicate_documents
+from core.enricher import enrich_files
+from core.classifier import classify_files, current_rules, load_rules, use_rules
 from core.organizer import plan_organization
 from core.previewer import preview_plan, print_tree_structure
 from core.executor import execute_plan
@@ -76,12 +99,31 @@ def parse_size(size_str):
 
     return int(number * units[unit])
 
+def print_catalog_stats(rows):
+    """Print catalog_stats rows as one table per dimension."""
+    gb = 1_073_741_824
+    for row in rows:
+        if row["dimension"] == "total":
+            print(f"📊 Catalog: {row['file_count']:,} files, {row['total_bytes'] / gb:,.2f} GB; "
+                  f"{row['duplicate_count']:,} duplicates wasting {row['duplicate_bytes'] / gb:,.2f} GB")
+
+    dimension = None
+    for row in rows:
+        if row["dimension"] == "total":
+            continue
+        if row["dimension"] != dimension:
+            dimension = row["dimension"]
+            print(f"\nBy {dimension}:")
+            print(f"  {'':<40} {'files':>12} {'GB':>10} {'duplicates':>12} {'dup GB':>10}")
+        print(f"  {row['label'][:40]:<40} {row['file_count']:>12,} {row['total_bytes'] / gb:>10,.2f} "
+              f"{row['duplicate_count']:>12,} {row['duplicate_bytes'] / gb:>10,.2f}")
+
 def main():
     load_dotenv()
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("source", help="Root source directory")
-    parser.add_argument("--base-dir", required=True, help="Base output directory")
+    parser.add_argument("source", nargs="?", help="Root source directory")
+    parser.add_argument("--base-dir", help="Base output directory (required unless --load-spool, --db-dedup, --stats or --query)")
     parser.add_argument("--filter", nargs="*", help="Root-level directory name patterns to include")
     parser.add_argument("--max-files", type=int, help="Maximum number of files to process")
     parser.add_argument("--dry-run-log", action="store_true", help="Log preview to file")
@@ -92,13 +134,127 @@ def main():
     parser.add_argument("--write-metadata", action="store_true")
     parser.add_argument("--ignore-errors", action="store_true", help="Skip files with access errors")
     parser.add_argument("--use-db", action="store_true", help="Enable database logging")
+    parser.add_argument("--db-batch-size", type=int, default=500, help="Rows per multi-row database upsert (default: 500)")
+    parser.add_argument("--db-flush-interval", type=float, default=2.0, help="Flush buffered database rows at least this often, in seconds (default: 2.0)")
+    parser.add_argument("--db-write-behind", action="store_true", help="Write DB rows from a background thread so DB latency never stalls hashing (requires --use-db)")
+    parser.add_argument("--db-queue-size", type=int, default=10000, help="Queued DB writes before stages wait for the background writer (default: 10000)")
+    parser.add_argument("--db-spool", default=str(SPOOL_FILE), help=f"Append DB rows to this local file if the DB is unreachable (default: {SPOOL_FILE})")
+    parser.add_argument("--no-db-spool", action="store_true", help="Fail instead of spooling when the DB is unreachable")
+    parser.add_argument("--load-spool", nargs="?", const=str(SPOOL_FILE), metavar="SPOOL", help=f"Replay a DB spool file into the database and exit (default: {SPOOL_FILE})")
     parser.add_argument("--metadata-only-size", type=str, help="Files larger than this size will only have metadata stored (no hashing). Format: 75MB, 1GB, etc. Default: no limit")
     parser.add_argument("--skip-duplicates", action="store_true", help="Skip duplicate files (only process unique files)")
     parser.add_argument("--duplicate-report", type=str, help="Generate duplicate report and save to file")
+    parser.add_argument("--report-format", choices=["text", "jsonl", "csv"], default="text", help="Duplicate report format (default: text)")
+    parser.add_argument("--report-gzip", action="store_true", help="Gzip-compress the duplicate report")
+    parser.add_argument("--report-top", type=int, default=10, help="Largest groups by wasted space listed in the report summary (default: 10)")
+    parser.add_argument("--verify", choices=["bytes"], help="Confirm hash matches before marking duplicates (bytes: streaming byte-for-byte compare)")
+    parser.add_argument("--memory-limit", type=str, help="Group duplicates with sorted run files on disk, using about this much memory (e.g. 512MB, 2GB)")
+    parser.add_argument("--cross-run", action="store_true", help="Also match files against everything already cataloged in the database (requires --use-db)")
+    parser.add_argument("--original-rule", choices=["first-seen", "oldest-mtime"], default="first-seen", help="How --cross-run and --db-dedup pick the original among cataloged copies (default: first-seen)")
+    parser.add_argument("--db-dedup", action="store_true", help="Find duplicates across the whole database catalog with a GROUP BY in the database, mark them and exit (no scan)")
+    parser.add_argument("--stats", nargs="?", const="all", choices=["all", "category", "root", "year"], help="Print catalog totals per category, root folder and year from the summary table and exit (no scan)")
+    parser.add_argument("--rebuild-stats", action="store_true", help="Recompute the catalog summary table from the files and classifications tables (repair), then exit")
+    parser.add_argument("--query", action="store_true", help="Stream catalog rows matching --category/--root/--duplicates/--modified-* from the database and exit (no scan)")
+    parser.add_argument("--category", nargs="+", help="--query: only these classification categories")
+    parser.add_argument("--root", help="--query: only files under this folder")
+    parser.add_argument("--duplicates", choices=["only", "exclude"], help="--query: only duplicates, or only originals")
+    parser.add_argument("--modified-since", type=datetime.fromisoformat, metavar="DATE", help="--query: only files modified on/after this date (YYYY-MM-DD)")
+    parser.add_argument("--modified-before", type=datetime.fromisoformat, metavar="DATE", help="--query: only files modified before this date (YYYY-MM-DD)")
+    parser.add_argument("--query-format", choices=["text", "jsonl", "csv"], default="text", help="--query output format (default: text, tab-separated)")
+    parser.add_argument("--query-output", help="--query output file (default: stdout)")
+    parser.add_argument("--query-limit", type=int, help="--query: stop after this many rows")
+    parser.add_argument("--duplicate-dirs", action="store_true", help="Detect copied folders and report/handle each copy as a single unit")
+    parser.add_argument("--near-duplicates", nargs="+", choices=["images", "documents"], help="Run near-duplicate detection stages (images: perceptual hashing, documents: MinHash/LSH over document, code and data text)")
+    parser.add_argument("--enrich-metadata", action="store_true", help="Fill in each file's year (EXIF/ID3/PDF date, then date folders, then mtime) and owner (path, then file owner) for organizing")
+    parser.add_argument("--classifier-rules", help="Classification rule file, JSON or YAML (default: $CLASSIFIER_RULES or core/classifier_rules.json)")
+    parser.add_argument("--classify-workers", type=int, help="Worker processes for classifying large scans (default: CPU count; 1 = in process)")
+    parser.add_argument("--image-distance", type=int, default=6, help="Max perceptual hash distance (of 64 bits) for near-duplicate images (default: 6)")
+    parser.add_argument("--text-similarity", type=float, default=0.8, help="Min estimated similarity (0-1) for near-duplicate documents (default: 0.8)")
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO)
 
+    if args.cross_run and not args.use_db:
+        parser.error("--cross-run requires --use-db")
+    if args.db_write_behind and not args.use_db:
+        parser.error("--db-write-behind requires --use-db")
+    if not (args.load_spool or args.db_dedup or args.stats or args.rebuild_stats or args.query) and not (args.source and args.base_dir):
+        parser.error("source and --base-dir are required")
+
+    # Replay rows spooled by an earlier run while the DB was down
+    if args.load_spool:
+        if not Path(args.load_spool).exists():
+            logging.error(f"❌ Spool file does not exist: {args.load_spool}")
+            sys.exit(1)
+        try:
+            from core.db import init_db, load_spool
+            init_db()
+            counts = load_spool(args.load_spool, batch_size=args.db_batch_size)
+        except Exception as e:
+            logging.error(f"❌ Failed to load spool {args.load_spool}: {e}")
+            sys.exit(1)
+        print(f"📤 Loaded spool {args.load_spool}: {counts['files']} file(s), {counts['duplicates']} duplicate mark(s), "
+              f"{counts['classifications']} classification(s), {counts['operations']} operation(s)")
+        if counts["unresolved"]:
+            print(f"⚠️ {counts['unresolved']} row(s) skipped: their file is not in the catalog")
+        return
+
+    # Catalog-wide duplicates: grouped in the database, streamed into the report
+    if args.db_dedup:
+        from core.deduplicator import iter_db_duplicates
+        from core.report_writer import hash_group_record, write_report_records
+        try:
+            from core.db import init_db
+            init_db()
+            print("🗄️  Detecting duplicates across the catalog...")
+            groups = iter_db_duplicates(original_rule=args.original_rule.replace("-", "_"), verify=args.verify,
+                                        batch_size=args.db_batch_size)
+            write_report_records((hash_group_record(idx, group) for idx, group in enumerate(groups, 1)),
+                                 args.duplicate_report, fmt=args.report_format, top_k=args.report_top,
+                                 compress=args.report_gzip)
+        except Exception as e:
+            logging.error(f"❌ Catalog duplicate detection failed: {e}")
+            sys.exit(1)
+        return
+
+    # Catalog summary, read from catalog_stats (kept current by every DB write)
+    if args.stats or args.rebuild_stats:
+        try:
+            from core.db import init_db, rebuild_catalog_stats, catalog_stats
+            init_db()
+            if args.rebuild_stats:
+                print("🧮 Rebuilding catalog statistics...")
+                written = rebuild_catalog_stats(batch_size=max(args.db_batch_size, 10000))
+                print(f"✅ Wrote {written} summary row(s)")
+            if args.stats:
+                rows = catalog_stats()
+                print_catalog_stats([r for r in rows if args.stats in ("all", r["dimension"]) or r["dimension"] == "total"])
+        except Exception as e:
+            logging.error(f"❌ Catalog statistics failed: {e}")
+            sys.exit(1)
+        return
+
+    # Catalog rows streamed page by page (keyset pagination), written as they arrive
+    if args.query:
+        from core.catalog import CatalogFilter, iter_catalog, write_catalog_rows
+        filters = CatalogFilter(categories=args.category, root=args.root,
+                                duplicates=None if args.duplicates is None else args.duplicates == "only",
+                                modified_since=args.modified_since, modified_before=args.modified_before)
+        out = open(args.query_output, "w", encoding="utf-8", newline="") if args.query_output else sys.stdout
+        try:
+            from core.db import init_db
+            init_db()
+            rows = write_catalog_rows(iter_catalog(filters, page_size=max(args.db_batch_size, 1000),
+                                                   limit=args.query_limit), out, fmt=args.query_format)
+        except Exception as e:
+            logging.error(f"❌ Catalog query failed: {e}")
+            sys.exit(1)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        logging.info(f"🔎 {rows:,} catalog row(s) written to {args.query_output or 'stdout'}")
+        return
+
     # Parse metadata-only size threshold
     metadata_only_size = None
     if args.metadata_only_size:
@@ -109,12 +265,45 @@ def main():
             logging.error(f"❌ {e}")
             sys.exit(1)
 
+    # Parse external-memory dedup budget
+    memory_limit = None
+    if args.memory_limit:
+        try:
+            memory_limit = parse_size(args.memory_limit)
+            if memory_limit < MIN_MEMORY_LIMIT:
+                raise ValueError(f"--memory-limit must be at least {MIN_MEMORY_LIMIT // 1_048_576}MB")
+            logging.info(f"💾 Duplicate grouping limited to ~{args.memory_limit} ({memory_limit:,} bytes), spilling to disk")
+        except ValueError as e:
+            logging.error(f"❌ {e}")
+            sys.exit(1)
+
+    # Load classification rules from a file (the default rules otherwise)
+    if args.classifier_rules:
+        try:
+            use_rules(load_rules(args.classifier_rules))
+            logging.info(f"📐 Classification rules {current_rules().rule_set_id} from {args.classifier_rules}")
+        except (OSError, ValueError) as e:
+            logging.error(f"❌ Failed to load classification rules: {e}")
+            sys.exit(1)
+
     # Initialize database if enabled
     if args.use_db:
         try:
-            from core.db import init_db
-            init_db()
-            logging.info("✅ Database initialized successfully")
+            from core.db import init_db, enable_spool, CONNECTION_ERRORS
+            if not args.no_db_spool:
+                enable_spool(args.db_spool)
+            try:
+                init_db()
+                logging.info("✅ Database initialized successfully")
+            except CONNECTION_ERRORS as e:
+                if args.no_db_spool:
+                    raise
+                # Keep going: every DB row of this run is spooled for --load-spool
+                enable_spool(args.db_spool, offline_reason=getattr(e, "orig", None) or e)
+            if args.db_write_behind:
+                from core.db import start_write_behind
+                start_write_behind(max_queue=args.db_queue_size, idle_flush=args.db_flush_interval)
+                logging.info(f"🧵 Background DB writer started (queue {args.db_queue_size})")
         except Exception as e:
             logging.error(f"❌ Failed to initialize database: {e}")
             logging.error("   Check your .env file for correct DATABASE_URL and DB_PASSWORD")
@@ -172,15 +361,28 @@ def main():
     print(f"🧮 Files matched: {len(files)}")
 
     print("🔑 Generating file hashes...")
-    hashed_files = generate_hashes(files, use_db=args.use_db, metadata_only_size=metadata_only_size)
+    hashed_files = generate_hashes(files, use_db=args.use_db, metadata_only_size=metadata_only_size,
+                                   db_batch_size=args.db_batch_size, db_flush_interval=args.db_flush_interval)
     print(f"📂 Files hashed: {len(hashed_files)}")
 
     print("🔍 Detecting duplicates...")
-    hashed_files = detect_duplicates(hashed_files, use_db=args.use_db)
+    if memory_limit:
+        hashed_files = detect_duplicates_external(hashed_files, memory_limit, use_db=args.use_db, verify=args.verify)
+    else:
+        hashed_files = detect_duplicates(hashed_files, use_db=args.use_db, verify=args.verify)
+    if args.cross_run:
+        from core.db import spooling
+        if spooling():
+            logging.warning("⚠️ Skipping --cross-run: the catalog is unreachable")
+        else:
+            hashed_files = detect_catalog_duplicates(hashed_files, original_rule=args.original_rule.replace("-", "_"),
+                                                     verify=args.verify)
+    all_hashed_files = hashed_files
 
-    # Generate duplicate report if requested
-    if args.duplicate_report:
-        report_duplicates(hashed_files, args.duplicate_report)
+    directory_groups = []
+    if args.duplicate_dirs:
+        print("📁 Detecting duplicate directories...")
+        directory_groups = detect_duplicate_directories(hashed_files, root=source_path, use_db=args.use_db)
 
     # Filter duplicates if requested
     if args.skip_duplicates:
@@ -191,10 +393,28 @@ def main():
         duplicate_count = sum(1 for f in hashed_files if f.is_duplicate)
         print(f"📂 Unique files: {unique_count}, Duplicates: {duplicate_count}")
 
+    # Year/owner before classification, so the plan and the classification rows both get them
+    if args.enrich_metadata:
+        print("🗓️ Extracting year and owner metadata...")
+        enrich_files(hashed_files)
+
     print("🤖 Classifying files with AI...")
-    classified = [classify_file(f, use_db=args.use_db) for f in hashed_files]
+    classified = classify_files(hashed_files, use_db=args.use_db, workers=args.classify_workers)
     print(f"🔎 Files classified: {len(classified)}")
 
+    if args.near_duplicates and "images" in args.near_duplicates:
+        print("🖼️  Detecting near-duplicate images...")
+        find_near_duplicate_images(classified, max_distance=args.image_distance)
+
+    if args.near_duplicates and "documents" in args.near_duplicates:
+        print("📄 Detecting near-duplicate documents...")
+        find_near_duplicate_documents(classified, threshold=args.text_similarity)
+
+    # Generate duplicate report if requested (after classification so near-duplicate clusters are included)
+    if args.duplicate_report:
+        report_duplicates(all_hashed_files, args.duplicate_report, directory_groups=directory_groups,
+                          fmt=args.report_format, top_k=args.report_top, compress=args.report_gzip)
+
     print("🗂️ Planning folder structure...")
     plan = plan_organization(classified, base_dir_path)
     print(f"📦 Planned operations: {len(plan)}")
@@ -239,5 +459,12 @@ def main():
         print("\n⚠️ Dry run complete. Use --execute to apply changes.")
         print("To proceed, run the same command with --execute flag")
 
+    if args.db_write_behind:
+        from core.db import stop_write_behind
+        stop_write_behind()
+    if args.use_db:
+        from core.db import disable_spool
+        disable_spool()
+
 if __name__ == "__main__":
     main()
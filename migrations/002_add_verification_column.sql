@@ -0,0 +1,10 @@
+-- Migration: Add verification column to files table
+-- Purpose: Store byte-level duplicate verification results (--verify bytes)
+-- Date: 2026-10-18
+-- Version: 0.9.0
+
+-- Values: 'verified', 'mismatch', 'error', 'skipped' (NULL = not verified)
+ALTER TABLE files ADD COLUMN verification VARCHAR(16) NULL AFTER duplicate_of;
+
+-- Verify the change
+-- SELECT path, is_duplicate, duplicate_of, verification FROM files WHERE is_duplicate = TRUE LIMIT 10;
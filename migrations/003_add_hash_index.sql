@@ -0,0 +1,11 @@
+-- Migration: Add index on files.hash
+-- Purpose: Indexed lookups for cross-run duplicate detection (--cross-run)
+-- Date: 2026-10-18
+-- Version: 0.9.0
+
+-- Lets find_catalog_originals() resolve a batch of hashes with index seeks
+-- instead of scanning the whole files table
+CREATE INDEX idx_files_hash ON files (hash);
+
+-- Verify the change
+-- SHOW INDEX FROM files WHERE Key_name = 'idx_files_hash';
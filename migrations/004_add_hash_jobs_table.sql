@@ -0,0 +1,25 @@
+-- Migration: Add hash_jobs work queue table
+-- Purpose: Let several workers claim and hash batches of paths for one dedup job
+-- Date: 2026-10-18
+-- Version: 0.10.0
+
+-- One row per path to hash. Workers claim pending rows in batches by
+-- stamping a claim token with a conditional UPDATE; rows whose lease
+-- expires are put back to pending (or failed after too many attempts).
+CREATE TABLE IF NOT EXISTS hash_jobs (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    path VARCHAR(767) NOT NULL,
+    status VARCHAR(16) NOT NULL DEFAULT 'pending',
+    claim_token VARCHAR(36),
+    claimed_by VARCHAR(255),
+    claimed_at DATETIME,
+    attempts INT DEFAULT 0,
+    error TEXT,
+    enqueued_at DATETIME,
+    completed_at DATETIME,
+    UNIQUE KEY uq_hash_jobs_path (path),
+    INDEX idx_hash_jobs_status (status, claimed_at)
+);
+
+-- Verify the change
+-- SELECT status, COUNT(*) FROM hash_jobs GROUP BY status;
@@ -0,0 +1,61 @@
+-- Migration: Normalize path storage (directories table, path digest key)
+-- Purpose: Store each directory once and look files up by a fixed-width key
+-- Date: 2026-10-19
+-- Version: 0.11.0
+
+-- files.path was a VARCHAR(767) unique index: ~3 KB per key in utf8mb4,
+-- no room for longer paths, and every lookup compared long strings. Files
+-- now reference (dir_id, name) and are looked up by path_digest, the
+-- 32-byte SHA-256 of the full path (core.db.path_digest()). files.path is
+-- kept, unindexed, for reports and ad-hoc queries.
+--
+-- A path is split at its last '/', like core.db.split_path(); files at the
+-- root get directory '/'. Run on a quiet catalog: the backfill rewrites
+-- every files row.
+
+CREATE TABLE IF NOT EXISTS directories (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    path TEXT NOT NULL,
+    path_digest BINARY(32) NOT NULL,
+    UNIQUE KEY uq_directories_path_digest (path_digest)
+);
+
+ALTER TABLE files
+    ADD COLUMN path_digest BINARY(32) NULL AFTER path,
+    ADD COLUMN dir_id BIGINT NULL AFTER path_digest,
+    ADD COLUMN name VARCHAR(255) NULL AFTER dir_id;
+
+-- Backfill: digest and name of every file, then one row per directory
+UPDATE files
+SET path_digest = UNHEX(SHA2(path, 256)),
+    name = SUBSTRING_INDEX(path, '/', -1);
+
+INSERT IGNORE INTO directories (path, path_digest)
+SELECT dir_path, UNHEX(SHA2(dir_path, 256))
+FROM (
+    SELECT DISTINCT IF(dir_path = '', '/', dir_path) AS dir_path
+    FROM (SELECT LEFT(path, CHAR_LENGTH(path) - CHAR_LENGTH(name) - 1) AS dir_path FROM files) AS split
+) AS dirs;
+
+UPDATE files f
+JOIN directories d
+  ON d.path_digest = UNHEX(SHA2(IF(CHAR_LENGTH(f.path) = CHAR_LENGTH(f.name) + 1, '/',
+                                   LEFT(f.path, CHAR_LENGTH(f.path) - CHAR_LENGTH(f.name) - 1)), 256))
+SET f.dir_id = d.id;
+
+-- Swap the lookup key: drop the long unique index on path, index the digest
+ALTER TABLE files
+    MODIFY path_digest BINARY(32) NOT NULL,
+    ADD UNIQUE KEY uq_files_path_digest (path_digest),
+    ADD INDEX idx_files_dir (dir_id, name),
+    DROP INDEX path,
+    MODIFY path TEXT NOT NULL,
+    MODIFY duplicate_of TEXT NULL;
+
+ALTER TABLE operations MODIFY target_path TEXT NULL;
+
+-- Verify the change
+-- SELECT COUNT(*) FROM files WHERE dir_id IS NULL;  -- expect 0
+-- SELECT index_name, ROUND(stat_value * @@innodb_page_size / 1048576, 1) AS size_mb
+--   FROM mysql.innodb_index_stats
+--   WHERE table_name = 'files' AND stat_name = 'size';
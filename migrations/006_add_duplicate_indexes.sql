@@ -0,0 +1,15 @@
+-- Migration: Add (size, hash) and is_duplicate indexes on files
+-- Purpose: Catalog-wide duplicate analysis without full table scans (--db-dedup, queries/)
+-- Date: 2026-10-19
+-- Version: 0.12.0
+
+-- idx_files_hash (migrations/003) already covers GROUP BY hash HAVING COUNT(*) > 1.
+-- (size, hash) covers size-first candidate searches and per-size duplicate
+-- totals; is_duplicate serves duplicate listings and counts.
+CREATE INDEX idx_files_size_hash ON files (size, hash);
+CREATE INDEX idx_files_is_duplicate ON files (is_duplicate);
+
+-- Verify the change (expect "Using index" for the GROUP BY)
+-- EXPLAIN SELECT hash FROM files WHERE hash IS NOT NULL AND hash <> 'METADATA_ONLY'
+--   GROUP BY hash HAVING COUNT(*) > 1;
+-- SHOW INDEX FROM files WHERE Key_name IN ('idx_files_size_hash', 'idx_files_is_duplicate');
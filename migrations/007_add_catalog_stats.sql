@@ -0,0 +1,31 @@
+-- Migration: Add catalog_stats summary table
+-- Purpose: Per-category, per-root-folder and per-year totals without scanning files
+-- Date: 2026-10-19
+-- Version: 0.13.0
+
+-- One row per (dimension, label): file count, bytes, duplicate count and
+-- duplicate bytes. Every write path (batch writers, spool replay, the
+-- distributed hash queue, save_classification() and friends) adds the
+-- change it makes to these rows in the same transaction, so
+-- `python main.py --stats` reads a few hundred rows instead of joining
+-- files and classifications. See core.db.tracking_stats().
+CREATE TABLE IF NOT EXISTS catalog_stats (
+    dimension VARCHAR(16) NOT NULL,
+    label VARCHAR(255) NOT NULL,
+    file_count BIGINT NOT NULL DEFAULT 0,
+    total_bytes BIGINT NOT NULL DEFAULT 0,
+    duplicate_count BIGINT NOT NULL DEFAULT 0,
+    duplicate_bytes BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, label)
+);
+
+-- The per-batch stats reads join classifications on file_id, as does the
+-- classification writer's replace; without this both scan the table
+CREATE INDEX idx_classifications_file_id ON classifications (file_id);
+
+-- Then fill the table from the existing catalog (one streaming pass):
+--   python main.py --rebuild-stats
+
+-- Verify the change
+-- SELECT * FROM catalog_stats WHERE dimension = 'total';
+-- SELECT COUNT(*), SUM(size), SUM(is_duplicate), SUM(IF(is_duplicate, size, 0)) FROM files;
@@ -0,0 +1,13 @@
+-- Migration: Add rule_set column to classifications table
+-- Purpose: Record which classifier rule set produced each classification
+-- Date: 2026-10-19
+-- Version: 0.14.0
+
+-- The classifier's rules now live in a rule file (core/classifier_rules.json
+-- or $CLASSIFIER_RULES). Each classification stores the id of the rule set
+-- that produced it ("<version>-<digest>"), so rows classified by older
+-- rules can be found and reclassified. Existing rows stay NULL.
+ALTER TABLE classifications ADD COLUMN rule_set VARCHAR(64) AFTER confidence;
+
+-- Verify the change
+-- SELECT rule_set, COUNT(*) FROM classifications GROUP BY rule_set;
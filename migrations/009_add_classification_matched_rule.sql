@@ -0,0 +1,32 @@
+-- Migration: Add matched_rule/extension to classifications and a classifier_rule_sets table
+-- Purpose: Reclassify only the rows a classifier rule change affects
+-- Date: 2026-10-19
+-- Version: 0.15.0
+
+-- Each classification now stores the rule that decided it ("extension",
+-- "mime", "content", a fallback rule id such as "path:web:1a2b3c4d", or
+-- "other") and the file's lowercased extension. Given the rules a row was
+-- classified with and the current ones, core.classifier.diff_rules() lists
+-- the extensions and rules whose answer can differ, and
+-- `scripts/reclassify_files.py --changed` rereads only those rows.
+ALTER TABLE classifications ADD COLUMN matched_rule VARCHAR(64) AFTER rule_set;
+ALTER TABLE classifications ADD COLUMN extension VARCHAR(64) AFTER matched_rule;
+
+-- Affected rows are selected per rule set by extension or matched rule
+CREATE INDEX idx_classifications_rule_set_extension ON classifications (rule_set, extension);
+CREATE INDEX idx_classifications_rule_set_rule ON classifications (rule_set, matched_rule);
+
+-- The rules behind every rule set id, recorded by the first run that uses them
+CREATE TABLE IF NOT EXISTS classifier_rule_sets (
+    id VARCHAR(64) NOT NULL PRIMARY KEY,
+    version VARCHAR(64),
+    rules TEXT NOT NULL,
+    recorded_at DATETIME
+);
+
+-- Existing rows keep NULL matched_rule; --changed reclassifies them the
+-- first time their rule set is superseded.
+
+-- Verify the change
+-- SELECT rule_set, matched_rule, COUNT(*) FROM classifications GROUP BY rule_set, matched_rule;
+-- SELECT id, version, recorded_at FROM classifier_rule_sets;
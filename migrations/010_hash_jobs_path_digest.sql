@@ -0,0 +1,21 @@
+-- Migration: Key hash_jobs on a path digest, like files
+-- Purpose: Queue paths of any length for distributed hashing
+-- Date: 2026-10-19
+-- Version: 0.16.0
+
+-- hash_jobs.path was a VARCHAR(767) unique key, so a path longer than 767
+-- characters could not be queued even though files (migrations/005) stores
+-- any length. Jobs are now looked up by path_digest, the 32-byte SHA-256 of
+-- the path (core.db.path_digest()), and path becomes TEXT.
+ALTER TABLE hash_jobs ADD COLUMN path_digest BINARY(32) NULL AFTER path;
+
+UPDATE hash_jobs SET path_digest = UNHEX(SHA2(path, 256));
+
+ALTER TABLE hash_jobs
+    MODIFY path_digest BINARY(32) NOT NULL,
+    ADD UNIQUE KEY uq_hash_jobs_path_digest (path_digest),
+    DROP INDEX uq_hash_jobs_path,
+    MODIFY path TEXT NOT NULL;
+
+-- Verify the change
+-- SELECT COUNT(*) FROM hash_jobs WHERE path_digest <> UNHEX(SHA2(path, 256));  -- expect 0
@@ -0,0 +1,66 @@
+-- Migration: Reference originals and operation targets by id
+-- Purpose: Finish the path normalization migrations/005 started
+-- Date: 2026-10-19
+-- Version: 0.17.0
+
+-- migrations/005 added the directories table and files.(dir_id, name), but
+-- files.duplicate_of and operations.target_path still held full path
+-- strings. duplicate_of now holds the original's files.id, and operation
+-- targets are (target_dir_id, target_name) like files. core.db.target_path()
+-- and the operations_with_target view rebuild the full target path.
+--
+-- files.path is kept on purpose. It repeats the directory prefix in every
+-- row, about the average path length per file (~1 GB per 10M files at 100
+-- bytes). Reports, catalog_stats and the QUERY_GUIDE.md queries read it
+-- without a join. It is unindexed; lookups use path_digest.
+--
+-- Run on a quiet catalog: the backfill rewrites every duplicate and
+-- operation row.
+
+-- files.duplicate_of: path -> files.id of the original
+ALTER TABLE files ADD COLUMN duplicate_of_id BIGINT NULL AFTER duplicate_of;
+
+UPDATE files f
+JOIN files o ON o.path_digest = UNHEX(SHA2(f.duplicate_of, 256))
+SET f.duplicate_of_id = o.id
+WHERE f.duplicate_of IS NOT NULL;
+
+ALTER TABLE files
+    DROP COLUMN duplicate_of,
+    CHANGE duplicate_of_id duplicate_of BIGINT NULL;
+
+-- operations.target_path -> (target_dir_id, target_name), split like core.db.split_path()
+ALTER TABLE operations
+    ADD COLUMN target_dir_id BIGINT NULL AFTER action,
+    ADD COLUMN target_name VARCHAR(255) NULL AFTER target_dir_id;
+
+UPDATE operations
+SET target_name = SUBSTRING_INDEX(target_path, '/', -1)
+WHERE target_path IS NOT NULL;
+
+INSERT IGNORE INTO directories (path, path_digest)
+SELECT dir_path, UNHEX(SHA2(dir_path, 256))
+FROM (
+    SELECT DISTINCT IF(dir_path = '', '/', dir_path) AS dir_path
+    FROM (SELECT LEFT(target_path, CHAR_LENGTH(target_path) - CHAR_LENGTH(target_name) - 1) AS dir_path
+          FROM operations WHERE target_path IS NOT NULL) AS split
+) AS dirs;
+
+UPDATE operations o
+JOIN directories d
+  ON d.path_digest = UNHEX(SHA2(IF(CHAR_LENGTH(o.target_path) = CHAR_LENGTH(o.target_name) + 1, '/',
+                                   LEFT(o.target_path, CHAR_LENGTH(o.target_path) - CHAR_LENGTH(o.target_name) - 1)), 256))
+SET o.target_dir_id = d.id;
+
+ALTER TABLE operations DROP COLUMN target_path;
+
+-- Full target paths for ad-hoc queries
+CREATE OR REPLACE VIEW operations_with_target AS
+SELECT o.*,
+       IF(d.path = '/', CONCAT('/', o.target_name), CONCAT(d.path, '/', o.target_name)) AS target_path
+FROM operations o
+LEFT JOIN directories d ON d.id = o.target_dir_id;
+
+-- Verify the change
+-- SELECT COUNT(*) FROM files WHERE is_duplicate = TRUE AND duplicate_of IS NULL;  -- originals not cataloged
+-- SELECT COUNT(*) FROM operations WHERE target_name IS NOT NULL AND target_dir_id IS NULL;  -- expect 0
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: directory_group.py
+# Purpose: Data structure for a group of identical directory trees.
+#
+# Description of code and how it works:
+# Produced by core.directory_dedup when whole folders are copies of each
+# other; the first directory is kept as the original.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.0
+# Last Modified: 2026-10-18 by Tim Canady
+#
+# Revision History:
+# - 0.1.0 (2026-10-18): Initial version — Tim Canady
+###################################################################
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+
+@dataclass
+class DirectoryGroup:
+    fingerprint: str
+    directories: List[Path] = field(default_factory=list)  # Original first
+    file_count: int = 0  # Files in each copy
+    size: int = 0  # Bytes in each copy
+
+    @property
+    def original(self) -> Path:
+        return self.directories[0]
+
+    @property
+    def duplicates(self) -> List[Path]:
+        return self.directories[1:]
+
+    @property
+    def wasted_space(self) -> int:
+        return self.size * (len(self.directories) - 1)
@@ -12,10 +12,15 @@
 # Author: Tim Canady
 # Created: 2025-09-28
 #
-# Version: 0.1.0
-# Last Modified: 2025-11-04 by Tim Canady
+# Version: 0.6.0
+# Last Modified: 2026-10-19 by Tim Canady
 #
 # Revision History:
+# - 0.6.0 (2026-10-19): Added content_type sniffed from the file's first bytes — Tim Canady
+# - 0.5.0 (2026-10-18): Added file_id (files.id) for id-keyed DB writes — Tim Canady
+# - 0.4.0 (2026-10-18): Added duplicate_dir for files inside copied folders — Tim Canady
+# - 0.3.0 (2026-10-18): Added near-duplicate cluster fields — Tim Canady
+# - 0.2.0 (2026-10-18): Added byte-level verification status — Tim Canady
 # - 0.1.0 (2025-11-04): Initial version — Tim Canady
 ###################################################################
 
@@ -34,4 +39,10 @@ class FileInfo:
     year: Optional[str] = None
     is_duplicate: bool = False
     original_path: Optional[Path] = None
-    path_metadata: Optional[dict] = None  # Metadata extracted from directory structure
\ No newline at end of file
+    path_metadata: Optional[dict] = None  # Metadata extracted from directory structure
+    verification: Optional[str] = None  # Byte-level check result: verified, mismatch, error, skipped
+    near_duplicate_of: Optional[Path] = None  # Representative file of this file's near-duplicate cluster
+    similarity: Optional[float] = None  # Similarity to near_duplicate_of (0.0 - 1.0)
+    duplicate_dir: Optional[Path] = None  # Original folder when this file sits in a duplicate folder
+    file_id: Optional[int] = None  # files.id once the row is written (--use-db)
+    content_type: Optional[str] = None  # MIME type from the file's magic bytes (core.sniffer), if recognized
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+###################################################################
+# Project: File_Deduplification
+# File: bench_classifier.py
+# Purpose: Measure classifier throughput (files/sec) on synthetic paths
+#
+# Description:
+# Generates a synthetic catalog of paths (1M by default) with a photo-
+# library-heavy mix of extensions, plus names and folders that reach the
+# fallback name/path rules, and times classify_file() over all of them.
+# Prints files/sec and the category breakdown so runs before and after
+# a classifier change can be compared. --batch times classify_batch()
+# instead (--workers sets its process count).
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+#
+# Version: 0.2.0
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.2.0 (2026-10-19): Added --batch and --workers for classify_batch() — Tim Canady
+# - 0.1.0 (2026-10-19): Initial classify_file() benchmark — Tim Canady
+###################################################################
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add parent directory to path to import core modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.classifier import classify_file, classify_batch
+from models.file_info import FileInfo
+
+# (weight, extension) mix of a typical personal archive
+EXTENSIONS = ((30, ".JPG"), (15, ".jpg"), (8, ".HEIC"), (6, ".png"), (6, ".MOV"), (4, ".mp4"),
+              (5, ".pdf"), (3, ".docx"), (2, ".xlsx"), (3, ".txt"), (3, ".mp3"), (2, ".py"),
+              (2, ".js"), (1, ".json"), (1, ".zip"), (1, ".tar.gz"), (1, ".plist"), (1, ".dmg"),
+              (1, ".qdf"), (1, ".tax2023"), (1, ".log"), (1, ".xyz"), (2, ""))
+NAMES = ("IMG_{i:07d}", "Scan {i}", "notes-{i}", "CS{i} homework", "invoice_{i}", "Makefile", "README")
+FOLDERS = ("/Users/tim/Pictures/Library/{y}/Trip {f}", "/Users/tim/Documents/Taxes/{y}",
+           "/Volumes/Backup/Projects/site-{f}/www", "/Applications/App{f}.app/Contents/Resources",
+           "/Users/tim/code/project-{f}/src")
+
+
+def synthetic_paths(count, seed=42):
+    rng = random.Random(seed)
+    weights = [w for w, _ in EXTENSIONS]
+    extensions = [e for _, e in EXTENSIONS]
+    for i in range(count):
+        folder = rng.choice(FOLDERS).format(y=2000 + i % 25, f=i // 500)
+        name = rng.choice(NAMES).format(i=i)
+        yield Path(f"{folder}/{name}{rng.choices(extensions, weights)[0]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark classify_file throughput")
+    parser.add_argument("--files", type=int, default=1_000_000, help="Synthetic paths to classify (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for the synthetic set (default: 42)")
+    parser.add_argument("--batch", action="store_true", help="Time classify_batch() instead of one classify_file() call per file")
+    parser.add_argument("--workers", type=int, help="--batch: worker processes (default: CPU count; 1 = in process)")
+    args = parser.parse_args()
+
+    files = [FileInfo(path=path, size=0) for path in synthetic_paths(args.files, args.seed)]
+    # pathlib caches str(path); earlier stages (hashing, DB writes) have already
+    # paid for it, so only the classification itself is timed
+    for file_info in files:
+        str(file_info.path)
+
+    start = time.perf_counter()
+    if args.batch:
+        classify_batch(files, workers=args.workers)
+    else:
+        for file_info in files:
+            classify_file(file_info)
+    elapsed = time.perf_counter() - start
+
+    print(f"Classified {len(files):,} files in {elapsed:.2f}s: {len(files) / elapsed:,.0f} files/sec")
+    for category, count in Counter(f.type for f in files).most_common():
+        print(f"  {category:<14} {count:>10,}")
+
+
+if __name__ == "__main__":
+    main()
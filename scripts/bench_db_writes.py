@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+###################################################################
+# Project: File_Deduplification
+# File: bench_db_writes.py
+# Purpose: Compare rows/sec of per-file cache_file_entry vs batched FileWriter
+#
+# Description:
+# Writes synthetic file rows to the files table, first one session per row
+# with cache_file_entry(), then through FileWriter at several batch sizes,
+# and reports rows/sec for each. A second pass over the same paths
+# measures the update (upsert) path. Defaults to a throwaway SQLite file
+# (tuned like the app's SQLite backend); --database-url points it at a
+# real server.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.2
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.2 (2026-10-19): Removed unused import — Tim Canady
+# - 0.1.1 (2026-10-18): Use core.db's engine factory so SQLite runs with WAL and tuned pragmas — Tim Canady
+# - 0.1.0 (2026-10-18): Initial per-row vs batched write benchmark — Tim Canady
+###################################################################
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path to import core modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from core import db
+
+# Load environment variables
+load_dotenv()
+
+
+def synthetic_rows(count, prefix):
+    mtime = datetime(2026, 1, 1)
+    for i in range(count):
+        yield f"/bench/{prefix}/dir{i // 1000}/file{i}.dat", i, mtime, f"{i:064x}"
+
+
+def bench_per_row(count, prefix):
+    start = time.perf_counter()
+    for path, size, mtime, hash_val in synthetic_rows(count, prefix):
+        db.cache_file_entry(path, size, mtime, hash_val)
+    return time.perf_counter() - start
+
+
+def bench_batched(count, prefix, batch_size, flush_interval):
+    start = time.perf_counter()
+    with db.FileWriter(batch_size=batch_size, flush_interval=flush_interval) as writer:
+        for path, size, mtime, hash_val in synthetic_rows(count, prefix):
+            writer.add(path, size, mtime, hash_val)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark database write throughput for hashed files")
+    parser.add_argument("--rows", type=int, default=20_000, help="Rows per run (default: 20000)")
+    parser.add_argument("--per-row-rows", type=int, default=2_000,
+                        help="Rows for the slow one-session-per-row baseline (default: 2000)")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 500, 2000],
+                        help="FileWriter batch sizes to try (default: 100 500 2000)")
+    parser.add_argument("--flush-interval", type=float, default=2.0, help="FileWriter flush interval in seconds")
+    parser.add_argument("--database-url", help="SQLAlchemy URL to benchmark against (default: temporary SQLite file)")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.database_url:
+        url = args.database_url
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{tmp.name}/bench.db"
+
+    engine = db.configure_database(url)
+    db.init_db()
+
+    results = []
+    elapsed = bench_per_row(args.per_row_rows, "per-row")
+    results.append(("cache_file_entry (per row)", "insert", args.per_row_rows, elapsed))
+
+    for batch_size in args.batch_sizes:
+        prefix = f"batch-{batch_size}"
+        for mode in ("insert", "update"):
+            elapsed = bench_batched(args.rows, prefix, batch_size, args.flush_interval)
+            results.append((f"FileWriter batch={batch_size}", mode, args.rows, elapsed))
+
+    # Leave a real database as we found it
+    with db.Session() as session:
+        session.execute(delete(db.File).where(db.File.path.startswith("/bench/")))
+        session.commit()
+
+    print(f"Database: {engine.dialect.name}")
+    print(f"{'writer':<30} {'mode':<7} {'rows':>8} {'seconds':>8} {'rows/sec':>10}")
+    for name, mode, rows, elapsed in results:
+        print(f"{name:<30} {mode:<7} {rows:>8,} {elapsed:>8.2f} {rows / elapsed:>10,.0f}")
+
+    if tmp:
+        engine.dispose()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
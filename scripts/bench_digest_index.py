@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+###################################################################
+# Project: File_Deduplification
+# File: bench_digest_index.py
+# Purpose: Measure peak memory of hash grouping, dict-of-lists vs DigestIndex
+#
+# Description:
+# Generates synthetic SHA256 digests (10% duplicates by default) and
+# groups them two ways: the hex-string dict of lists detect_duplicates
+# used to build, and the compact DigestIndex. Peak memory is measured with
+# tracemalloc and covers hash storage plus grouping for each approach.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.0
+# Last Modified: 2026-10-18 by Tim Canady
+###################################################################
+
+import argparse
+import gc
+import hashlib
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+# Add parent directory to path to import core modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.digest_index import DigestIndex
+
+
+def synthetic_digests(count, duplicate_ratio):
+    """Yield raw SHA256 digests; roughly duplicate_ratio of them repeat an earlier one."""
+    distinct = max(1, int(count * (1 - duplicate_ratio)))
+    for i in range(count):
+        yield hashlib.sha256((i % distinct).to_bytes(8, "little")).digest()
+
+
+def bench_dict_of_lists(count, duplicate_ratio):
+    """Hex strings kept alive as dict keys, one list of members per hash."""
+    member = object()   # stands in for the FileInfo reference
+    hash_groups = defaultdict(list)
+    for digest in synthetic_digests(count, duplicate_ratio):
+        hash_groups[digest.hex()].append(member)
+    return sum(1 for group in hash_groups.values() if len(group) > 1)
+
+
+def bench_digest_index(count, duplicate_ratio):
+    """Raw digests in a DigestIndex, grouped with its probe table."""
+    index = DigestIndex()
+    for digest in synthetic_digests(count, duplicate_ratio):
+        index.add_raw(digest)
+    return len(index.groups())
+
+
+def measure(func, count, duplicate_ratio):
+    """Run func under tracemalloc; returns (groups, peak_bytes, seconds)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    groups = func(count, duplicate_ratio)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return groups, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark peak memory of duplicate hash grouping")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000],
+                        help="Entry counts to benchmark (default: 1M and 10M)")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1,
+                        help="Fraction of entries that repeat an earlier digest (default: 0.1)")
+    args = parser.parse_args()
+
+    print(f"{'entries':>12}  {'approach':<14} {'groups':>10} {'peak MB':>10} {'B/entry':>8} {'seconds':>8}")
+    for count in args.sizes:
+        for name, func in (("dict-of-lists", bench_dict_of_lists), ("DigestIndex", bench_digest_index)):
+            groups, peak, elapsed = measure(func, count, args.duplicate_ratio)
+            print(f"{count:>12,}  {name:<14} {groups:>10,} {peak / 1_048_576:>10.1f} "
+                  f"{peak / count:>8.1f} {elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+###################################################################
+# Project: File_Deduplification
+# File: bench_path_index.py
+# Purpose: Compare the old full-path unique index with the path digest key
+#
+# Description:
+# Loads the same synthetic catalog twice into a throwaway SQLite file:
+# once into a copy of the old layout (files.path VARCHAR(767) UNIQUE) and
+# once through FileWriter into the normalized layout (directories table,
+# files keyed by a 32-byte path digest). Reports the on-disk size of each
+# lookup index and the latency of single-path lookups, including the
+# digest computation for the new key. Index sizes come from SQLite's
+# dbstat table; see migrations/005 for the MySQL equivalent.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+#
+# Version: 0.1.0
+# Last Modified: 2026-10-19 by Tim Canady
+###################################################################
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path to import core modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from core import db
+
+
+def synthetic_paths(count):
+    """Photo-library-like paths: a few thousand folders, ~100 files each."""
+    for i in range(count):
+        folder = i // 100
+        yield (f"/Users/tim/Pictures/Library {folder // 500}/{2000 + folder % 25}/"
+               f"Trip {folder} - Family Vacation/Originals/IMG_{i:07d}.JPG")
+
+
+def index_bytes(conn, name):
+    return conn.execute(text("SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = :name"),
+                        {"name": name}).scalar()
+
+
+def time_lookups(conn, sql, paths, key=str):
+    """Average microseconds per single-row lookup, key(path) included."""
+    stmt = text(sql)
+    start = time.perf_counter()
+    for path in paths:
+        conn.execute(stmt, {"key": key(path)}).scalar()
+    return (time.perf_counter() - start) / len(paths) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark path index size and lookup latency")
+    parser.add_argument("--rows", type=int, default=200_000, help="Files in the synthetic catalog (default: 200000)")
+    parser.add_argument("--lookups", type=int, default=20_000, help="Random single-path lookups (default: 20000)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = db.configure_database(f"sqlite:///{tmp}/bench.db")
+        db.init_db()
+        paths = list(synthetic_paths(args.rows))
+        mtime = datetime(2026, 1, 1)
+
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE old_files (id INTEGER PRIMARY KEY, path VARCHAR(767) NOT NULL, "
+                              "CONSTRAINT old_files_path UNIQUE (path))"))
+            conn.execute(text("INSERT INTO old_files (path) VALUES (:path)"), [{"path": p} for p in paths])
+
+        with db.FileWriter(batch_size=5000, flush_interval=None) as writer:
+            for i, path in enumerate(paths):
+                writer.add(path, i, mtime, f"{i:064x}")
+
+        sample = random.Random(42).sample(paths, min(args.lookups, len(paths)))
+        with engine.connect() as conn:
+            conn.execute(text("ANALYZE"))
+            old_index = index_bytes(conn, "sqlite_autoindex_old_files_1")
+            new_index = index_bytes(conn, "sqlite_autoindex_files_1")
+            directories = conn.execute(text("SELECT COUNT(*) FROM directories")).scalar()
+            directory_bytes = index_bytes(conn, "directories") + index_bytes(conn, "sqlite_autoindex_directories_1")
+
+            old_us = time_lookups(conn, "SELECT id FROM old_files WHERE path = :key", sample)
+            new_us = time_lookups(conn, "SELECT id FROM files WHERE path_digest = :key", sample, key=db.path_digest)
+        engine.dispose()
+
+    avg_path = sum(map(len, paths)) / len(paths)
+    print(f"Catalog: {args.rows:,} files in {directories:,} directories, average path {avg_path:.0f} chars")
+    print(f"{'key':<28} {'index MB':>9} {'bytes/row':>10} {'lookup us':>10}")
+    print(f"{'files.path UNIQUE (old)':<28} {old_index / 1048576:>9.1f} {old_index / args.rows:>10.1f} {old_us:>10.1f}")
+    print(f"{'files.path_digest UNIQUE':<28} {new_index / 1048576:>9.1f} {new_index / args.rows:>10.1f} {new_us:>10.1f}")
+    print(f"directories table + key: {directory_bytes / 1048576:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+###################################################################
+# Project: File_Deduplification
+# File: distributed_hash.py
+# Purpose: Hash one dedup job with several workers through a DB work queue
+#
+# Description:
+# enqueue scans a tree into the hash_jobs table. Any number of workers
+# (processes or machines) then claim batches of pending paths, hash them
+# and write the results back in one transaction per batch; claims whose
+# lease expires are reclaimed. finalize runs detect_duplicates over the
+# merged results. --sqlite points everything at a local SQLite file so
+# the flow can be tried without a MySQL server.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+#
+# Version: 0.1.2
+# Last Modified: 2026-10-18 by Tim Canady
+#
+# Revision History:
+# - 0.1.2 (2026-10-18): --sqlite uses the tuned SQLite engine (WAL, busy timeout) — Tim Canady
+# - 0.1.1 (2026-10-18): finalize passes file ids for batched duplicate marks — Tim Canady
+# - 0.1.0 (2026-10-18): Initial enqueue/work/finalize work queue CLI — Tim Canady
+###################################################################
+
+import argparse
+import logging
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path to import core modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+from core import db
+from core.hasher import hash_path
+from core.scanner import scan_directory
+from core.deduplicator import detect_duplicates, report_duplicates
+from models.file_info import FileInfo
+
+# Load environment variables
+load_dotenv()
+
+
+def enqueue(source, filter_names=None, max_files=None):
+    """Scan source and queue every path for hashing."""
+    source_path = Path(source).resolve()
+    logging.info(f"🔍 Scanning {source_path}...")
+    paths = scan_directory(str(source_path), filter_names=filter_names, max_files=max_files)
+    queued = db.enqueue_hash_jobs(paths)
+    logging.info(f"📥 Queued {queued} new path(s) ({len(paths) - queued} already queued)")
+    return queued
+
+
+def work(batch_size=100, lease_seconds=900, max_attempts=3, path_prefix=None,
+         metadata_only_size=None, wait=False, poll_seconds=10):
+    """
+    Claim, hash and complete batches until the queue is drained.
+
+    Every loop first reclaims expired leases, so a crashed worker's batch is
+    picked up by whoever is still running. The lease must be longer than a
+    batch takes to hash.
+
+    Args:
+        batch_size: Paths per claim
+        lease_seconds: Seconds before an unfinished claim is reclaimed
+        max_attempts: Claims per path before it is marked failed
+        path_prefix: Only claim paths under this prefix
+        metadata_only_size: Files larger than this (bytes) are not hashed
+        wait: Keep polling while other workers still hold claims
+        poll_seconds: Sleep between polls when waiting
+
+    Returns:
+        Number of paths this worker hashed
+    """
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    hashed = 0
+    logging.info(f"👷 Worker {worker} started (batch {batch_size}, lease {lease_seconds}s)")
+
+    while True:
+        requeued, failed = db.reclaim_expired_hash_jobs(lease_seconds, max_attempts=max_attempts)
+        if requeued or failed:
+            logging.warning(f"   ♻️ Reclaimed {requeued} expired job(s), gave up on {failed}")
+
+        token, jobs = db.claim_hash_jobs(worker, batch_size=batch_size, path_prefix=path_prefix)
+        if not jobs:
+            counts = db.hash_job_counts()
+            if wait and (counts[db.JOB_PENDING] or counts[db.JOB_CLAIMED]):
+                time.sleep(poll_seconds)
+                continue
+            break
+
+        results = []
+        failures = {}
+        for _, path in jobs:
+            try:
+                size, mtime, sha256, metadata_only = hash_path(Path(path), metadata_only_size)
+                results.append((path, size, mtime, sha256, metadata_only))
+            except OSError as e:
+                logging.warning(f"⚠️ OS error reading {path}: {e}")
+                failures[path] = str(e)
+
+        written = db.complete_hash_jobs(token, results, failures)
+        hashed += written
+        logging.info(f"   ✅ Batch done: {written} hashed, {len(failures)} failed, "
+                     f"{len(results) - written} dropped (lease lost)")
+
+    logging.info(f"🏁 Worker {worker} finished: {hashed} path(s) hashed")
+    return hashed
+
+
+def finalize(force=False, duplicate_report=None):
+    """
+    Run duplicate detection over every completed job.
+
+    Refuses to run while jobs are still pending or claimed unless force is set,
+    since duplicates among unhashed paths would be missed.
+    """
+    counts = db.hash_job_counts()
+    logging.info(f"📊 Jobs: {counts[db.JOB_DONE]} done, {counts[db.JOB_PENDING]} pending, "
+                 f"{counts[db.JOB_CLAIMED]} claimed, {counts[db.JOB_FAILED]} failed")
+
+    if (counts[db.JOB_PENDING] or counts[db.JOB_CLAIMED]) and not force:
+        logging.error("❌ Jobs still outstanding; run more workers or pass --force")
+        return None
+
+    files = [FileInfo(path=Path(path), size=size or 0, hash=hash_val, file_id=file_id)
+             for file_id, path, size, hash_val in db.load_hashed_jobs()]
+    files = detect_duplicates(files, use_db=True)
+
+    if duplicate_report:
+        report_duplicates(files, output_file=duplicate_report)
+
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Hash one dedup job with several workers through a DB work queue",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Queue every file under the NAS share
+  python scripts/distributed_hash.py enqueue /mnt/nas
+
+  # On each machine, hash the part of the tree it has local access to
+  python scripts/distributed_hash.py work --prefix /mnt/nas/photos --wait
+
+  # Once the queue is drained, mark duplicates across all results
+  python scripts/distributed_hash.py finalize --duplicate-report dupes.txt
+
+  # Try it locally against a SQLite file instead of MySQL
+  python scripts/distributed_hash.py --sqlite queue.db enqueue ~/Documents
+        """
+    )
+    parser.add_argument('--sqlite', help='Use this SQLite database file instead of the configured MySQL database')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Show debug output')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help='Scan a tree and queue its paths')
+    enqueue_parser.add_argument('source', help='Root source directory')
+    enqueue_parser.add_argument('--filter', nargs='*', help='Root-level directory name patterns to include')
+    enqueue_parser.add_argument('--max-files', type=int, help='Maximum number of files to queue')
+
+    work_parser = subparsers.add_parser('work', help='Claim and hash batches until the queue is empty')
+    work_parser.add_argument('--batch-size', type=int, default=100, help='Paths per claim (default: 100)')
+    work_parser.add_argument('--lease', type=int, default=900, help='Seconds before an unfinished claim is reclaimed (default: 900)')
+    work_parser.add_argument('--max-attempts', type=int, default=3, help='Claims per path before it is marked failed (default: 3)')
+    work_parser.add_argument('--prefix', help='Only claim paths under this prefix')
+    work_parser.add_argument('--metadata-only-size', type=int, help='Files larger than this many bytes are not hashed')
+    work_parser.add_argument('--wait', action='store_true', help='Keep polling while other workers still hold claims')
+
+    finalize_parser = subparsers.add_parser('finalize', help='Detect duplicates over all completed jobs')
+    finalize_parser.add_argument('--force', action='store_true', help='Run even if jobs are still outstanding')
+    finalize_parser.add_argument('--duplicate-report', help='Write the duplicate report to this file')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(message)s'
+    )
+
+    try:
+        if args.sqlite:
+            db.configure_database(f"sqlite:///{args.sqlite}")
+        db.init_db()
+        logging.info("✅ Database connection established")
+
+        if args.command == 'enqueue':
+            enqueue(args.source, filter_names=args.filter, max_files=args.max_files)
+        elif args.command == 'work':
+            work(batch_size=args.batch_size, lease_seconds=args.lease, max_attempts=args.max_attempts,
+                 path_prefix=args.prefix, metadata_only_size=args.metadata_only_size, wait=args.wait)
+        elif args.command == 'finalize':
+            if finalize(force=args.force, duplicate_report=args.duplicate_report) is None:
+                sys.exit(1)
+
+    except KeyboardInterrupt:
+        logging.warning("\n⚠️  Interrupted by user (claimed jobs are reclaimed after their lease expires)")
+        sys.exit(130)
+    except Exception as e:
+        logging.error(f"\n❌ {args.command} failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,12 +9,25 @@
 # Reads files from database with specific categories (e.g., "other")
 # and re-classifies them using the improved classification system.
 # Updates the classifications table without re-scanning files.
+# Files are streamed from the catalog in keyset pages (core.catalog),
+# so memory does not grow with the catalog, and changes are written in
+# batches by id. Each written row records the classifier rule set id,
+# the rule that matched and the file's extension; --rules reclassifies
+# with a different rule file. --changed diffs the current rules against
+# the rules each row was classified with and rereads only the rows whose
+# extension or matched rule is affected (indexed queries); the other rows
+# are moved to the current rule set with one UPDATE per old rule set.
 #
 # Author: Tim Canady
 # Created: 2025-11-13
 #
-# Version: 0.7.1
-# Last Modified: 2025-11-13 by Tim Canady
+# Version: 0.10.0
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.10.0 (2026-10-19): --changed reclassifies only rows affected by rule changes; rows record the matched rule; headers sniffed — Tim Canady
+# - 0.9.0 (2026-10-19): Rows record the classifier rule set; --rules to use another rule file — Tim Canady
+# - 0.8.0 (2026-10-19): Stream files with core.catalog instead of loading the whole join; batched writes; --root — Tim Canady
 ###################################################################
 
 import argparse
@@ -28,19 +41,58 @@ from collections import defaultdict
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from dotenv import load_dotenv
-from core.db import Session, File, Classification, save_classification
-from core.classifier import classify_file
+from core.catalog import CatalogFilter, count_catalog, iter_catalog
+from core.db import ClassificationWriter, classification_rule_sets, stamp_rule_set
+from core.classifier import (RuleDiff, current_rules, diff_rules, load_rules, match_path, recorded_rules,
+                             use_rules)
+from core.sniffer import sniff_file
 from models.file_info import FileInfo
 
 # Load environment variables
 load_dotenv()
 
+def changed_rule_sets(rules, root=None):
+    """
+    Catalog filters for the classifications each superseded rule set left stale.
+
+    For every rule set id in the classifications table other than the current
+    one, the rules recorded for it are diffed against the current rules
+    (core.classifier.diff_rules) and only rows with an affected extension or
+    matched rule are selected. Rule sets that were never recorded, rows from
+    before rule set ids were stored, and MIME table changes select every row
+    of that rule set.
+
+    Args:
+        rules: The rule set to reclassify with
+        root: Only files under this folder
+
+    Returns:
+        List of (old rule set id, CatalogFilter, RuleDiff); None for rows
+        without a rule set id
+    """
+    changes = []
+    for rule_set_id in sorted(classification_rule_sets(), key=lambda r: r or ""):
+        if rule_set_id == rules.rule_set_id:
+            continue
+        old_rules = recorded_rules(rule_set_id) if rule_set_id else None
+        diff = diff_rules(old_rules, rules) if old_rules is not None else RuleDiff(wholesale=True)
+        filters = CatalogFilter(root=root, rule_set=rule_set_id or "")
+        if not diff.wholesale:
+            filters.changed_extensions = sorted(diff.extensions)
+            filters.changed_rules = sorted(diff.matched_rules)
+        changes.append((rule_set_id, filters, diff))
+    return changes
+
+
 def reclassify_files(
     categories_to_update=None,
     all_files=False,
     dry_run=False,
     verbose=False,
-    skip_cloud=False
+    skip_cloud=False,
+    root=None,
+    page_size=1000,
+    changed=False
 ):
     """
     Reclassify existing files in the database.
@@ -51,6 +103,11 @@ def reclassify_files(
         dry_run: If True, show what would be changed without updating database
         verbose: If True, show detailed progress
         skip_cloud: If True, skip files in cloud storage directories (Google Drive, Dropbox, etc.)
+        root: Only reclassify files under this folder
+        page_size: Catalog rows read per query (and classifications written per batch)
+        changed: If True, reclassify only rows the rule changes since they were
+                 classified can affect (see changed_rule_sets()); the other rows
+                 of each old rule set are moved to the current one in place
     """
     logging.basicConfig(
         level=logging.DEBUG if verbose else logging.INFO,
@@ -66,37 +123,31 @@ def reclassify_files(
         'files_missing': 0,
         'files_skipped': 0,
         'files_error': 0,
+        'files_stamped': 0,
         'category_changes': defaultdict(lambda: defaultdict(int))
     }
 
-    # Cloud storage paths to skip if skip_cloud is True
-    cloud_paths = [
-        'Google Drive',
-        'Dropbox',
-        'OneDrive',
-        'iCloud Drive',
-        'Box Sync',
-        'Library/CloudStorage'
-    ]
-
-    session = Session()
+    rules = current_rules()
+    if changed:
+        changes = changed_rule_sets(rules, root=root)
+    else:
+        changes = [(None, CatalogFilter(categories=categories_to_update if not all_files else None, root=root), None)]
+    writer = None
 
     try:
-        # Build query
-        query = session.query(File, Classification).join(
-            Classification,
-            File.id == Classification.file_id,
-            isouter=True
-        )
-
-        # Filter by categories if specified
-        if categories_to_update and not all_files:
-            query = query.filter(Classification.category.in_(categories_to_update))
-
-        files_to_process = query.all()
-        stats['total_files'] = len(files_to_process)
-
-        if stats['total_files'] == 0:
+        counts = [0 if diff is not None and diff.empty else count_catalog(filters) for _, filters, diff in changes]
+        stats['total_files'] = sum(counts)
+
+        if changed:
+            if not changes:
+                logging.info(f"✅ Every classification already uses rules {rules.rule_set_id}")
+                return stats
+            for (rule_set_id, filters, diff), count in zip(changes, counts):
+                scope = ("all rows" if diff.wholesale else
+                         f"{len(diff.extensions)} extension(s), {len(diff.matched_rules)} rule(s)")
+                logging.info(f"📐 {rule_set_id or 'no rule set'} -> {rules.rule_set_id}: {count:,} affected row(s) ({scope})")
+
+        if stats['total_files'] == 0 and not changed:
             logging.info("✅ No files found matching criteria")
             return stats
 
@@ -107,86 +158,21 @@ def reclassify_files(
         logging.info(f"Mode: {'DRY RUN (no changes will be saved)' if dry_run else 'LIVE UPDATE'}")
         logging.info(f"{'='*70}\n")
 
-        # Process each file
-        for idx, (file, classification) in enumerate(files_to_process, 1):
-            try:
-                stats['files_checked'] += 1
-                file_path = Path(file.path)
-
-                # Skip cloud storage files if requested
-                if skip_cloud and any(cloud in str(file_path) for cloud in cloud_paths):
-                    stats['files_skipped'] += 1
-                    if verbose:
-                        logging.info(f"[{idx}/{stats['total_files']}] ⏭️  Skipped (cloud): {file_path.name}")
-                    continue
+        if not dry_run:
+            writer = ClassificationWriter(batch_size=page_size)
 
-                # Check if file still exists (with timeout handling)
-                try:
-                    if not file_path.exists():
-                        stats['files_missing'] += 1
-                        if verbose:
-                            logging.warning(f"[{idx}/{stats['total_files']}] ⚠️  File not found: {file.path}")
-                        continue
-                except OSError as e:
-                    # Handle timeout, permission denied, etc.
-                    stats['files_error'] += 1
-                    if verbose:
-                        logging.warning(f"[{idx}/{stats['total_files']}] ⚠️  Cannot access: {file_path.name} ({e})")
-                    continue
+        for (rule_set_id, filters, diff), count in zip(changes, counts):
+            if count:
+                _reclassify_rows(filters, rules, stats, writer, verbose, skip_cloud, page_size,
+                                 write_all=changed)
+            if changed and not dry_run and rule_set_id and not diff.wholesale:
+                # Written rows must land before the unaffected rest is stamped
+                writer.flush()
+                stats['files_stamped'] += stamp_rule_set(rule_set_id, rules.rule_set_id,
+                                                         diff.extensions, diff.matched_rules)
 
-                # Get old category
-                old_category = classification.category if classification else 'unknown'
-
-                # Create FileInfo object for classification
-                file_info = FileInfo(
-                    path=file_path,
-                    size=file.size,
-                    hash=file.hash
-                )
-
-                # Reclassify the file (use extension-only classification for cloud files)
-                classified_file = classify_file(file_info, use_db=False)
-                new_category = classified_file.type
-
-                # Check if category changed
-                if new_category != old_category:
-                    stats['files_updated'] += 1
-                    stats['category_changes'][old_category][new_category] += 1
-
-                    # Log the change
-                    if verbose or (idx % 100 == 0):
-                        logging.info(
-                            f"[{idx}/{stats['total_files']}] "
-                            f"📝 {old_category} → {new_category}: "
-                            f"{file_path.name}"
-                        )
-                    elif idx % 10 == 0:
-                        logging.info(f"  Processing... {idx}/{stats['total_files']}")
-
-                    # Update database if not dry run
-                    if not dry_run:
-                        save_classification(
-                            file.path,
-                            category=new_category,
-                            owner=classification.owner if classification else None,
-                            year=classification.year if classification else None,
-                            confidence=0.9  # Higher confidence for reclassification
-                        )
-                else:
-                    stats['files_unchanged'] += 1
-                    if verbose:
-                        logging.debug(
-                            f"[{idx}/{stats['total_files']}] "
-                            f"✓ Unchanged: {old_category} - {file_path.name}"
-                        )
-
-            except KeyboardInterrupt:
-                logging.warning(f"\n⚠️  Interrupted at file {idx}/{stats['total_files']}")
-                raise
-            except Exception as e:
-                stats['files_error'] += 1
-                logging.warning(f"[{idx}/{stats['total_files']}] ❌ Error: {file_path.name} - {e}")
-                continue
+        if writer is not None:
+            writer.close()
 
         # Print summary
         print_summary(stats, dry_run)
@@ -195,11 +181,118 @@ def reclassify_files(
         logging.error(f"\n❌ Error during reclassification: {e}")
         raise
     finally:
-        session.close()
+        if writer is not None:
+            writer.close()
 
     return stats
 
 
+def _reclassify_rows(filters, rules, stats, writer, verbose, skip_cloud, page_size, write_all=False):
+    """
+    Reclassify the catalog rows matching filters, updating stats.
+
+    Changed categories are written through writer (None for a dry run);
+    with write_all every reclassified row is written, so it records the
+    current rule set and matched rule even when its category stays.
+    """
+    # Cloud storage paths to skip if skip_cloud is True
+    cloud_paths = [
+        'Google Drive',
+        'Dropbox',
+        'OneDrive',
+        'iCloud Drive',
+        'Box Sync',
+        'Library/CloudStorage'
+    ]
+
+    # Process each file (rows are column tuples, streamed page by page)
+    for file in iter_catalog(filters, page_size=page_size):
+        idx = stats['files_checked'] = stats['files_checked'] + 1
+        file_path = Path(file.path)
+        try:
+            # Skip cloud storage files if requested
+            if skip_cloud and any(cloud in str(file_path) for cloud in cloud_paths):
+                stats['files_skipped'] += 1
+                if verbose:
+                    logging.info(f"[{idx}/{stats['total_files']}] ⏭️  Skipped (cloud): {file_path.name}")
+                continue
+
+            # Check if file still exists (with timeout handling)
+            try:
+                if not file_path.exists():
+                    stats['files_missing'] += 1
+                    if verbose:
+                        logging.warning(f"[{idx}/{stats['total_files']}] ⚠️  File not found: {file.path}")
+                    continue
+            except OSError as e:
+                # Handle timeout, permission denied, etc.
+                stats['files_error'] += 1
+                if verbose:
+                    logging.warning(f"[{idx}/{stats['total_files']}] ⚠️  Cannot access: {file_path.name} ({e})")
+                continue
+
+            # Get old category
+            old_category = file.category or 'unknown'
+
+            # Create FileInfo object for classification; the header is sniffed
+            # so content-based answers survive reclassification
+            file_info = FileInfo(
+                path=file_path,
+                size=file.size,
+                hash=file.hash,
+                file_id=file.id,
+                content_type=sniff_file(file_path)
+            )
+
+            # Reclassify the file
+            new_category, matched_rule = match_path(file_info.path, file_info.content_type, rules)
+            file_info.type = new_category
+
+            # Check if category changed
+            category_changed = new_category != old_category
+            if category_changed:
+                stats['files_updated'] += 1
+                stats['category_changes'][old_category][new_category] += 1
+
+                # Log the change
+                if verbose or (idx % 100 == 0):
+                    logging.info(
+                        f"[{idx}/{stats['total_files']}] "
+                        f"📝 {old_category} → {new_category}: "
+                        f"{file_path.name}"
+                    )
+                elif idx % 10 == 0:
+                    logging.info(f"  Processing... {idx}/{stats['total_files']}")
+            else:
+                stats['files_unchanged'] += 1
+                if verbose:
+                    logging.debug(
+                        f"[{idx}/{stats['total_files']}] "
+                        f"✓ Unchanged: {old_category} - {file_path.name}"
+                    )
+
+            # Update database if not dry run
+            if writer is not None and (category_changed or write_all):
+                writer.add(
+                    file_info,
+                    category=new_category,
+                    owner=file.owner,
+                    year=file.year,
+                    confidence=0.9,  # Higher confidence for reclassification
+                    rule_set=rules.rule_set_id,
+                    matched_rule=matched_rule,
+                    extension=file_path.suffix.lower()
+                )
+
+        except KeyboardInterrupt:
+            logging.warning(f"\n⚠️  Interrupted at file {idx}/{stats['total_files']}")
+            raise
+        except Exception as e:
+            stats['files_error'] += 1
+            logging.warning(f"[{idx}/{stats['total_files']}] ❌ Error: {file_path.name} - {e}")
+            continue
+
+
 def print_summary(stats, dry_run):
     """Print summary of reclassification results."""
     print(f"\n{'='*70}")
@@ -212,6 +305,9 @@ def print_summary(stats, dry_run):
     print(f"  Files unchanged: {stats['files_unchanged']:,}")
     print(f"  Files missing: {stats['files_missing']:,}")
 
+    if stats.get('files_stamped', 0) > 0:
+        print(f"  Unaffected rows moved to the current rules: {stats['files_stamped']:,}")
+
     if stats.get('files_skipped', 0) > 0:
         print(f"  Files skipped (cloud): {stats['files_skipped']:,}")
 
@@ -249,6 +345,9 @@ Examples:
   # Reclassify all files in database
   python scripts/reclassify_files.py --all
 
+  # After editing the rule file: only rows the edit can affect
+  python scripts/reclassify_files.py --changed
+
   # Dry run to see what would change
   python scripts/reclassify_files.py --categories other --dry-run
 
@@ -269,6 +368,12 @@ Examples:
         help='Reclassify ALL files in database (ignores --categories)'
     )
 
+    parser.add_argument(
+        '--changed',
+        action='store_true',
+        help='Reclassify only rows affected by rule changes since they were classified (ignores --categories/--all)'
+    )
+
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -287,13 +392,34 @@ Examples:
         help='Skip files in cloud storage (Google Drive, Dropbox, OneDrive, etc.)'
     )
 
+    parser.add_argument(
+        '--root',
+        help='Only reclassify files under this folder'
+    )
+
+    parser.add_argument(
+        '--rules',
+        help='Classifier rule file (JSON or YAML) to reclassify with (default: $CLASSIFIER_RULES or core/classifier_rules.json)'
+    )
+
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        default=1000,
+        help='Catalog rows read per query and classifications written per batch (default: 1000)'
+    )
+
     args = parser.parse_args()
 
     # Default to "other" if no categories specified and not --all
-    if not args.categories and not args.all:
+    if not args.categories and not args.all and not args.changed:
         args.categories = ['other']
 
     try:
+        if args.rules:
+            use_rules(load_rules(args.rules))
+        logging.info(f"📐 Classifier rules: {current_rules().rule_set_id}")
+
         # Initialize database
         from core.db import init_db
         init_db()
@@ -305,7 +431,10 @@ Examples:
             all_files=args.all,
             dry_run=args.dry_run,
             verbose=args.verbose,
-            skip_cloud=args.skip_cloud
+            skip_cloud=args.skip_cloud,
+            root=args.root,
+            page_size=args.page_size,
+            changed=args.changed
         )
 
         # Exit with appropriate code
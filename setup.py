@@ -11,6 +11,7 @@ setup(
     author="Tim Canady",
     author_email="you@example.com",
     packages=find_packages(),
+    package_data={"core": ["classifier_rules.json"]},
     install_requires=[
         "openai>=1.0.0",
         "python-docx>=1.0.0",
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_catalog.py
+# Purpose: Unit tests for the keyset-paginated catalog query API.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): duplicate_of reads back as the original's path — Tim Canady
+# - 0.1.0 (2026-10-19): Initial filter, pagination and writer tests — Tim Canady
+###################################################################
+
+import io
+import json
+import unittest
+from datetime import datetime
+from pathlib import Path
+from core import db
+from core.catalog import CatalogFilter, iter_catalog, count_catalog, write_catalog_rows
+from models.file_info import FileInfo
+from tests.test_db import SQLiteTestCase
+
+
+class TestCatalogQuery(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.files = [FileInfo(path=Path(p), size=10) for p in
+                      ("/photos/2019/a.jpg", "/photos/2019/b.jpg", "/photos-old/c.jpg",
+                       "/docs/tax.pdf", "/docs/notes.txt")]
+        with db.FileWriter() as writer:
+            for month, f in enumerate(self.files, 1):
+                writer.add(f.path, f.size, datetime(2024, month, 1), f"h{month}", file_info=f)
+        a, b, c, tax, notes = self.files
+        with db.ClassificationWriter() as writer:
+            for f, category in ((a, "image"), (b, "image"), (c, "image"), (tax, "financial")):
+                writer.add(f, category)
+        with db.DuplicateWriter() as writer:
+            writer.mark(b, a.path)
+
+    def _paths(self, filters=None, **kwargs):
+        return [row.path for row in iter_catalog(filters, **kwargs)]
+
+    def test_pages_stream_every_row_in_id_order(self):
+        self.assertEqual(self._paths(page_size=2), [str(f.path) for f in self.files])
+
+    def test_filters(self):
+        self.assertEqual(self._paths(CatalogFilter(categories=["financial"])), ["/docs/tax.pdf"])
+        self.assertEqual(self._paths(CatalogFilter(root="/photos/")), ["/photos/2019/a.jpg", "/photos/2019/b.jpg"])
+        self.assertEqual(self._paths(CatalogFilter(duplicates=True)), ["/photos/2019/b.jpg"])
+        self.assertEqual(len(self._paths(CatalogFilter(duplicates=False))), 4)
+        self.assertEqual(self._paths(CatalogFilter(modified_since=datetime(2024, 4, 1),
+                                                   modified_before=datetime(2024, 5, 1))), ["/docs/tax.pdf"])
+        self.assertEqual(count_catalog(CatalogFilter(categories=["image"], duplicates=False)), 2)
+
+    def test_duplicate_of_is_the_original_path(self):
+        rows = {row.path: row.duplicate_of for row in iter_catalog()}
+        self.assertEqual(rows["/photos/2019/b.jpg"], "/photos/2019/a.jpg")
+        self.assertIsNone(rows["/photos/2019/a.jpg"])
+
+    def test_resume_after_id_and_limit(self):
+        first = list(iter_catalog(page_size=2, limit=3))
+        rest = self._paths(after_id=first[-1].id, page_size=2)
+        self.assertEqual([row.path for row in first] + rest, [str(f.path) for f in self.files])
+
+    def test_rows_leaving_the_filter_do_not_shift_pages(self):
+        seen = []
+        for row in iter_catalog(CatalogFilter(categories=["image"]), page_size=1):
+            seen.append(row.path)
+            with db.ClassificationWriter() as writer:
+                writer.add(FileInfo(path=Path(row.path), size=row.size, file_id=row.id), "video")
+        self.assertEqual(seen, ["/photos/2019/a.jpg", "/photos/2019/b.jpg", "/photos-old/c.jpg"])
+
+    def test_write_formats(self):
+        rows = list(iter_catalog(CatalogFilter(categories=["financial"])))
+        out = io.StringIO()
+        self.assertEqual(write_catalog_rows(rows, out, fmt="jsonl"), 1)
+        record = json.loads(out.getvalue())
+        self.assertEqual((record["path"], record["category"], record["mtime"]),
+                         ("/docs/tax.pdf", "financial", "2024-04-01T00:00:00"))
+
+        out = io.StringIO()
+        write_catalog_rows(rows, out, fmt="text")
+        header, line = out.getvalue().splitlines()
+        self.assertEqual(header.split("\t")[:2], ["id", "path"])
+        self.assertEqual(line.split("\t")[1], "/docs/tax.pdf")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,17 +7,32 @@
 #
 # Author: Tim Canady
 # Created: 2025-09-28
-# Version: 0.1.0
-# Last Modified: 2025-11-04 by Tim Canady
+# Version: 0.5.1
+# Last Modified: 2026-10-19 by Tim Canady
 #
 # Revision History:
+# - 0.5.1 (2026-10-19): Sharded classify_batch with a dict-built RuleSet — Tim Canady
+# - 0.5.0 (2026-10-19): Matched rules, diff_rules and reclassify --changed — Tim Canady
+# - 0.4.0 (2026-10-19): Rule file loading, rule set ids and reload_rules — Tim Canady
+# - 0.3.0 (2026-10-19): classify_batch matches categorize_path, serial and sharded — Tim Canady
+# - 0.2.0 (2026-10-19): Rule-precedence cases for the table-driven classifier — Tim Canady
 # - 0.1.0 (2025-11-04): Initial test logic for classifier — Tim Canady
 ###################################################################
 
+import json
+import os
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 from models.file_info import FileInfo
-from core.classifier import classify_file
+from core import classifier
+from core import db
+from core.classifier import (classify_file, classify_batch, classify_files, categorize_path, current_rules,
+                             diff_rules, load_rules, match_path, reload_rules, use_rules, RuleSet,
+                             DEFAULT_RULES_FILE)
+from scripts.reclassify_files import reclassify_files
+from tests.test_db import SQLiteTestCase
 
 
 class TestClassifier(unittest.TestCase):
@@ -29,6 +44,187 @@ class TestClassifier(unittest.TestCase):
         self.assertIsNotNone(classified.type)
         # self.assertTrue(classified.owner or classified.year)
 
+    def test_rule_precedence_is_unchanged(self):
+        cases = {
+            "/p/IMG_0001.JPG": "image",
+            "/p/schema.sql": "code",             # listed under code before data
+            "/p/drivers.cab": "archive",         # listed under archive before installer
+            "/p/report.csv": "spreadsheet",      # text/csv
+            "/p/talk.key": "presentation",       # listed before certificate
+            "/p/backup.tar.gz": "archive",       # MIME type comes from .tar
+            "/p/photo.jpg.gz": "image",          # ... and here from .jpg
+            "/p/returns.tax2024": "financial",   # year-specific prefix rule
+            "/p/Makefile": "code",
+            "/p/LICENSE": "system",
+            "/A.app/Contents/MacOS/A": "installer",
+            "/A.app/Contents/Resources/x.alias": "system",  # bundle rule before alias rule
+            "/p/server.log.1": "system",
+            "/p/CS101 notes": "education",
+            "/home/finance/budget": "financial",
+            "/srv/www/index": "web",
+            "/p/unknown.xyz": "other",
+        }
+        self.assertEqual({p: categorize_path(Path(p)) for p in cases}, cases)
+
+    def test_batch_matches_single_file_classification(self):
+        paths = ["/p/IMG_0001.JPG", "/p/backup.tar.gz", "/p/.hidden.jpg", "/p/Makefile", "/p/README",
+                 "/srv/www/index", "/srv/www/style.css", "/srv/www2/index", "/x/nbproject",
+                 "/w/.project", "/home/finance/budget", "/home/finance/README", "/p/w2",
+                 "/A.app/Contents/MacOS/A", "/A.app/Contents/MacOS/A.dylib", "/p/unknown.xyz"]
+        files = [FileInfo(path=Path(p), size=0) for p in paths * 3]
+        files[1].content_type = "image/jpeg"  # backup.tar.gz with JPEG content
+        files[4].content_type = "application/pdf"
+        expected = [categorize_path(f.path, f.content_type) for f in files]
+
+        self.assertEqual(classify_batch(files, workers=1), expected)
+        self.assertEqual([f.type for f in files], expected)
+        with mock.patch.object(classifier, "CLASSIFY_PARALLEL_MIN", 1), \
+                mock.patch.object(classifier, "CLASSIFY_SHARD_SIZE", 5):
+            self.assertEqual(classify_batch(files, workers=2), expected)
+
+    def test_sharded_batch_uses_rules_given_as_a_dict(self):
+        # Workers must get these rules, not load the default rule file
+        data = json.loads(DEFAULT_RULES_FILE.read_text())
+        data["extensions"][0]["extensions"].append(".cr3x")
+        rules = RuleSet(data)
+        files = [FileInfo(path=Path(f"/p/d{i % 4}/a{i}.cr3x"), size=0) for i in range(20)]
+        with mock.patch.object(classifier, "CLASSIFY_PARALLEL_MIN", 1), \
+                mock.patch.object(classifier, "CLASSIFY_SHARD_SIZE", 5):
+            matches = classify_batch(files, workers=2, rules=rules, with_rules=True)
+        self.assertEqual(set(matches), {("image", "extension")})
+
+
+class TestRuleFile(unittest.TestCase):
+    def setUp(self):
+        self.default = current_rules()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = json.loads(DEFAULT_RULES_FILE.read_text())
+        self.rule_file = Path(self.tmp.name) / "rules.json"
+        self.rule_file.write_text(json.dumps(self.data))
+
+    def tearDown(self):
+        use_rules(self.default)
+        self.tmp.cleanup()
+
+    def test_rule_set_id_follows_the_rules(self):
+        self.assertEqual(load_rules(self.rule_file).rule_set_id, self.default.rule_set_id)
+        self.data["extensions"][0]["extensions"].append(".cr3x")
+        changed = RuleSet(self.data)
+        self.assertNotEqual(changed.rule_set_id, self.default.rule_set_id)
+        self.assertTrue(changed.rule_set_id.startswith(self.data["version"] + "-"))
+        self.assertEqual(categorize_path(Path("/p/a.cr3x"), rules=changed), "image")
+        self.assertEqual(categorize_path(Path("/p/a.cr3x")), "other")
+
+    def test_invalid_rules_are_rejected(self):
+        self.data["fallback"][0]["kind"] = "regex"
+        with self.assertRaises(ValueError):
+            RuleSet(self.data)
+        with self.assertRaises(ValueError):
+            RuleSet({"version": "1"})
+
+    def test_reload_picks_up_edits_and_keeps_rules_on_error(self):
+        use_rules(load_rules(self.rule_file))
+        self.assertFalse(reload_rules())
+
+        self.data["fallback"].insert(0, {"kind": "name_prefix", "category": "financial", "patterns": ["budget"]})
+        self.rule_file.write_text(json.dumps(self.data))
+        os.utime(self.rule_file, (0, 0))
+        self.assertTrue(reload_rules())
+        self.assertEqual(categorize_path(Path("/p/Budget 2024")), "financial")
+
+        edited = current_rules()
+        self.rule_file.write_text("{not json")
+        with self.assertLogs(level="WARNING"):
+            self.assertFalse(reload_rules(force=True))
+        self.assertIs(current_rules(), edited)
+
+
+def _edited_rules():
+    # The default rules plus one new extension and one name rule ahead of all but the first fallback rule
+    data = json.loads(DEFAULT_RULES_FILE.read_text())
+    data["extensions"][0]["extensions"].append(".cr3x")
+    data["fallback"].insert(1, {"kind": "name_prefix", "category": "financial", "patterns": ["budget"]})
+    return RuleSet(data)
+
+
+class TestRuleChanges(unittest.TestCase):
+    def setUp(self):
+        self.rules = current_rules()
+        self.data = json.loads(DEFAULT_RULES_FILE.read_text())
+
+    def test_match_path_reports_the_deciding_rule(self):
+        ids = self.rules.fallback_rule_ids
+        self.assertEqual(match_path(Path("/p/a.jpg")), ("image", "extension"))
+        self.assertEqual(match_path(Path("/p/archive.tar.gz")), ("archive", "mime"))
+        self.assertEqual(match_path(Path("/p/photo.txt"), "image/jpeg"), ("image", "content"))
+        self.assertEqual(match_path(Path("/p/Makefile")), ("code", ids[1]))
+        self.assertEqual(match_path(Path("/p/nothing.zzz9")), ("other", "other"))
+        self.assertEqual(ids, RuleSet(self.data).fallback_rule_ids)
+
+    def test_diff_selects_only_rows_that_can_change(self):
+        edited = _edited_rules()
+        diff = diff_rules(self.rules, edited)
+        self.assertFalse(diff.wholesale)
+        self.assertEqual(diff.extensions, {".cr3x"})
+        self.assertEqual(diff.matched_rules, set(self.rules.fallback_rule_ids[1:]) | {"other"})
+
+        paths = ["/p/a.jpg", "/p/a.cr3x", "/p/Budget 2024", "/p/Makefile", "/p/taxes.tax2023", "/p/x.zzz9"]
+        for path in paths:
+            old, new = match_path(Path(path), rules=self.rules), match_path(Path(path), rules=edited)
+            affected = Path(path).suffix.lower() in diff.extensions or old[1] in diff.matched_rules
+            self.assertTrue(affected or old == new, path)
+
+    def test_unchanged_and_wholesale_changes(self):
+        self.assertTrue(diff_rules(self.rules, RuleSet(self.data)).empty)
+        self.data["mime_types"]["application/x-cr3x"] = "image"
+        self.assertTrue(diff_rules(self.rules, RuleSet(self.data)).wholesale)
+
+
+class TestChangedReclassification(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.default = current_rules()
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.files = []
+        for name in ("a.cr3x", "b.jpg", "Budget 2024"):
+            (root / name).write_bytes(b"x")
+            self.files.append(FileInfo(path=root / name, size=1))
+        with db.FileWriter() as writer:
+            for f in self.files:
+                writer.add(f.path, f.size, None, "h-" + f.path.name, file_info=f)
+        # Each test gets a fresh database, so the rules are recorded again
+        recorded = mock.patch.object(classifier, "_RECORDED_RULE_SETS", set())
+        recorded.start()
+        self.addCleanup(recorded.stop)
+
+    def tearDown(self):
+        use_rules(self.default)
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def _rows(self):
+        with db.Session() as session:
+            return {r.file_id: (r.category, r.rule_set, r.matched_rule, r.extension)
+                    for r in session.query(db.Classification)}
+
+    def test_only_affected_rows_are_reclassified(self):
+        classify_files(self.files, use_db=True, workers=1)
+        a, b, budget = (f.file_id for f in self.files)
+        self.assertEqual(self._rows()[a], ("other", self.default.rule_set_id, "other", ".cr3x"))
+
+        edited = _edited_rules()
+        use_rules(edited)
+        stats = reclassify_files(changed=True)
+
+        self.assertEqual((stats["files_checked"], stats["files_updated"], stats["files_stamped"]), (2, 2, 1))
+        rows = self._rows()
+        self.assertEqual({row[1] for row in rows.values()}, {edited.rule_set_id})
+        self.assertEqual([rows[i][0] for i in (a, b, budget)], ["image", "image", "financial"])
+        self.assertEqual(rows[budget][2], edited.fallback_rule_ids[1])
+
+        self.assertEqual(reclassify_files(changed=True)["files_checked"], 0)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_db.py
+# Purpose: Unit tests for DB helpers, run against an in-memory SQLite database.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+# Version: 0.10.0
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.10.0 (2026-10-19): duplicate_of as the original's file id, operation targets as (dir_id, name) — Tim Canady
+# - 0.9.2 (2026-10-19): hash_jobs paths longer than 767 characters — Tim Canady
+# - 0.9.1 (2026-10-19): Cross-run dedup passes over catalog originals gone from disk — Tim Canady
+# - 0.9.0 (2026-10-19): Added incrementally maintained catalog_stats tests — Tim Canady
+# - 0.8.0 (2026-10-19): Added catalog-wide duplicate group tests — Tim Canady
+# - 0.7.0 (2026-10-19): Added directories table / path digest tests — Tim Canady
+# - 0.6.0 (2026-10-18): Engine factory tests; no DB credentials needed to import core.db — Tim Canady
+# - 0.5.0 (2026-10-18): Added offline spool and load_spool replay tests — Tim Canady
+# - 0.4.0 (2026-10-18): Added write-behind pipeline test — Tim Canady
+# - 0.3.0 (2026-10-18): Added id-keyed duplicate/classification/operation writer tests — Tim Canady
+# - 0.2.0 (2026-10-18): Added batched FileWriter upsert tests — Tim Canady
+# - 0.1.0 (2026-10-18): Initial hash_jobs work queue tests — Tim Canady
+###################################################################
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+from sqlalchemy import text, update
+from core import db
+from models.file_info import FileInfo
+
+
+class SQLiteTestCase(unittest.TestCase):
+    """Binds core.db.Session to a fresh in-memory SQLite database per test."""
+
+    def setUp(self):
+        self.engine = db.create_db_engine("sqlite://")
+        db.Base.metadata.create_all(self.engine)
+        self.previous_bind = db.Session.kw.get("bind")
+        db.Session.configure(bind=self.engine)
+
+    def tearDown(self):
+        db.Session.configure(bind=self.previous_bind)
+        self.engine.dispose()
+
+
+class TestEngineFactory(unittest.TestCase):
+    def test_database_url_override_fills_password_placeholder(self):
+        env = {"DATABASE_URL": "mysql+pymysql://me:${DB_PASSWORD}@db/catalog", "DB_PASSWORD": "p@ss"}
+        with mock.patch.dict(os.environ, env):
+            self.assertEqual(db.database_url(), "mysql+pymysql://me:p%40ss@db/catalog")
+
+    def test_missing_credentials_raise_on_first_use(self):
+        with mock.patch.dict(os.environ, {}, clear=True), mock.patch.object(db, "load_dotenv"):
+            with self.assertRaisesRegex(ValueError, "DB_NAME"):
+                db.database_url()
+
+    def test_sqlite_file_engine_uses_wal_and_pragmas(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = db.create_db_engine(f"sqlite:///{tmp}/catalog.db")
+            with engine.connect() as conn:
+                journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+                synchronous = conn.execute(text("PRAGMA synchronous")).scalar()
+            engine.dispose()
+        self.assertEqual((journal_mode, synchronous), ("wal", 1))
+
+    def test_session_binds_lazily_from_environment(self):
+        previous_bind = db.Session.kw.get("bind")
+        db.Session.configure(bind=None)
+        try:
+            with mock.patch.dict(os.environ, {"DATABASE_URL": "sqlite://"}):
+                db.init_db()
+                with db.Session() as session:
+                    self.assertEqual(session.query(db.File).count(), 0)
+            self.assertEqual(db.get_engine().dialect.name, "sqlite")
+        finally:
+            db.get_engine().dispose()
+            db.Session.configure(bind=previous_bind)
+
+
+class TestFileWriter(SQLiteTestCase):
+    def test_flushes_per_batch_and_on_close(self):
+        with db.FileWriter(batch_size=2, flush_interval=3600) as writer:
+            for i in range(5):
+                writer.add(f"/f{i}", i, datetime(2026, 1, 1), f"h{i}")
+            self.assertEqual(writer.rows_written, 4)
+        self.assertEqual((writer.rows_written, writer.flushes), (5, 3))
+
+        with db.Session() as session:
+            self.assertEqual(session.query(db.File).count(), 5)
+
+    def test_upsert_refreshes_hash_and_keeps_duplicate_state(self):
+        db.cache_file_entry("/a", 1, datetime(2026, 1, 1), "old")
+        db.cache_file_entry("/orig", 1, datetime(2026, 1, 1), "old")
+        db.mark_duplicate("/a", "/orig", verification="verified")
+
+        with db.FileWriter() as writer:
+            writer.add("/a", 2, datetime(2026, 2, 1), "stale")
+            writer.add("/a", 3, datetime(2026, 3, 1), "new")
+            writer.add("/b", 4, datetime(2026, 3, 1), "other", metadata_only=True)
+
+        with db.Session() as session:
+            a = session.query(db.File).filter_by(path="/a").one()
+            b = session.query(db.File).filter_by(path="/b").one()
+            orig = session.query(db.File).filter_by(path="/orig").one()
+        self.assertEqual((a.size, a.hash, a.is_duplicate, a.duplicate_of), (3, "new", True, orig.id))
+        self.assertTrue(b.metadata_only)
+
+
+class TestNormalizedPaths(SQLiteTestCase):
+    def test_split_path_matches_migration(self):
+        self.assertEqual(db.split_path("/a/b/c.txt"), ("/a/b", "c.txt"))
+        self.assertEqual(db.split_path("/c.txt"), ("/", "c.txt"))
+
+    def test_file_writer_stores_each_directory_once(self):
+        long_dir = "/deep/" + "x" * 900
+        with db.FileWriter(batch_size=2) as writer:
+            for path in ("/a/1", "/a/2", "/b/3", f"{long_dir}/4"):
+                writer.add(path, 1, datetime(2026, 1, 1), "h")
+
+        with db.Session() as session:
+            directories = dict(session.query(db.Directory.path, db.Directory.id))
+            rows = {f.path: (f.dir_id, f.name, f.path_digest) for f in session.query(db.File)}
+        self.assertEqual(set(directories), {"/a", "/b", long_dir})
+        self.assertEqual(rows["/a/2"][:2], (directories["/a"], "2"))
+        self.assertEqual(rows[f"{long_dir}/4"][:2], (directories[long_dir], "4"))
+        self.assertEqual(rows["/b/3"][2], db.path_digest("/b/3"))
+
+    def test_path_functions_look_up_by_digest(self):
+        db.cache_file_entry("/a/1", 1, datetime(2026, 1, 1), "h")
+        db.cache_file_entry("/a/1", 2, datetime(2026, 1, 2), "h2")
+        db.mark_duplicate("/a/1", "/a/0")
+
+        self.assertEqual(db.get_cached_hash("/a/1", datetime(2026, 1, 2)), "h2")
+        with db.Session() as session:
+            self.assertEqual(db.file_ids(session, ["/a/1", "/missing"]).keys(), {"/a/1"})
+            self.assertEqual(session.query(db.Directory).count(), 1)
+            self.assertTrue(session.query(db.File).one().is_duplicate)
+
+
+class TestIdKeyedWriters(SQLiteTestCase):
+    def _written(self, *paths):
+        files = [FileInfo(path=Path(p), size=1, hash="h") for p in paths]
+        with db.FileWriter() as writer:
+            for f in files:
+                writer.add(f.path, 1, datetime(2026, 1, 1), "h", file_info=f)
+        return files
+
+    def test_file_writer_fills_file_ids(self):
+        files = self._written("/a", "/b")
+        with db.Session() as session:
+            ids = dict(session.query(db.File.path, db.File.id))
+        self.assertEqual([f.file_id for f in files], [ids["/a"], ids["/b"]])
+
+    def test_duplicate_writer_merges_marks_per_file(self):
+        original, dup, mismatch = self._written("/orig", "/dup", "/mismatch")
+        db.mark_duplicate("/mismatch", "/orig")
+
+        with db.DuplicateWriter() as writer:
+            writer.clear(dup)
+            writer.mark(dup, original.path, verification="verified")
+            writer.verification(mismatch, "mismatch")
+            writer.mark(FileInfo(path=Path("/orig"), size=1), "/elsewhere")  # no file_id: path fallback
+        self.assertEqual(writer.rows_written, 2)
+
+        with db.Session() as session:
+            rows = {f.path: (f.is_duplicate, f.duplicate_of, f.verification) for f in session.query(db.File)}
+        self.assertEqual(rows["/dup"], (True, original.file_id, "verified"))
+        self.assertEqual(rows["/mismatch"], (False, None, "mismatch"))
+        self.assertEqual(rows["/orig"], (True, None, None))  # "/elsewhere" is not cataloged
+
+    def test_classification_writer_replaces_existing_row(self):
+        (f,) = self._written("/a")
+        db.save_classification("/a", "other")
+
+        with db.ClassificationWriter() as writer:
+            writer.add(f, "image", year=2020, confidence=0.8, rule_set="1.5.0-abc")
+
+        with db.Session() as session:
+            rows = session.query(db.Classification).filter_by(file_id=f.file_id).all()
+        self.assertEqual([(r.category, r.year, r.rule_set) for r in rows], [("image", 2020, "1.5.0-abc")])
+
+    def test_operation_writer_appends_every_call(self):
+        (f,) = self._written("/a")
+        with db.OperationWriter() as writer:
+            writer.add(f, "MOVE", "/x")
+            writer.add(f, "MOVE", "/sorted/y")
+        db.log_operation("/a", "MOVE", "/sorted/z")
+
+        with db.Session() as session:
+            operations = session.query(db.Operation).order_by(db.Operation.id).all()
+            targets = [db.target_path(session, op) for op in operations]
+            directories = session.query(db.Directory.path).count()
+        self.assertEqual(targets, ["/x", "/sorted/y", "/sorted/z"])
+        self.assertEqual(operations[1].target_dir_id, operations[2].target_dir_id)
+        self.assertEqual(directories, 2)  # "/" and "/sorted", each stored once
+
+
+class TestWriteBehindPipeline(SQLiteTestCase):
+    def tearDown(self):
+        db.stop_write_behind()
+        super().tearDown()
+
+    def test_stages_write_in_order_through_background_thread(self):
+        db.start_write_behind(max_queue=2, idle_flush=60)
+        files = [FileInfo(path=Path(f"/f{i}"), size=1, hash="h") for i in range(3)]
+
+        writer = db.open_writer(db.FileWriter, batch_size=100, flush_interval=None)
+        for f in files:
+            writer.add(f.path, 1, datetime(2026, 1, 1), "h", file_info=f)
+        duplicates = db.open_writer(db.DuplicateWriter)
+        for f in files[1:]:
+            duplicates.mark(f, files[0].path)  # file ids are resolved before these run
+        duplicates.close()
+
+        self.assertEqual(writer.rows_written, 3)
+        metrics = db.stop_write_behind()
+        self.assertEqual((metrics["rows_written"], metrics["errors"]), (5, 0))
+        with db.Session() as session:
+            self.assertEqual(session.query(db.File).filter_by(is_duplicate=True, duplicate_of=files[0].file_id).count(), 2)
+
+
+class TestOfflineSpool(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.spool_path = Path(self.tmp.name) / "spool.jsonl"
+        self.unreachable = db.create_db_engine(f"sqlite:///{self.tmp.name}/missing/dir/catalog.db")
+
+    def tearDown(self):
+        db.disable_spool()
+        self.unreachable.dispose()
+        self.tmp.cleanup()
+        super().tearDown()
+
+    def _offline_run(self, files):
+        db.Session.configure(bind=self.unreachable)
+        db.enable_spool(self.spool_path)
+        with db.FileWriter(batch_size=2) as writer:
+            for f in files:
+                writer.add(f.path, 1, datetime(2026, 1, 1), f.hash, file_info=f)
+        with db.DuplicateWriter() as duplicates:
+            duplicates.mark(files[1], files[0].path, verification="verified")
+        with db.ClassificationWriter() as classifications:
+            classifications.add(files[0], "image", year=2020)
+        self.assertEqual(db.disable_spool(), 5)
+        db.Session.configure(bind=self.engine)
+        return writer
+
+    def test_unreachable_db_spools_rows_and_load_replays_them(self):
+        files = [FileInfo(path=Path(f"/f{i}"), size=1, hash="h") for i in range(3)]
+        writer = self._offline_run(files)
+        self.assertEqual((writer.rows_written, writer.rows_spooled), (0, 3))
+        self.assertIsNone(files[0].file_id)
+
+        counts = db.load_spool(self.spool_path)
+
+        self.assertEqual(counts, {"files": 3, "duplicates": 1, "classifications": 1, "operations": 0, "unresolved": 0})
+        self.assertFalse(self.spool_path.exists())
+        with db.Session() as session:
+            dup = session.query(db.File).filter_by(path="/f1").one()
+            original = session.query(db.File).filter_by(path="/f0").one()
+            classification = session.query(db.Classification).one()
+        self.assertEqual((dup.is_duplicate, dup.duplicate_of, dup.verification), (True, original.id, "verified"))
+        self.assertEqual(dup.mtime, datetime(2026, 1, 1))
+        self.assertEqual((classification.file_id, classification.category), (original.id, "image"))
+
+    def test_load_deduplicates_by_path_and_skips_torn_line(self):
+        files = [FileInfo(path=Path("/a"), size=1, hash="old"), FileInfo(path=Path("/b"), size=1, hash="h"),
+                 FileInfo(path=Path("/c"), size=1, hash="h")]
+        self._offline_run(files)
+        db.enable_spool(self.spool_path)
+        db._spool.write("files", [{"path": "/a", "size": 2, "mtime": datetime(2026, 2, 1), "hash": "new",
+                                   "metadata_only": False, "scanned_at": datetime(2026, 2, 1)}])
+        db.disable_spool()
+        with open(self.spool_path, "a") as f:
+            f.write('{"kind": "files", "row": {"pa')
+
+        self.assertEqual(db.load_spool(self.spool_path)["files"], 3)
+        with db.Session() as session:
+            a = session.query(db.File).filter_by(path="/a").one()
+        self.assertEqual((a.size, a.hash), (2, "new"))
+
+
+class TestCatalogDuplicates(SQLiteTestCase):
+    def setUp(self):
+        super().setUp()
+        with db.FileWriter() as writer:
+            for path, mtime, hash_val in (("/a/1", 3, "h1"), ("/b/1", 1, "h1"), ("/a/2", 1, "h2"),
+                                          ("/b/2", 1, "h2"), ("/c/2", 1, "h2"), ("/a/3", 1, "h3"),
+                                          ("/a/big", 1, "METADATA_ONLY"), ("/b/big", 1, "METADATA_ONLY")):
+                writer.add(path, 10, datetime(2026, 1, mtime), hash_val)
+
+    def test_groups_stream_in_batches(self):
+        groups = {h: [row[1] for row in rows] for h, rows in db.iter_catalog_duplicate_groups(batch_size=1)}
+        self.assertEqual(groups, {"h1": ["/a/1", "/b/1"], "h2": ["/a/2", "/b/2", "/c/2"]})
+
+    def test_group_by_reads_only_the_hash_index(self):
+        with self.engine.connect() as conn:
+            plan = " ".join(row[-1] for row in conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT hash FROM files WHERE hash IS NOT NULL "
+                "GROUP BY hash HAVING COUNT(*) > 1")))
+        self.assertIn("COVERING INDEX idx_files_hash", plan)
+
+    def test_iter_db_duplicates_marks_catalog(self):
+        from core.deduplicator import iter_db_duplicates
+        db.mark_duplicate("/b/1", "/elsewhere")
+
+        groups = list(iter_db_duplicates(original_rule="oldest_mtime"))
+
+        self.assertEqual([str(g[0].path) for g in groups], ["/b/1", "/a/2"])
+        with db.Session() as session:
+            paths = dict(session.query(db.File.id, db.File.path))
+            rows = {f.path: (f.is_duplicate, paths.get(f.duplicate_of)) for f in session.query(db.File)}
+        self.assertEqual(rows["/b/1"], (False, None))
+        self.assertEqual(rows["/a/1"], (True, "/b/1"))
+        self.assertEqual(rows["/c/2"], (True, "/a/2"))
+        self.assertEqual(rows["/a/3"], (False, None))
+
+    def test_cross_run_skips_catalog_originals_gone_from_disk(self):
+        from core.deduplicator import detect_catalog_duplicates
+        with tempfile.TemporaryDirectory() as tmp:
+            old, new, lone = Path(tmp, "old.txt"), Path(tmp, "new.txt"), Path(tmp, "lone.txt")
+            for path in (old, new, lone):
+                path.write_bytes(b"same bytes")
+            run = [FileInfo(path=new, size=10, hash="hx"), FileInfo(path=lone, size=10, hash="hy")]
+            with db.FileWriter() as writer:
+                for path, hash_val in (("/gone/x", "hx"), (str(old), "hx"), ("/gone/y", "hy")):
+                    writer.add(path, 10, datetime(2026, 1, 1), hash_val)
+                for f in run:
+                    writer.add(f.path, f.size, datetime(2026, 2, 1), f.hash, file_info=f)
+
+            with self.assertRaises(ValueError):
+                detect_catalog_duplicates(run, verify="sha")
+            detect_catalog_duplicates(run, verify="bytes")
+
+        self.assertEqual((run[0].is_duplicate, run[0].original_path, run[0].verification), (True, old, "verified"))
+        self.assertEqual((run[1].is_duplicate, run[1].original_path), (False, None))
+
+
+class TestCatalogStats(SQLiteTestCase):
+    def _stats(self):
+        return {(r["dimension"], r["label"]): tuple(r[c] for c in db.STATS_COLUMNS) for r in db.catalog_stats()}
+
+    def _write_catalog(self):
+        files = [FileInfo(path=Path(p), size=size) for p, size in
+                 (("/Volumes/Backup/Photos/2019/a.jpg", 100), ("/Volumes/Backup/Photos/2019/b.jpg", 100),
+                  ("/Users/tim/Documents/tax.pdf", 40), ("/notes.txt", 5))]
+        with db.FileWriter() as writer:
+            for f in files:
+                writer.add(f.path, f.size, datetime(2024, 6, 1), "h", file_info=f)
+        return files
+
+    def test_stats_root_uses_leading_directories(self):
+        self.assertEqual(db.stats_root("/Volumes/Backup/Photos/2019/a.jpg"), "/Volumes/Backup/Photos")
+        self.assertEqual(db.stats_root("/Users/tim/x.txt"), "/Users/tim")
+        self.assertEqual(db.stats_root("/x.txt"), "/")
+
+    def test_writers_keep_stats_equal_to_a_rebuild(self):
+        a, b, tax, notes = self._write_catalog()
+        with db.ClassificationWriter() as writer:
+            writer.add(a, "image", year=2019)
+            writer.add(b, "image", year=2019)
+            writer.add(tax, "financial")
+        with db.DuplicateWriter() as writer:
+            writer.mark(b, a.path)
+        db.save_classification(str(notes.path), "document", year=2021)
+        db.mark_duplicate(str(tax.path), "/elsewhere")
+        db.clear_duplicate(str(tax.path))
+        db.cache_file_entry(str(notes.path), 7, datetime(2024, 6, 1), "h2")
+
+        stats = self._stats()
+        self.assertEqual(stats[("total", "")], (4, 247, 1, 100))
+        self.assertEqual(stats[("category", "image")], (2, 200, 1, 100))
+        self.assertEqual(stats[("root", "/Volumes/Backup/Photos")], (2, 200, 1, 100))
+        self.assertEqual(stats[("year", "2024")], (1, 40, 0, 0))  # unclassified year falls back to mtime
+
+        db.rebuild_catalog_stats(batch_size=2)
+        self.assertEqual(self._stats(), stats)
+
+    def test_reclassification_moves_counts_between_labels(self):
+        (a, *_) = self._write_catalog()
+        with db.ClassificationWriter() as writer:
+            writer.add(a, "image")
+        with db.ClassificationWriter() as writer:
+            writer.add(a, "video")
+
+        stats = self._stats()
+        self.assertNotIn(("category", "image"), stats)
+        self.assertEqual(stats[("category", "video")], (1, 100, 0, 0))
+        self.assertEqual(stats[("category", "Unclassified")], (3, 145, 0, 0))
+
+    def test_rebuild_repairs_drifted_table(self):
+        self._write_catalog()
+        expected = self._stats()
+        with db.Session() as session:
+            session.execute(update(db.CatalogStat).values(file_count=0, total_bytes=-1))
+            session.commit()
+        db.rebuild_catalog_stats()
+        self.assertEqual(self._stats(), expected)
+
+
+class TestHashJobQueue(SQLiteTestCase):
+    def _result(self, path):
+        return (path, 10, datetime(2026, 1, 1), f"hash-{path}", False)
+
+    def test_enqueue_skips_already_queued_paths(self):
+        self.assertEqual(db.enqueue_hash_jobs(["/a", "/b", "/a"]), 2)
+        self.assertEqual(db.enqueue_hash_jobs(["/b", "/c"]), 1)
+        self.assertEqual(db.hash_job_counts()[db.JOB_PENDING], 3)
+
+    def test_paths_longer_than_an_index_key_round_trip(self):
+        long_path = "/nas/" + "deep/" * 300 + "file.bin"
+        self.assertEqual(db.enqueue_hash_jobs([long_path, long_path]), 1)
+        token, jobs = db.claim_hash_jobs("w1", path_prefix="/nas/deep/")
+        self.assertEqual([path for _, path in jobs], [long_path])
+        self.assertEqual(db.complete_hash_jobs(token, [self._result(long_path)]), 1)
+        self.assertEqual([row[1] for row in db.load_hashed_jobs()], [long_path])
+
+    def test_claims_are_disjoint(self):
+        db.enqueue_hash_jobs([f"/f{i}" for i in range(10)])
+        _, first = db.claim_hash_jobs("w1", batch_size=4)
+        _, second = db.claim_hash_jobs("w2", batch_size=4)
+        _, third = db.claim_hash_jobs("w3", batch_size=4)
+
+        claimed = [path for batch in (first, second, third) for _, path in batch]
+        self.assertEqual(len(claimed), 10)
+        self.assertEqual(len(set(claimed)), 10)
+
+    def test_prefix_limits_claims(self):
+        db.enqueue_hash_jobs(["/nas/photos/1", "/nas/music/1", "/nas/photos_old/1"])
+        _, jobs = db.claim_hash_jobs("w1", path_prefix="/nas/photos/")
+        self.assertEqual([path for _, path in jobs], ["/nas/photos/1"])
+
+    def test_complete_writes_files_and_finalize_rows(self):
+        db.enqueue_hash_jobs(["/a", "/b"])
+        token, jobs = db.claim_hash_jobs("w1")
+        written = db.complete_hash_jobs(token, [self._result("/a")], failures={"/b": "permission denied"})
+
+        self.assertEqual(written, 1)
+        counts = db.hash_job_counts()
+        self.assertEqual((counts[db.JOB_DONE], counts[db.JOB_FAILED]), (1, 1))
+        self.assertEqual([row[1:] for row in db.load_hashed_jobs()], [("/a", 10, "hash-/a")])
+
+    def test_expired_lease_is_reclaimed_and_stale_results_dropped(self):
+        db.enqueue_hash_jobs(["/a"])
+        stale_token, _ = db.claim_hash_jobs("w1")
+        with db.Session() as session:
+            session.execute(update(db.HashJob).values(claimed_at=datetime.utcnow() - timedelta(hours=1)))
+            session.commit()
+
+        self.assertEqual(db.reclaim_expired_hash_jobs(lease_seconds=60), (1, 0))
+        token, jobs = db.claim_hash_jobs("w2")
+        self.assertEqual([path for _, path in jobs], ["/a"])
+
+        self.assertEqual(db.complete_hash_jobs(stale_token, [self._result("/a")]), 0)
+        self.assertEqual(db.complete_hash_jobs(token, [self._result("/a")]), 1)
+
+    def test_job_fails_after_max_attempts(self):
+        db.enqueue_hash_jobs(["/a"])
+        db.claim_hash_jobs("w1")
+        with db.Session() as session:
+            session.execute(update(db.HashJob).values(attempts=3, claimed_at=datetime.utcnow() - timedelta(hours=1)))
+            session.commit()
+
+        self.assertEqual(db.reclaim_expired_hash_jobs(lease_seconds=60, max_attempts=3), (0, 1))
+        self.assertEqual(db.hash_job_counts()[db.JOB_FAILED], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_deduplicator.py
+# Purpose: Unit tests for the deduplicator module.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): Unreadable originals leave the group unmarked — Tim Canady
+# - 0.1.0 (2026-10-18): Initial tests for byte-level verification — Tim Canady
+###################################################################
+
+import tempfile
+import unittest
+from pathlib import Path
+from models.file_info import FileInfo
+from core.deduplicator import detect_duplicates, verify_group_bytes
+
+
+class TestDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _file(self, name, data, hash_value="same"):
+        path = self.root / name
+        path.write_bytes(data)
+        return FileInfo(path=path, size=len(data), hash=hash_value)
+
+    def test_detect_duplicates_marks_copies(self):
+        files = [self._file("a.txt", b"x"), self._file("b.txt", b"x"), self._file("c.txt", b"y", "other")]
+        detect_duplicates(files)
+        self.assertFalse(files[0].is_duplicate)
+        self.assertTrue(files[1].is_duplicate)
+        self.assertEqual(files[1].original_path, files[0].path)
+        self.assertFalse(files[2].is_duplicate)
+
+    def test_verify_bytes_confirms_identical_files(self):
+        data = b"0123456789" * 20000
+        files = [self._file("a.bin", data), self._file("b.bin", data)]
+        detect_duplicates(files, verify="bytes")
+        self.assertTrue(files[1].is_duplicate)
+        self.assertEqual(files[0].verification, "verified")
+        self.assertEqual(files[1].verification, "verified")
+
+    def test_verify_bytes_rejects_hash_collision(self):
+        files = [self._file("a.bin", b"a" * 1000), self._file("b.bin", b"a" * 999 + b"b"),
+                 self._file("c.bin", b"a" * 1000)]
+        detect_duplicates(files, verify="bytes")
+        self.assertFalse(files[1].is_duplicate)
+        self.assertEqual(files[1].verification, "mismatch")
+        self.assertTrue(files[2].is_duplicate)
+
+    def test_verify_group_bytes_detects_length_difference(self):
+        files = [self._file("a.bin", b"abc"), self._file("b.bin", b"abcd")]
+        results = verify_group_bytes(files)
+        self.assertEqual(results[id(files[1])], "mismatch")
+
+    def test_verify_bytes_unreadable_original_marks_nothing(self):
+        files = [self._file("a.bin", b"x" * 100), self._file("b.bin", b"x" * 100), self._file("c.bin", b"x" * 100)]
+        files[0].path.unlink()
+        detect_duplicates(files, verify="bytes")
+        for member in files[1:]:
+            self.assertFalse(member.is_duplicate)
+            self.assertIsNone(member.original_path)
+            self.assertEqual(member.verification, "error")
+        self.assertEqual(files[0].verification, "error")
+
+
+if __name__ == '__main__':
+    unittest.main()
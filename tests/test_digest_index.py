@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_digest_index.py
+# Purpose: Unit tests for the compact digest index.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+# Version: 0.1.0
+# Last Modified: 2026-10-18 by Tim Canady
+#
+# Revision History:
+# - 0.1.0 (2026-10-18): Initial grouping, prefix-collision and ordering tests — Tim Canady
+###################################################################
+
+import hashlib
+import unittest
+from core.digest_index import DigestIndex, group_by_digest, raw_digest
+
+
+def _hex(value):
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+class TestDigestIndex(unittest.TestCase):
+    def test_groups_in_insertion_order(self):
+        hashes = [_hex("b"), _hex("a"), _hex("c"), _hex("a"), _hex("b"), _hex("a")]
+        self.assertEqual(group_by_digest(hashes), [[0, 4], [1, 3, 5]])
+
+    def test_prefix_collision_falls_back_to_full_digest(self):
+        index = DigestIndex()
+        prefix = b"\x01" * 8
+        index.add_raw(prefix + b"\x00" * 24)
+        index.add_raw(prefix + b"\xff" * 24)
+        index.add_raw(prefix + b"\x00" * 24)
+        self.assertEqual(index.groups(), [[0, 2]])
+
+    def test_non_hex_hashes_get_stable_digests(self):
+        self.assertEqual(raw_digest("h1"), raw_digest("h1"))
+        self.assertNotEqual(raw_digest("h1"), raw_digest("h2"))
+        self.assertEqual(raw_digest(_hex("x")), bytes.fromhex(_hex("x")))
+        self.assertEqual(group_by_digest(["h1", "h2", "h1"]), [[0, 2]])
+
+    def test_no_duplicates(self):
+        self.assertEqual(group_by_digest([_hex(str(i)) for i in range(1000)]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
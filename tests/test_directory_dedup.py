@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_directory_dedup.py
+# Purpose: Unit tests for duplicate-directory detection.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): Unsorted scan order and unpaired parent groups — Tim Canady
+# - 0.1.0 (2026-10-18): Initial tests for folder fingerprints — Tim Canady
+###################################################################
+
+import unittest
+from pathlib import Path
+from models.file_info import FileInfo
+from core.deduplicator import detect_duplicates, filter_duplicates
+from core.directory_dedup import compute_directory_fingerprints, detect_duplicate_directories
+
+ROOT = Path("/scan")
+
+
+def _files(spec):
+    return [FileInfo(path=ROOT / path, size=10, hash=hash_value) for path, hash_value in spec]
+
+
+class TestDirectoryDedup(unittest.TestCase):
+    def test_fingerprint_depends_on_names_and_hashes(self):
+        files = _files([("A/x", "h1"), ("B/x", "h1"), ("C/y", "h1"), ("D/x", "h2")])
+        fingerprints, stats = compute_directory_fingerprints(files, ROOT)
+        self.assertEqual(fingerprints[ROOT / "A"], fingerprints[ROOT / "B"])
+        self.assertNotEqual(fingerprints[ROOT / "A"], fingerprints[ROOT / "C"])
+        self.assertNotEqual(fingerprints[ROOT / "A"], fingerprints[ROOT / "D"])
+        self.assertEqual(stats[ROOT], (4, 40))
+
+    def test_metadata_only_file_makes_directory_incomparable(self):
+        files = _files([("A/x", "METADATA_ONLY"), ("B/x", "METADATA_ONLY")])
+        fingerprints, _ = compute_directory_fingerprints(files, ROOT)
+        self.assertIsNone(fingerprints[ROOT / "A"])
+        self.assertIsNone(fingerprints[ROOT])
+
+    def test_nested_copies_collapse_to_highest_ancestor(self):
+        files = _files([("A/x", "h1"), ("A/sub/y", "h2"),
+                        ("B/x", "h1"), ("B/sub/y", "h2"),
+                        ("C/sub/y", "h2"), ("C/z", "h3")])
+        groups = detect_duplicate_directories(files, ROOT)
+        directories = sorted(tuple(g.directories) for g in groups)
+        self.assertEqual(directories, [(ROOT / "A", ROOT / "B"),
+                                       (ROOT / "A/sub", ROOT / "B/sub", ROOT / "C/sub")])
+
+        by_path = {f.path: f for f in files}
+        self.assertTrue(by_path[ROOT / "B/sub/y"].is_duplicate)
+        self.assertEqual(by_path[ROOT / "B/sub/y"].original_path, ROOT / "A/sub/y")
+        self.assertEqual(by_path[ROOT / "B/sub/y"].duplicate_dir, ROOT / "A")
+        self.assertEqual(by_path[ROOT / "C/sub/y"].duplicate_dir, ROOT / "A/sub")
+        self.assertFalse(by_path[ROOT / "A/x"].is_duplicate)
+        self.assertFalse(by_path[ROOT / "C/z"].is_duplicate)
+
+    def test_original_folder_follows_file_level_originals(self):
+        # Scan order is not sorted: B/ was seen before A/
+        files = _files([("B/f.txt", "h1"), ("A/f.txt", "h1")])
+        detect_duplicates(files)
+        groups = detect_duplicate_directories(files, ROOT)
+        self.assertEqual(groups[0].original, ROOT / "B")
+        self.assertEqual([f.path for f in filter_duplicates(files)], [ROOT / "B/f.txt"])
+        self.assertEqual(files[1].original_path, ROOT / "B/f.txt")
+
+    def test_original_folder_members_are_cleared(self):
+        # Each folder holds one file-level original, so the tie goes to A/
+        files = _files([("B/f1", "h1"), ("A/f1", "h1"), ("A/f2", "h2"), ("B/f2", "h2")])
+        detect_duplicates(files)
+        groups = detect_duplicate_directories(files, ROOT)
+        self.assertEqual(groups[0].original, ROOT / "A")
+        self.assertEqual(sorted(f.path for f in filter_duplicates(files)), [ROOT / "A/f1", ROOT / "A/f2"])
+        self.assertIsNone(files[1].original_path)
+
+    def test_children_of_different_parent_groups_are_kept(self):
+        # P == R and Q == S, but P != Q; x is identical in all four
+        files = _files([("P/x/a", "h1"), ("P/p", "h2"), ("R/x/a", "h1"), ("R/p", "h2"),
+                        ("Q/x/a", "h1"), ("Q/q", "h3"), ("S/x/a", "h1"), ("S/q", "h3")])
+        detect_duplicate_directories(files, ROOT)
+        by_path = {f.path: f for f in files}
+        self.assertEqual(by_path[ROOT / "Q/x/a"].original_path, ROOT / "P/x/a")
+        self.assertEqual(by_path[ROOT / "S/x/a"].original_path, ROOT / "Q/x/a")
+        self.assertEqual(by_path[ROOT / "R/x/a"].original_path, ROOT / "P/x/a")
+        self.assertFalse(by_path[ROOT / "P/x/a"].is_duplicate)
+
+
+if __name__ == '__main__':
+    unittest.main()
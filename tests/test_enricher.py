@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_enricher.py
+# Purpose: Unit tests for year/owner enrichment.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+# Version: 0.1.0
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.0 (2026-10-19): Initial header, path, stat and cache tests — Tim Canady
+###################################################################
+
+import os
+import struct
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+from core import enricher
+from core.enricher import enrich_files, header_year, path_year
+from models.file_info import FileInfo
+
+
+def _jpeg_with_exif(date=b"2017:06:03 10:20:30\x00"):
+    # TIFF header, IFD0 with an Exif IFD pointer, Exif IFD with DateTimeOriginal
+    tiff = b"II*\x00" + struct.pack("<I", 8)
+    tiff += struct.pack("<H", 1) + struct.pack("<HHII", 0x8769, 4, 1, 26) + struct.pack("<I", 0)
+    tiff += struct.pack("<H", 1) + struct.pack("<HHII", 0x9003, 2, len(date), 44) + struct.pack("<I", 0)
+    tiff += date
+    app1 = b"Exif\x00\x00" + tiff
+    return b"\xff\xd8" + b"\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1 + b"\xff\xda\x00\x02"
+
+
+def _mp3_with_id3(year=b"1998"):
+    frame = b"TYER" + struct.pack(">I", len(year) + 1) + b"\x00\x00" + b"\x00" + year
+    return b"ID3\x03\x00\x00" + bytes([0, 0, 0, len(frame)]) + frame + b"\xff\xfb"
+
+
+class TestHeaderYear(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(header_year(_jpeg_with_exif(), "exif"), "2017")
+        self.assertEqual(header_year(_mp3_with_id3(), "id3"), "1998")
+        self.assertEqual(header_year(b"%PDF-1.4\n<< /CreationDate (D:20110405120000Z) >>", "pdf"), "2011")
+
+    def test_missing_or_bad_dates(self):
+        self.assertIsNone(header_year(_jpeg_with_exif(b"0000:00:00 00:00:00\x00"), "exif"))
+        self.assertIsNone(header_year(b"\xff\xd8\xff\xe0\x00\x10JFIF", "exif"))
+        self.assertIsNone(header_year(_jpeg_with_exif()[:30], "exif"))
+        self.assertIsNone(header_year(b"%PDF-1.4\n", "pdf"))
+
+    def test_path_year(self):
+        self.assertEqual(path_year(Path("/photos/2019/Trip/a.jpg")), "2019")
+        self.assertEqual(path_year(Path("/photos/2019/2021-07-04 Party/a.jpg")), "2021")
+        self.assertEqual(path_year(Path("/Pictures/Land-Pics/8May16/IMG_0001.JPG")), "2016")
+        self.assertIsNone(path_year(Path("/photos/Trip/2019.jpg")))
+
+
+class TestEnrichFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.cache_file = self.root / "years.json"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _file(self, relative, data, content_type=None, hash=None):
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        os.utime(path, (0, datetime(2005, 3, 1).timestamp()))
+        return FileInfo(path=path, size=len(data), hash=hash or relative, content_type=content_type)
+
+    def test_year_sources_in_order(self):
+        photo = self._file("Documents - 2996KD/2019/a.jpg", _jpeg_with_exif(), "image/jpeg")
+        dated = self._file("Documents - 2996KD/2019/b.jpg", b"\xff\xd8\xff\xe0", "image/jpeg")
+        plain = self._file("misc/notes.txt", b"hello")
+        enrich_files([photo, dated, plain], cache_file=self.cache_file)
+
+        self.assertEqual([f.year for f in (photo, dated, plain)], ["2017", "2019", "2005"])
+        self.assertEqual(photo.owner, "2996KD")
+        if enricher.pwd is not None:
+            self.assertEqual(plain.owner, enricher.pwd.getpwuid(os.getuid()).pw_name)
+
+    def test_header_years_are_cached_by_content_hash(self):
+        photo = self._file("a.jpg", _jpeg_with_exif(), "image/jpeg", hash="h1")
+        enrich_files([photo], cache_file=self.cache_file)
+
+        copy = self._file("b.jpg", _jpeg_with_exif(), "image/jpeg", hash="h1")
+        with mock.patch.object(enricher, "_read_header") as read:
+            enrich_files([copy], cache_file=self.cache_file)
+        read.assert_not_called()
+        self.assertEqual(copy.year, "2017")
+
+    def test_existing_values_are_kept(self):
+        photo = self._file("a.jpg", _jpeg_with_exif(), "image/jpeg")
+        photo.year, photo.owner = "1999", "tim"
+        enrich_files([photo], cache_file=self.cache_file)
+        self.assertEqual((photo.year, photo.owner), ("1999", "tim"))
+
+
+if __name__ == '__main__':
+    unittest.main()
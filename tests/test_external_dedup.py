@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_external_dedup.py
+# Purpose: Unit tests for disk-spilling duplicate detection.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+# Version: 0.1.0
+# Last Modified: 2026-10-18 by Tim Canady
+#
+# Revision History:
+# - 0.1.0 (2026-10-18): Initial equivalence and multi-pass merge tests — Tim Canady
+###################################################################
+
+import hashlib
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from models.file_info import FileInfo
+from core.deduplicator import detect_duplicates
+from core.external_dedup import ExternalGrouper, detect_duplicates_external
+
+
+def _files(count=30_000, seed=7):
+    rng = random.Random(seed)
+    files = []
+    for i in range(count):
+        content = rng.randrange(count // 2)
+        digest = hashlib.sha256(str(content).encode()).hexdigest()
+        files.append(FileInfo(path=Path(f"/data/{i}"), size=content, hash=digest))
+    files.append(FileInfo(path=Path("/data/big"), size=10, hash="METADATA_ONLY"))
+    return files
+
+
+def _marks(files):
+    return [(f.is_duplicate, f.original_path) for f in files]
+
+
+class TestExternalDedup(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.temp_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_in_memory_detection(self):
+        expected = _marks(detect_duplicates(_files()))
+        actual = _marks(detect_duplicates_external(_files(), memory_limit=1024 * 1024, temp_dir=self.temp_dir))
+        self.assertEqual(actual, expected)
+        self.assertEqual(list(self.temp_dir.iterdir()), [])
+
+    def test_multi_pass_merge_groups_in_path_id_order(self):
+        with ExternalGrouper(1024 * 1024, temp_dir=self.temp_dir) as grouper:
+            grouper.buffer_records = 3
+            grouper.fanin = 2
+            for path_id in range(40):
+                grouper.add(100, f"h{path_id % 5}", path_id)
+            groups = sorted(path_ids for _, _, path_ids in grouper.groups())
+            self.assertGreater(len(grouper.runs), 14)
+
+        self.assertEqual(groups, [list(range(start, 40, 5)) for start in range(5)])
+
+    def test_same_hash_different_size_not_grouped(self):
+        with ExternalGrouper(1024 * 1024, temp_dir=self.temp_dir) as grouper:
+            grouper.add(1, "h", 0)
+            grouper.add(2, "h", 1)
+            self.assertEqual(list(grouper.groups()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
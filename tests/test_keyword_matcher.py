@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_keyword_matcher.py
+# Purpose: Unit tests for the trie-compiled keyword matcher and its users.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): Matcher described as a trie-compiled regex — Tim Canady
+# - 0.1.0 (2026-10-19): Initial matcher, classifier marker and organizer root tests — Tim Canady
+###################################################################
+
+import unittest
+from pathlib import Path
+from core.classifier import categorize_path, find_category_marker
+from core.keyword_matcher import KeywordMatcher
+from core.organizer import plan_organization
+from models.file_info import FileInfo
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_finds_every_occurrence_including_overlaps(self):
+        matcher = KeywordMatcher(["tax", "taxes", "axe", "/www/", "/w"])
+        found = [(start, matcher.keywords[k]) for start, k in matcher.find_all("/taxes/www/")]
+        self.assertEqual(sorted(found), [(1, "tax"), (1, "taxes"), (2, "axe"), (6, "/w"), (6, "/www/")])
+
+    def test_no_match_and_invalid_keywords(self):
+        self.assertEqual(KeywordMatcher(["/www/"]).find_all("/srv/ww/x"), [])
+        with self.assertRaises(ValueError):
+            KeywordMatcher(["ok", ""])
+
+
+class TestSharedMarkers(unittest.TestCase):
+    def test_rule_precedence_across_overlapping_markers(self):
+        # "/www/" and "/.idea/" share a slash; the IDE rule comes first
+        self.assertEqual(categorize_path(Path("/srv/www/.idea/workspace")), "data")
+        self.assertEqual(categorize_path(Path("/srv/WWW/index")), "other")  # web markers are case-sensitive
+        self.assertEqual(categorize_path(Path("/Apps/Packet Tracer/bin/pt")), "application")
+
+    def test_marker_is_first_listed_pattern_at_its_first_occurrence(self):
+        path = "/Users/tim/www/old/http/site/index"
+        # "/http/" is listed before "/www/" in the web rule
+        self.assertEqual(find_category_marker(path, "web"), (path.index("/http/"), "/http/"))
+        self.assertEqual(find_category_marker("/x/PacketTracer/lib/a.so", "application"), (2, "/PacketTracer/"))
+        self.assertIsNone(find_category_marker("/x/docs/a", "web"))
+
+    def test_organizer_keeps_structure_below_the_root(self):
+        web = FileInfo(path=Path("/Users/tim/Desktop/www/site/index.html"), size=1, type="web")
+        app = FileInfo(path=Path("/Users/tim/Desktop/PacketTracer/lib/libssl.so.1"), size=1, type="application")
+        plan = dict((str(f.path), str(dest)) for f, dest in plan_organization([web, app], Path("/out")))
+        self.assertEqual(plan[str(web.path)], "/out/web/www/site/index.html")
+        self.assertEqual(plan[str(app.path)], "/out/application/PacketTracer/lib/libssl.so.1")
+
+
+if __name__ == '__main__':
+    unittest.main()
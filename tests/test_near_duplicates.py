@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_near_duplicates.py
+# Purpose: Unit tests for the near-duplicate detection module.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+# Version: 0.2.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.2.1 (2026-10-19): Pairs behind a bucket's first member; compact signature cache — Tim Canady
+# - 0.2.0 (2026-10-18): Added MinHash/LSH document tests — Tim Canady
+# - 0.1.0 (2026-10-18): Initial tests for BK-tree and image clustering — Tim Canady
+###################################################################
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+from models.file_info import FileInfo
+from core import near_duplicates
+from core.near_duplicates import (BKTree, find_near_duplicate_images, find_near_duplicate_documents,
+                                  minhash_signature, estimate_similarity)
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class TestBKTree(unittest.TestCase):
+    def test_search_returns_items_within_radius(self):
+        tree = BKTree()
+        for value in [0b0000, 0b0001, 0b0111, 0b1111]:
+            tree.add(value, value)
+        found = sorted(item for item, _ in tree.search(0b0000, 1))
+        self.assertEqual(found, [0b0000, 0b0001])
+        self.assertEqual(len(tree.search(0b0000, 4)), 4)
+
+
+@unittest.skipIf(Image is None, "Pillow not installed")
+class TestNearDuplicateImages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _image(self, name, size, flip=False):
+        img = Image.new("L", (64, 64))
+        img.putdata([(x * 4 if not flip else 255 - x * 4) for y in range(64) for x in range(64)])
+        img = img.resize(size)
+        path = self.root / name
+        img.save(path)
+        return FileInfo(path=path, size=path.stat().st_size, hash=name, type="image")
+
+    def test_resized_copy_is_clustered(self):
+        files = [self._image("big.png", (256, 256)), self._image("small.jpg", (64, 64)),
+                 self._image("other.png", (128, 128), flip=True)]
+        clusters = find_near_duplicate_images(files, workers=1, cache_file=self.root / "cache.json")
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual({f.path.name for f in clusters[0]}, {"big.png", "small.jpg"})
+        self.assertIsNone(files[2].near_duplicate_of)
+        self.assertIsNotNone(clusters[0][1].similarity)
+
+
+class TestNearDuplicateDocuments(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _doc(self, name, text):
+        path = self.root / name
+        path.write_text(text)
+        return FileInfo(path=path, size=len(text), hash=name, type="document")
+
+    def test_signature_similarity_tracks_overlap(self):
+        words = [f"word{i}" for i in range(300)]
+        base = minhash_signature(" ".join(words))
+        edited = minhash_signature(" ".join(words[:-3] + ["changed"] * 3))
+        unrelated = minhash_signature(" ".join(f"other{i}" for i in range(300)))
+        self.assertGreater(estimate_similarity(base, edited), 0.8)
+        self.assertLess(estimate_similarity(base, unrelated), 0.2)
+
+    def test_edited_copy_is_clustered(self):
+        words = [f"line{i}" for i in range(400)]
+        files = [self._doc("report_final.txt", " ".join(words)),
+                 self._doc("report_final_v2.txt", " ".join(words[:-1] + ["edit"])),
+                 self._doc("notes.txt", " ".join(f"note{i}" for i in range(400)))]
+        clusters = find_near_duplicate_documents(files, workers=1, cache_file=self.root / "cache.json")
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(len(clusters[0]), 2)
+        self.assertIsNone(files[2].near_duplicate_of)
+
+    def test_pair_sharing_a_bucket_behind_its_first_member(self):
+        # b and c agree on 7 of 8 rows in every band after the first, so band 0
+        # (shared with an unrelated a) is their only common bucket
+        sig_b = list(range(128))
+        sig_c = [v + 1000 if i % 8 == 0 and i >= 8 else v for i, v in enumerate(sig_b)]
+        sig_a = sig_b[:8] + [v + 5000 for v in sig_b[8:]]
+        files = [self._doc(name, name) for name in ("a.txt", "b.txt", "c.txt")]
+        signatures = {"a.txt": sig_a, "b.txt": sig_b, "c.txt": sig_c}
+        with mock.patch.object(near_duplicates, "_compute_signatures", return_value=signatures):
+            clusters = find_near_duplicate_documents(files, cache_file=self.root / "cache.json")
+        self.assertEqual([sorted(f.path.name for f in c) for c in clusters], [["b.txt", "c.txt"]])
+        self.assertIsNone(files[0].near_duplicate_of)
+
+    def test_signature_cache_is_compact(self):
+        cache_file = self.root / "cache.json"
+        files = [self._doc("a.txt", "one two three four five six"), self._doc("b.txt", "seven eight nine ten")]
+        find_near_duplicate_documents(files, workers=1, cache_file=cache_file)
+        self.assertNotIn("\n", cache_file.read_text())
+        cached = json.loads(cache_file.read_text())["a.txt"]
+        self.assertEqual(near_duplicates._decode_signature(cached), minhash_signature("one two three four five six"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_report_writer.py
+# Purpose: Unit tests for the streaming duplicate report writer.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): Cover unreadable members and originals re-pointed to a catalog copy — Tim Canady
+# - 0.1.0 (2026-10-18): Initial tests for jsonl/csv/gzip output and top-K summary — Tim Canady
+###################################################################
+
+import csv
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from models.file_info import FileInfo
+from core.deduplicator import detect_duplicates
+from core.report_writer import write_duplicate_report
+
+
+def _files():
+    files = []
+    for group in range(5):
+        for copy in range(group + 2):
+            files.append(FileInfo(path=Path(f"/data/g{group}/copy{copy}"), size=100 * (group + 1), hash=f"h{group}"))
+    files.append(FileInfo(path=Path("/data/unique"), size=1, hash="u"))
+    return detect_duplicates(files)
+
+
+class TestReportWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_jsonl_report_streams_groups_and_summary(self):
+        summary = write_duplicate_report(_files(), str(self.root / "report.jsonl"), fmt="jsonl", top_k=2)
+        records = [json.loads(line) for line in (self.root / "report.jsonl").read_text().splitlines()]
+        self.assertEqual([r["type"] for r in records], ["hash"] * 5 + ["summary"])
+        self.assertEqual(summary["duplicate_files"], sum(range(1, 6)))
+        self.assertEqual([t["group_id"] for t in summary["top"]], [5, 4])
+
+    def test_csv_report_is_gzipped(self):
+        summary = write_duplicate_report(_files(), str(self.root / "report.csv"), fmt="csv", compress=True)
+        with gzip.open(self.root / "report.csv.gz", "rt", newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), sum(range(2, 7)))
+        self.assertEqual(sum(1 for r in rows if r["role"] == "original"), 5)
+        self.assertEqual(summary["duplicate_groups"], 5)
+
+    def test_unreadable_member_is_not_counted_as_waste(self):
+        files = []
+        for copy in range(4):
+            path = self.root / f"copy{copy}"
+            path.write_bytes(b"same")
+            files.append(FileInfo(path=path, size=4, hash="h"))
+        files[3].path.unlink()
+        detect_duplicates(files, verify="bytes")
+
+        summary = write_duplicate_report(files, str(self.root / "report.jsonl"), fmt="jsonl")
+        record = json.loads((self.root / "report.jsonl").read_text().splitlines()[0])
+        self.assertEqual(summary["duplicate_files"], 2)
+        self.assertEqual(summary["wasted"], 8)
+        self.assertEqual([u["path"] for u in record["unverified"]], [str(files[3].path)])
+
+    def test_groups_follow_the_marked_original(self):
+        files = _files()
+        cataloged = Path("/archive/g0/copy0")
+        for file_info in files:
+            if file_info.hash == "h0":
+                file_info.is_duplicate, file_info.original_path = True, cataloged
+
+        write_duplicate_report(files, str(self.root / "report.jsonl"), fmt="jsonl")
+        records = [json.loads(line) for line in (self.root / "report.jsonl").read_text().splitlines()]
+        group = next(r for r in records if r.get("key") == "h0")
+        self.assertEqual(group["original"]["path"], str(cataloged))
+        self.assertEqual(len(group["duplicates"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
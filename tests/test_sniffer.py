@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_sniffer.py
+# Purpose: Unit tests for magic-number content sniffing and its use by the classifier.
+#
+# Author: Tim Canady
+# Created: 2026-10-19
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): Text files starting with short signatures keep their extension — Tim Canady
+# - 0.1.0 (2026-10-19): Initial sniffer and content-aware classification tests — Tim Canady
+###################################################################
+
+import tempfile
+import unittest
+from pathlib import Path
+from core.classifier import categorize_path
+from core.hasher import hash_path
+from core.sniffer import sniff, content_category, fits, SNIFF_BYTES
+
+
+class TestSniffer(unittest.TestCase):
+    def test_recognizes_common_signatures(self):
+        headers = {
+            b"\xff\xd8\xff\xe0\x00\x10JFIF": "image/jpeg",
+            b"\x89PNG\r\n\x1a\n\x00\x00": "image/png",
+            b"%PDF-1.7\n": "application/pdf",
+            b"PK\x03\x04\x14\x00": "application/zip",
+            b"\xcf\xfa\xed\xfe\x07\x00\x00\x01": "application/x-mach-binary",
+            b"\x7fELF\x02\x01\x01": "application/x-executable",
+            b"SQLite format 3\x00\x10\x00": "application/vnd.sqlite3",
+            b"\x00\x00\x00\x18ftypheic\x00": "image/heic",
+            b"\x00\x00\x00\x20ftypisom\x00": "video/mp4",
+            b"RIFF\x24\x00\x00\x00WAVEfmt ": "audio/wav",
+            b"x" * 257 + b"ustar\x0000": "application/x-tar",
+        }
+        self.assertEqual({h: sniff(h) for h in headers}, headers)
+
+    def test_unknown_or_empty_header(self):
+        self.assertIsNone(sniff(b"plain text notes"))
+        self.assertIsNone(sniff(b""))
+        self.assertIsNone(content_category(None))
+
+    def test_short_signatures_need_a_real_header(self):
+        pe = b"MZ" + b"\x00" * 58 + b"\x80\x00\x00\x00" + b"\x00" * 64 + b"PE\x00\x00"
+        self.assertEqual(sniff(pe), "application/x-msdownload")
+        self.assertEqual(sniff(b"ID3\x03\x00\x00\x00\x00\x01\x10"), "audio/mpeg")
+        self.assertEqual(sniff(b"MM\x00*\x00\x00\x00\x08"), "image/tiff")
+        for text in (b"MZ Holdings quarterly notes, " * 4, b"MZ,1,2\n" * 20, b"ID3 tag spec\n", b"MM\x00*notes"):
+            self.assertIsNone(sniff(text), text)
+
+    def test_containers_fit_any_extension(self):
+        self.assertTrue(fits("application/zip", "document"))  # .docx
+        self.assertTrue(fits("application/pdf", "image"))     # Illustrator .ai
+        self.assertFalse(fits("image/jpeg", "document"))
+
+
+class TestContentClassification(unittest.TestCase):
+    def test_content_decides_for_missing_or_contradicted_extension(self):
+        self.assertEqual(categorize_path(Path("/scans/cs_notes"), "application/pdf"), "document")
+        self.assertEqual(categorize_path(Path("/p/photo.txt"), "image/jpeg"), "image")
+        self.assertEqual(categorize_path(Path("/p/Chrome/History"), "application/vnd.sqlite3"), "data")
+
+    def test_extension_kept_when_consistent_or_a_role(self):
+        self.assertEqual(categorize_path(Path("/p/report.docx"), "application/zip"), "document")
+        self.assertEqual(categorize_path(Path("/p/logo.ai"), "application/pdf"), "image")
+        self.assertEqual(categorize_path(Path("/p/photo.jpg.bak"), "image/jpeg"), "backup")
+        self.assertEqual(categorize_path(Path("/p/cs_notes"), None), "education")
+
+    def test_text_files_keep_their_extension_category(self):
+        cases = {"/p/holdings.txt": b"MZ Holdings quarterly notes, " * 4, "/p/sales.csv": b"MZ,1,2\n" * 20,
+                 "/p/notes.md": b"ID3 tag spec\n", "/p/odd.txt": b"MM\x00*notes"}
+        for path, data in cases.items():
+            expected = categorize_path(Path(path))
+            self.assertEqual(categorize_path(Path(path), sniff(data)), expected, path)
+        # Even a real header does not overrule a text extension
+        self.assertEqual(categorize_path(Path("/p/readme.txt"), "application/x-msdownload"), "document")
+        self.assertEqual(categorize_path(Path("/p/setup"), "application/x-msdownload"), "installer")
+
+    def test_header_comes_from_the_hashing_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "IMG_0001"
+            path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 100_000)
+            *hashes, header = hash_path(path, with_header=True)
+            self.assertEqual(tuple(hashes), hash_path(path))
+        self.assertEqual(len(header), SNIFF_BYTES)
+        self.assertEqual(sniff(header), "image/png")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+#
+###################################################################
+# Project: File Deduplication
+# File: test_write_behind.py
+# Purpose: Unit tests for the background (write-behind) DB writer thread.
+#
+# Author: Tim Canady
+# Created: 2026-10-18
+# Version: 0.1.1
+# Last Modified: 2026-10-19 by Tim Canady
+#
+# Revision History:
+# - 0.1.1 (2026-10-19): SIGTERM during backpressure, dropping closed writers — Tim Canady
+# - 0.1.0 (2026-10-18): Initial ordering, stage barrier and backpressure tests — Tim Canady
+###################################################################
+
+import os
+import signal
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import unittest
+from pathlib import Path
+from core.write_behind import WriteBehind
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class RecordingWriter:
+    """Minimal batch writer: buffers values and records each flush."""
+
+    def __init__(self, log, name, delay=0.0):
+        self.log, self.name, self.delay = log, name, delay
+        self.rows_written = self.flushes = 0
+        self.flush_seconds = self.max_flush_seconds = 0.0
+        self.rows = []
+        self.thread = None
+
+    @property
+    def pending(self):
+        return len(self.rows)
+
+    def add(self, value):
+        self.thread = threading.current_thread()
+        time.sleep(self.delay)
+        self.rows.append(value)
+
+    def flush(self):
+        if self.rows:
+            self.log.append((self.name, list(self.rows)))
+            self.rows_written += len(self.rows)
+            self.flushes += 1
+            self.rows = []
+
+
+class TestWriteBehind(unittest.TestCase):
+    def test_calls_run_on_background_thread_and_close_flushes(self):
+        log = []
+        write_behind = WriteBehind(max_queue=100, idle_flush=60)
+        writer = RecordingWriter(log, "files")
+        proxy = write_behind.wrap(writer)
+        for i in range(5):
+            proxy.add(i)
+        write_behind.close()
+
+        self.assertEqual(log, [("files", [0, 1, 2, 3, 4])])
+        self.assertIsNot(writer.thread, threading.current_thread())
+        metrics = write_behind.metrics()
+        self.assertEqual((metrics["enqueued"], metrics["rows_written"], metrics["queue_depth"]), (5, 5, 0))
+
+    def test_switching_writers_flushes_previous_stage_first(self):
+        log = []
+        write_behind = WriteBehind(max_queue=100, idle_flush=60)
+        files = write_behind.wrap(RecordingWriter(log, "files"))
+        duplicates = write_behind.wrap(RecordingWriter(log, "duplicates"))
+
+        files.add(1)
+        files.add(2)
+        duplicates.add("a")
+        files.close()
+        duplicates.close()
+        write_behind.close()
+
+        self.assertEqual(log, [("files", [1, 2]), ("duplicates", ["a"])])
+        self.assertEqual(files.rows_written, 2)
+
+    def test_full_queue_applies_backpressure(self):
+        write_behind = WriteBehind(max_queue=1, idle_flush=60)
+        proxy = write_behind.wrap(RecordingWriter([], "slow", delay=0.02))
+        for i in range(5):
+            proxy.add(i)
+        write_behind.close()
+
+        metrics = write_behind.metrics()
+        self.assertGreater(metrics["backpressure_waits"], 0)
+        self.assertEqual(metrics["rows_written"], 5)
+        self.assertLessEqual(metrics["max_queue_depth"], 1)
+
+    def test_closed_writers_are_dropped_but_counted(self):
+        write_behind = WriteBehind(idle_flush=60)
+        for name in ("files", "duplicates"):
+            with write_behind.wrap(RecordingWriter([], name)) as proxy:
+                proxy.add(1)
+                proxy.add(2)
+        self.assertEqual(write_behind._writers, [])
+        self.assertEqual(write_behind.metrics()["rows_written"], 4)
+        write_behind.close()
+        self.assertEqual(write_behind.metrics()["flushes"], 2)
+
+    @unittest.skipUnless(hasattr(signal, "SIGTERM") and os.name == "posix", "needs POSIX signals")
+    def test_sigterm_while_blocked_on_full_queue_flushes_at_exit(self):
+        script = textwrap.dedent("""
+            import sys, time
+            from core.write_behind import WriteBehind, install_signal_handlers
+
+            class SlowWriter:
+                rows_written = flushes = 0
+                flush_seconds = max_flush_seconds = 0.0
+                pending = 0
+                def add(self, value):
+                    time.sleep(0.01)
+                    self.pending += 1
+                def flush(self):
+                    with open(sys.argv[1], "a") as f:
+                        f.write(f"{self.pending}\\n")
+                    self.pending = 0
+
+            write_behind = WriteBehind(max_queue=2, idle_flush=60)
+            install_signal_handlers()
+            proxy = write_behind.wrap(SlowWriter())
+            print("ready", flush=True)
+            while True:
+                proxy.add(1)
+        """)
+        out = REPO_ROOT / f".write_behind_test_{os.getpid()}.txt"
+        self.addCleanup(lambda: out.exists() and out.unlink())
+        child = subprocess.Popen([sys.executable, "-c", script, str(out)], cwd=REPO_ROOT,
+                                 stdout=subprocess.PIPE, text=True)
+        self.assertEqual(child.stdout.readline().strip(), "ready")
+        time.sleep(0.2)
+        child.send_signal(signal.SIGTERM)
+        self.assertEqual(child.wait(timeout=10), 128 + signal.SIGTERM)
+        child.stdout.close()
+        self.assertGreater(sum(int(line) for line in out.read_text().split()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
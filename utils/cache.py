@@ -13,10 +13,12 @@
 # Author: Tim Canady
 # Created: 2025-09-28
 #
-# Version: 0.5.0
-# Last Modified: 2025-11-12 by Tim Canady
+# Version: 0.6.1
+# Last Modified: 2026-10-19 by Tim Canady
 #
 # Revision History:
+# - 0.6.1 (2026-10-19): save_cache takes an indent so large caches can be written compactly — Tim Canady
+# - 0.6.0 (2026-10-18): Allow alternate cache files (e.g. perceptual hashes keyed by content hash) — Tim Canady
 # - 0.5.0 (2025-11-12): Implemented full JSON-based caching system — Tim Canady
 # - 0.1.0 (2025-09-28): Initial stub implementation — Tim Canady
 ###################################################################
@@ -30,29 +32,29 @@ logger = logging.getLogger(__name__)
 
 CACHE_FILE = Path(".file_dedup_cache.json")
 
-def load_cache() -> Dict[str, str]:
+def load_cache(cache_file: Path = CACHE_FILE) -> Dict[str, str]:
     """Load hash cache from disk."""
-    if not CACHE_FILE.exists():
-        logger.info("No cache file found, starting fresh.")
+    if not cache_file.exists():
+        logger.info(f"No cache file found at {cache_file}, starting fresh.")
         return {}
 
     try:
-        with open(CACHE_FILE, 'r') as f:
+        with open(cache_file, 'r') as f:
             cache = json.load(f)
-            logger.info(f"🔁 Loaded {len(cache)} cached file hashes.")
+            logger.info(f"🔁 Loaded {len(cache)} cached entries from {cache_file}.")
             return cache
     except Exception as e:
-        logger.warning(f"Failed to load cache: {e}")
+        logger.warning(f"Failed to load cache {cache_file}: {e}")
         return {}
 
-def save_cache(cache: Dict[str, str]) -> None:
-    """Save hash cache to disk."""
+def save_cache(cache: Dict[str, str], cache_file: Path = CACHE_FILE, indent: Optional[int] = 2) -> None:
+    """Save hash cache to disk (indent=None writes compact JSON)."""
     try:
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(cache, f, indent=2)
-            logger.info(f"💾 Saved {len(cache)} file hashes to cache.")
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f, indent=indent, separators=None if indent else (',', ':'))
+            logger.info(f"💾 Saved {len(cache)} cached entries to {cache_file}.")
     except Exception as e:
-        logger.error(f"Failed to save cache: {e}")
+        logger.error(f"Failed to save cache {cache_file}: {e}")
 
 def get_cached_hash(file_path: Path, cache: Dict[str, str]) -> Optional[str]:
     """Get cached hash for a file if it hasn't been modified."""